@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : class_i18n_catalog.py
+# ------------------------------------------------------------------------------
+#
+# File          : class_i18n_catalog.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import os, re, marshal
+
+# bump if the layout of the compiled catalog changes.
+CATALOG_FORMAT_VERSION = 1
+CATALOG_FILE_EXT = 'i18nc'
+_PLACEHOLDER_REGEX = re.compile(r'%\{(\w+)\}')
+
+
+def _flatten(prefix, data, out):
+    for k, v in data.items():
+        _key = '%s.%s' % (prefix, k)
+        if isinstance(v, dict):
+            _flatten(_key, v, out)
+        else:
+            out[_key] = v
+
+
+class TranslationTemplate:
+    """
+    translation text with ``%{name}`` placeholders parsed once into
+    literal and placeholder parts.
+    """
+    __slots__ = ('parts', 'names')
+
+    def __init__(self, text):
+        _parts = []
+        _names = []
+        _pos = 0
+        for m in _PLACEHOLDER_REGEX.finditer(text):
+            _parts.append(text[_pos:m.start()])
+            _parts.append(None)
+            _names.append(m.group(1))
+            _pos = m.end()
+        _parts.append(text[_pos:])
+        self.parts = tuple(_parts)
+        self.names = tuple(_names)
+
+    def render(self, kwargs):
+        _it = iter(self.names)
+        _out = []
+        for p in self.parts:
+            if p is None:
+                _name = next(_it)
+                _out.append(str(kwargs[_name]) if _name in kwargs else '%{' + _name + '}')
+            else:
+                _out.append(p)
+        return ''.join(_out)
+
+
+class TranslationCatalogCompiler:
+    """
+    compiles the locale YAML files of a directory (``<namespace>.<locale>.yml``)
+    into one flat catalog per locale ``{'<namespace>.<key>': text}``, stored
+    marshalled next to the sources as ``.<locale>.i18nc``. the compiled file
+    is used as long as the set of sources and their mtimes are unchanged.
+    """
+
+    def __init__(self, file_formats=('yml', 'yaml')):
+        self.fileFormats = tuple(file_formats)
+
+    def get_sources(self, directory, locale):
+        """
+        find the source files of a locale.
+
+        :param directory: str, directory with the locale files
+        :param locale: str, locale name
+        :return: dict, {namespace: path}
+        """
+        _sources = dict()
+        try:
+            _names = os.listdir(directory)
+        except OSError:
+            return _sources
+        for _name in _names:
+            _parts = _name.rsplit('.', 2)
+            if len(_parts) != 3 or _parts[1] != locale or _parts[2] not in self.fileFormats:
+                continue
+            _sources[_parts[0]] = os.path.join(directory, _name)
+        return _sources
+
+    def get_catalog_path(self, directory, locale):
+        return os.path.join(directory, '.%s.%s' % (locale, CATALOG_FILE_EXT))
+
+    @staticmethod
+    def _signature(sources):
+        return tuple(sorted((ns, os.stat(p).st_mtime_ns) for ns, p in sources.items()))
+
+    def compile(self, directory, locale):
+        """
+        parse the source files of a locale into a flat catalog.
+
+        :param directory: str, directory with the locale files
+        :param locale: str, locale name
+        :return: dict, flat catalog
+        """
+        import yaml
+        _loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        _catalog = dict()
+        for _ns, _path in self.get_sources(directory, locale).items():
+            with open(_path, 'r', encoding='utf-8') as f:
+                _data = yaml.load(f, Loader=_loader) or {}
+            # the locale files carry the locale as root key.
+            if isinstance(_data, dict) and len(_data) == 1 and locale in _data:
+                _data = _data[locale] or {}
+            if isinstance(_data, dict):
+                _flatten(_ns, _data, _catalog)
+        return _catalog
+
+    def load(self, directory, locale):
+        """
+        return the catalog of a locale, from the compiled file if it is
+        up to date, else compiled from the sources and stored.
+
+        :param directory: str, directory with the locale files
+        :param locale: str, locale name
+        :return: dict, flat catalog
+        """
+        _sources = self.get_sources(directory, locale)
+        if not _sources:
+            return dict()
+        _signature = self._signature(_sources)
+        _catalog_path = self.get_catalog_path(directory, locale)
+        try:
+            with open(_catalog_path, 'rb') as f:
+                _version, _stored_signature, _catalog = marshal.load(f)
+            if _version == CATALOG_FORMAT_VERSION and _stored_signature == _signature:
+                return _catalog
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        _catalog = self.compile(directory, locale)
+        _tmp_path = _catalog_path + '.tmp'
+        try:
+            with open(_tmp_path, 'wb') as f:
+                marshal.dump((CATALOG_FORMAT_VERSION, _signature, _catalog), f)
+            os.replace(_tmp_path, _catalog_path)
+        except (OSError, ValueError):
+            # read only location or not marshallable data, keep it in memory.
+            pass
+        return _catalog
+
+
+class CompiledI18n:
+    """
+    python-i18n compatible translator backed by compiled catalogs.
+
+    ``t``, ``set``, ``get`` and ``load_path`` behave like the python-i18n
+    module, everything else is forwarded to the backend module. catalogs are
+    loaded once per locale, ``tk(ns, key)`` looks up by namespace and key
+    without assembling the dotted key, texts with ``%{name}`` placeholders
+    are parsed once into templates.
+
+    :param backend: module, python-i18n module holding the settings
+    :param compiler: TranslationCatalogCompiler
+    """
+
+    def __init__(self, backend, compiler=None):
+        self._backend = backend
+        self._compiler = compiler or TranslationCatalogCompiler()
+        # {(locale, load paths): catalog}
+        self._catalogs = dict()
+        # {(locale, fallback, load paths): {(ns, key): text}}
+        self._nsCache = dict()
+        self._templates = dict()
+
+    def __getattr__(self, item):
+        return getattr(self._backend, item)
+
+    @property
+    def load_path(self):
+        return self._backend.load_path
+
+    def get(self, key):
+        return self._backend.get(key)
+
+    def set(self, key, value):
+        self._backend.set(key, value)
+        if key in ('file_format', 'filename_format', 'skip_locale_root_data'):
+            self.reload()
+
+    def reload(self):
+        """
+        drop all loaded catalogs, they are reloaded on the next lookup.
+        """
+        self._catalogs.clear()
+        self._nsCache.clear()
+
+    def get_catalog(self, locale):
+        _load_path = tuple(str(p) for p in self._backend.load_path)
+        _key = (locale, _load_path)
+        _catalog = self._catalogs.get(_key)
+        if _catalog is None:
+            _catalog = dict()
+            for _dir in _load_path:
+                _catalog.update(self._compiler.load(_dir, locale))
+            self._catalogs[_key] = _catalog
+        return _catalog
+
+    def _lookup(self, key, locale):
+        _text = self.get_catalog(locale).get(key)
+        if _text is None:
+            _fallback = self._backend.get('fallback')
+            if _fallback and _fallback != locale:
+                _text = self.get_catalog(_fallback).get(key)
+        return _text
+
+    def _format(self, text, kwargs):
+        if not kwargs or not isinstance(text, str):
+            return text
+        _tpl = self._templates.get(text)
+        if _tpl is None:
+            _tpl = self._templates[text] = TranslationTemplate(text)
+        if not _tpl.names:
+            return text
+        return _tpl.render(kwargs)
+
+    def t(self, key, **kwargs):
+        """
+        translate a dotted key ``<namespace>.<key>``.
+
+        :param key: str, translation key
+        :param kwargs: placeholder values, ``locale`` overrides the current locale,
+                       ``count`` selects the zero/one/many form
+        :return: str, the translation or the key if missing
+        """
+        _locale = kwargs.pop('locale', None) or self._backend.get('locale')
+        if 'count' in kwargs:
+            _count = kwargs['count']
+            _form = 'zero' if _count == 0 else 'one' if _count == 1 else 'many'
+            _text = self._lookup('%s.%s' % (key, _form), _locale)
+            if _text is None and _form == 'zero':
+                _text = self._lookup('%s.many' % key, _locale)
+            if _text is not None:
+                return self._format(_text, kwargs)
+        _text = self._lookup(key, _locale)
+        if _text is None:
+            return key
+        return self._format(_text, kwargs)
+
+    def tk(self, ns, key, **kwargs):
+        """
+        translate by namespace and key, cached per locale.
+
+        :param ns: str, namespace
+        :param key: str, key inside the namespace
+        :return: str
+        """
+        if kwargs:
+            return self.t('%s.%s' % (ns, key), **kwargs)
+        _cache_key = (self._backend.get('locale'), self._backend.get('fallback'),
+                      tuple(str(p) for p in self._backend.load_path))
+        _cache = self._nsCache.get(_cache_key)
+        if _cache is None:
+            _cache = self._nsCache[_cache_key] = dict()
+        _text = _cache.get((ns, key))
+        if _text is None:
+            _text = _cache[(ns, key)] = self.t('%s.%s' % (ns, key))
+        return _text
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : class_py_script_worker_pool.py
+# ------------------------------------------------------------------------------
+#
+# File          : class_py_script_worker_pool.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+Pool of persistent worker processes executing user scripts.
+
+a script runs in a separate process with a time limit and a memory limit,
+a hanging or crashing script kills only its worker, which is restarted on
+the next job. every worker keeps its own compiled code cache keyed by the
+content hash of the source, so repeated guard/action scripts are compiled
+once per worker. results are delivered as :class:`concurrent.futures.Future`.
+"""
+import os, time, itertools, threading, traceback, collections, multiprocessing
+from multiprocessing.connection import wait
+from concurrent.futures import Future
+import psutil
+from .core.exceptions import (PyScriptExecutionError, PyScriptTimeoutError, PyScriptMemoryError,
+                              PyScriptWorkerError)
+from .utils_helper import util_py_script_digest, util_py_script_compile, util_py_script_collect
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PY_SCRIPT_DEFAULT_TIMEOUT = 10.0
+PY_SCRIPT_DEFAULT_MEMORY_LIMIT = 512 * 1024 * 1024
+# interval of the deadline and memory checks of the busy workers.
+_POLL_INTERVAL = 0.05
+_ERR_EXECUTION = 'execution'
+_ERR_MEMORY = 'memory'
+
+
+def _worker_main(conn, memory_limit):
+    if memory_limit and resource is not None:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ValueError, OSError):
+            pass
+    while True:
+        try:
+            _msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        if _msg is None:
+            break
+        _job_id, _digest, _src, _kwargs, _result_vars = _msg
+        try:
+            _code = util_py_script_compile(_src, _digest)
+            _local_d = dict(**_kwargs)
+            exec(_code, _local_d)
+            _reply = (_job_id, True, util_py_script_collect(_local_d, _result_vars))
+        except MemoryError:
+            _reply = (_job_id, False, (_ERR_MEMORY, 'script exceeded the memory limit'))
+        except BaseException as e:
+            _reply = (_job_id, False, (_ERR_EXECUTION, '{}: {}\n{}'.format(
+                type(e).__name__, e, traceback.format_exc())))
+        try:
+            conn.send(_reply)
+        except Exception as e:
+            conn.send((_job_id, False, (_ERR_EXECUTION, 'result is not picklable: {}'.format(e))))
+
+
+class _PyScriptJob:
+    __slots__ = ('id', 'message', 'future', 'timeout', 'deadline')
+
+    def __init__(self, job_id, message, future, timeout):
+        self.id = job_id
+        self.message = message
+        self.future = future
+        self.timeout = timeout
+        self.deadline = None
+
+
+class _PyScriptWorker:
+    def __init__(self, ctx, memory_limit):
+        self.conn, _child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(_child_conn, memory_limit), daemon=True)
+        self.process.start()
+        _child_conn.close()
+        self.job = None
+        self._psProcess = None
+
+    @property
+    def alive(self):
+        return self.process.is_alive()
+
+    def rss(self):
+        try:
+            if self._psProcess is None:
+                self._psProcess = psutil.Process(self.process.pid)
+            return self._psProcess.memory_info().rss
+        except psutil.Error:
+            return 0
+
+    def stop(self, kill=False):
+        if not kill:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                kill = True
+            else:
+                self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1.0)
+        self.conn.close()
+
+
+class PyScriptWorkerPool:
+    """
+    executes the scripts in persistent worker processes.
+
+    :param workers: int, count of worker processes, cpu count - 1 by default
+    :param timeout: float, default time limit of a script in seconds, None for no limit
+    :param memory_limit: int, memory limit of a worker in bytes, None for no limit
+    :param mp_context: str, multiprocessing start method, optional
+    """
+
+    def __init__(self, workers=None, timeout=PY_SCRIPT_DEFAULT_TIMEOUT,
+                 memory_limit=PY_SCRIPT_DEFAULT_MEMORY_LIMIT, mp_context=None):
+        self._workerCount = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._timeout = timeout
+        self._memoryLimit = memory_limit
+        # RLIMIT_AS makes the script fail with MemoryError, without it the
+        # resident size of the busy workers is polled.
+        self._pollMemory = bool(memory_limit) and resource is None
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._workers = []
+        self._jobs = collections.deque()
+        self._jobIds = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeReader, self._wakeWriter = self._ctx.Pipe(duplex=False)
+        self._thread = None
+        self._shutdown = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    @property
+    def worker_count(self):
+        return self._workerCount
+
+    def submit(self, src, kwargs=None, result_vars=None, timeout=None):
+        """
+        queue a script for execution.
+        :param src: str, python source
+        :param kwargs: dict, script globals, must be picklable
+        :param result_vars: list or str, names of the result variables
+        :param timeout: float, time limit in seconds, pool default if None
+        :return: concurrent.futures.Future, result like util_py_script_execute
+        """
+        _future = Future()
+        _message = (util_py_script_digest(src), src, kwargs or dict(), result_vars)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot submit after shutdown')
+            _job_id = next(self._jobIds)
+            self._jobs.append(_PyScriptJob(_job_id, (_job_id,) + _message, _future,
+                                           self._timeout if timeout is None else timeout))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='PyScriptWorkerPool', daemon=True)
+                self._thread.start()
+        self._wake()
+        return _future
+
+    def execute(self, src, kwargs=None, result_vars=None, timeout=None):
+        """
+        execute a script in the pool and wait for the result.
+        """
+        return self.submit(src, kwargs, result_vars, timeout).result()
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        """
+        stop the workers after the queued scripts are done.
+        :param wait: bool, block until the workers are stopped
+        :param cancel_pending: bool, cancel the scripts not started yet
+        """
+        with self._lock:
+            self._shutdown = True
+            if cancel_pending:
+                while self._jobs:
+                    self._jobs.popleft().future.cancel()
+            _thread = self._thread
+        self._wake()
+        if _thread is None:
+            self._wakeReader.close()
+            self._wakeWriter.close()
+        elif wait:
+            _thread.join()
+
+    def _wake(self):
+        try:
+            self._wakeWriter.send_bytes(b'')
+        except OSError:
+            pass
+
+    def _dispatch(self):
+        with self._lock:
+            for _worker in [w for w in self._workers if w.job is None and not w.alive]:
+                self._retire(_worker, None)
+            while self._jobs:
+                _worker = next((w for w in self._workers if w.job is None), None)
+                if _worker is None:
+                    if len(self._workers) >= self._workerCount:
+                        return
+                    _worker = _PyScriptWorker(self._ctx, self._memoryLimit)
+                    self._workers.append(_worker)
+                _job = self._jobs.popleft()
+                if not _job.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    _worker.conn.send(_job.message)
+                except Exception as e:
+                    _job.future.set_exception(PyScriptExecutionError('script arguments are not picklable: {}'.format(e)))
+                    continue
+                _job.deadline = None if _job.timeout is None else time.monotonic() + _job.timeout
+                _worker.job = _job
+
+    def _retire(self, worker, error):
+        _job = worker.job
+        worker.job = None
+        worker.stop(kill=True)
+        self._workers.remove(worker)
+        if _job is not None and error is not None:
+            _job.future.set_exception(error)
+
+    def _on_reply(self, worker):
+        try:
+            _job_id, _ok, _value = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(0.5)
+            self._retire(worker, PyScriptWorkerError(
+                'script worker exited with code {}'.format(worker.process.exitcode)))
+            return
+        _job = worker.job
+        if _job is None or _job.id != _job_id:
+            return
+        worker.job = None
+        if _ok:
+            _job.future.set_result(_value)
+        elif _value[0] == _ERR_MEMORY:
+            _job.future.set_exception(PyScriptMemoryError(_value[1]))
+        else:
+            _job.future.set_exception(PyScriptExecutionError(_value[1]))
+
+    def _check_limits(self):
+        _now = time.monotonic()
+        for _worker in [w for w in self._workers if w.job is not None]:
+            _job = _worker.job
+            if _job.deadline is not None and _now > _job.deadline:
+                self._retire(_worker, PyScriptTimeoutError(
+                    'script exceeded the time limit of {}s'.format(_job.timeout)))
+            elif self._pollMemory and _worker.rss() > self._memoryLimit:
+                self._retire(_worker, PyScriptMemoryError('script exceeded the memory limit'))
+
+    def _run(self):
+        while True:
+            self._dispatch()
+            _busy = {w.conn: w for w in self._workers if w.job is not None}
+            with self._lock:
+                if self._shutdown and not self._jobs and not _busy:
+                    break
+            _timeout = _POLL_INTERVAL if _busy else None
+            for _conn in wait([self._wakeReader] + list(_busy), _timeout):
+                if _conn is self._wakeReader:
+                    while self._wakeReader.poll():
+                        self._wakeReader.recv_bytes()
+                else:
+                    self._on_reply(_busy[_conn])
+            self._check_limits()
+        for _worker in self._workers:
+            _worker.stop()
+        self._workers.clear()
+        self._wakeReader.close()
+        self._wakeWriter.close()
@@ -47,6 +47,7 @@ class ClassFactory:
     def __init__(self, ns_key='__namespace__'):
         self.__klass = {}
         self._nsKey = ns_key
+        self.__frozen = None
 
     @property
     def aliases(self):
@@ -133,3 +134,43 @@ class ClassFactory:
         clear out registered nodes, to prevent conflicts on reset.
         """
         self.__klass.clear()
+
+    def frozen(self):
+        """
+        Return a read-only view sharing the registry of this factory,
+        registrations on this factory are visible through the view.
+        the view is created once, so it could be shared by any number of
+        consumers without copying the registry.
+
+        Returns:
+            FrozenClassFactory: read-only factory.
+        """
+        if self.__frozen is None:
+            self.__frozen = FrozenClassFactory(self)
+        return self.__frozen
+
+
+class FrozenClassFactory(ClassFactory):
+    """
+    Read-only view of a ClassFactory, see ``ClassFactory.frozen``.
+    """
+
+    def __init__(self, source: ClassFactory):
+        ClassFactory.__init__(self, source._nsKey)
+        # share the registry of the source factory.
+        self._ClassFactory__klass = source.klass
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def frozen(self):
+        return self
+
+    def register(self, cls, alias=None, namespace=None, ns_override=False):
+        raise ClassRegisterError('can not register "{}", class factory is read-only.'.format(cls))
+
+    def clear_registered(self):
+        raise ClassRegisterError('can not clear a read-only class factory.')
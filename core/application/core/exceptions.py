@@ -19,4 +19,31 @@
 #
 #
 # ------------------------------------------------------------------------------
-class ClassRegisterError(Exception): pass
\ No newline at end of file
+class ClassRegisterError(Exception): pass
+
+
+class PyScriptError(Exception): pass
+
+
+class PyScriptExecutionError(PyScriptError): pass
+
+
+class PyScriptTimeoutError(PyScriptError): pass
+
+
+class PyScriptMemoryError(PyScriptError): pass
+
+
+class PyScriptWorkerError(PyScriptError): pass
+
+
+class StatechartError(Exception): pass
+
+
+class StatechartCompileError(StatechartError): pass
+
+
+class ModelCheckError(Exception): pass
+
+
+class TestGenerationError(Exception): pass
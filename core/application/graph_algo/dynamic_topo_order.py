@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : dynamic_topo_order.py
+# ------------------------------------------------------------------------------
+#
+# File          : dynamic_topo_order.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from collections import deque
+
+
+class DynamicTopoOrder:
+    """
+    Incrementally maintained topological order of a directed graph
+    (Pearce & Kelly, "A dynamic topological sort algorithm for directed
+    acyclic graphs", 2006).
+
+    Every node holds a unique ordinal, for each edge u->v ord(u) < ord(v).
+    Inserting an edge which already agrees with the order costs O(1), else
+    only the nodes between ord(v) and ord(u) are visited and reordered.
+    Reachability queries are pruned by the order, a node with a higher
+    ordinal can never reach a node with a lower one.
+
+    The graph is allowed to become cyclic, in that case the order is marked
+    invalid and queries fall back to a plain bfs until the cycle is removed
+    again and the order could be rebuilt.
+    """
+
+    def __init__(self):
+        self._ord = dict()
+        self._succ = dict()
+        self._pred = dict()
+        self._next = 0
+        self._valid = True
+        self._dirty = False
+
+    @property
+    def is_acyclic(self):
+        self._ensure_order()
+        return self._valid
+
+    def __contains__(self, node):
+        return node in self._ord
+
+    def __len__(self):
+        return len(self._ord)
+
+    def ord(self, node):
+        return self._ord.get(node)
+
+    def successors(self, node):
+        return list(self._succ.get(node, ()))
+
+    def predecessors(self, node):
+        return list(self._pred.get(node, ()))
+
+    def incident_edges(self, node):
+        """
+        all edges starting or ending at the node, parallel edges are
+        repeated by their count so the result could be fed back into
+        add_edges.
+
+        :param node: node
+        :return: list of (u, v)
+        """
+        _edges = list()
+        for v, _cnt in self._succ.get(node, {}).items():
+            _edges.extend([(node, v)] * _cnt)
+        for u, _cnt in self._pred.get(node, {}).items():
+            if u != node:
+                _edges.extend([(u, node)] * _cnt)
+        return _edges
+
+    def add_node(self, node):
+        if node in self._ord:
+            return
+        self._ord[node] = self._next
+        self._next += 1
+        self._succ[node] = dict()
+        self._pred[node] = dict()
+
+    def remove_node(self, node):
+        if node not in self._ord:
+            return
+        for s in self._succ.pop(node):
+            self._pred[s].pop(node, None)
+        for p in self._pred.pop(node):
+            self._succ[p].pop(node, None)
+        del self._ord[node]
+        if not self._valid:
+            self._dirty = True
+
+    def clear(self):
+        self.__init__()
+
+    def add_edge(self, u, v):
+        """
+        add the edge u->v, parallel edges are counted.
+
+        :param u: source node
+        :param v: target node
+        :return: bool, False if the edge closed a cycle
+        """
+        self.add_node(u)
+        self.add_node(v)
+        _cnt = self._succ[u].get(v, 0)
+        self._succ[u][v] = _cnt + 1
+        self._pred[v][u] = _cnt + 1
+        if _cnt or not self._valid:
+            return self._valid
+        if u == v:
+            self._valid = False
+            return False
+        if self._ord[u] < self._ord[v]:
+            return True
+        _ub = self._ord[u]
+        _lb = self._ord[v]
+        _fwd = self._collect(v, self._succ, lambda o: o <= _ub, stop=u)
+        if _fwd is None:
+            self._valid = False
+            return False
+        _bwd = self._collect(u, self._pred, lambda o: o >= _lb)
+        self._reorder(_bwd, _fwd)
+        return True
+
+    def add_edges(self, edges):
+        """
+        add many edges at once, the order is rebuilt once afterwards
+        instead of being repaired per edge.
+
+        :param edges: iterable of (u, v)
+        :return: bool, False if the graph is cyclic afterwards
+        """
+        _added = False
+        for u, v in edges:
+            self.add_node(u)
+            self.add_node(v)
+            _cnt = self._succ[u].get(v, 0)
+            self._succ[u][v] = _cnt + 1
+            self._pred[v][u] = _cnt + 1
+            _added = True
+        if _added:
+            self._valid = False
+            self._dirty = True
+        return self.is_acyclic
+
+    def remove_edge(self, u, v):
+        """
+        remove one u->v edge, removing edges never breaks the order.
+
+        :param u: source node
+        :param v: target node
+        """
+        _cnt = self._succ.get(u, {}).get(v)
+        if not _cnt:
+            return
+        if _cnt > 1:
+            self._succ[u][v] = _cnt - 1
+            self._pred[v][u] = _cnt - 1
+            return
+        del self._succ[u][v]
+        del self._pred[v][u]
+        if not self._valid:
+            self._dirty = True
+
+    def is_reachable(self, src, dst):
+        """
+        check if dst is reachable from src.
+
+        :param src: start node
+        :param dst: end node
+        :return: bool
+        """
+        if src == dst:
+            return True
+        if src not in self._ord or dst not in self._ord:
+            return False
+        self._ensure_order()
+        if self._valid:
+            _ub = self._ord[dst]
+            if self._ord[src] > _ub:
+                return False
+            return self._collect(src, self._succ, lambda o: o <= _ub, stop=dst) is None
+        _visited = {src}
+        _queue = deque([src])
+        while _queue:
+            for w in self._succ[_queue.popleft()]:
+                if w == dst:
+                    return True
+                if w not in _visited:
+                    _visited.add(w)
+                    _queue.append(w)
+        return False
+
+    def would_create_cycle(self, u, v):
+        """
+        check if adding the edge u->v would close a cycle.
+
+        :param u: source node
+        :param v: target node
+        :return: bool
+        """
+        return self.is_reachable(v, u)
+
+    def _collect(self, start, adjacency, bound, stop=None):
+        # iterative dfs inside the affected region, None if stop was hit.
+        _ord = self._ord
+        _visited = {start}
+        _stack = [start]
+        while _stack:
+            _v = _stack.pop()
+            for w in adjacency[_v]:
+                if w == stop:
+                    return None
+                if w not in _visited and bound(_ord[w]):
+                    _visited.add(w)
+                    _stack.append(w)
+        return _visited
+
+    def _reorder(self, bwd, fwd):
+        _ord = self._ord
+        _bwd = sorted(bwd, key=_ord.__getitem__)
+        _fwd = sorted(fwd, key=_ord.__getitem__)
+        _slots = sorted(_ord[n] for n in _bwd + _fwd)
+        for n, o in zip(_bwd + _fwd, _slots):
+            _ord[n] = o
+
+    def _ensure_order(self):
+        if self._valid or not self._dirty:
+            return
+        self._dirty = False
+        # Kahn over the current edges, keeps the order if no cycle is left.
+        _in_deg = {n: len(p) for n, p in self._pred.items()}
+        _queue = deque(sorted((n for n, d in _in_deg.items() if d == 0), key=self._ord.__getitem__))
+        _order = []
+        while _queue:
+            _v = _queue.popleft()
+            _order.append(_v)
+            for w in self._succ[_v]:
+                _in_deg[w] -= 1
+                if _in_deg[w] == 0:
+                    _queue.append(w)
+        if len(_order) != len(self._ord):
+            return
+        for i, n in enumerate(_order):
+            self._ord[n] = i
+        self._next = len(_order)
+        self._valid = True
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : layered_layout.py
+# ------------------------------------------------------------------------------
+#
+# File          : layered_layout.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from bisect import bisect_left
+
+
+class LayeredLayout:
+    """
+    Sugiyama style layering for directed graphs.
+
+    The successors of every node are read exactly once into an integer
+    adjacency snapshot, all further passes work on the snapshot:
+
+        1. cycle removal, back edges found by an iterative dfs are ignored.
+        2. longest path layering over the topological order (Kahn).
+        3. barycenter crossing minimization with alternating sweeps, the
+           ordering with the least crossings between adjacent layers is kept.
+
+    Edges spanning more than one layer are not split into dummy nodes, they
+    neither count as crossings nor pull on the barycenter.
+    """
+
+    def __init__(self, nodes, get_successors, start_nodes=None):
+        """
+        :param nodes: iterable of hashable node objects to layout
+        :param get_successors: callable(node) -> iterable of successor nodes,
+                               successors not in nodes are ignored
+        :param start_nodes: nodes the cycle removal starts from, edges
+                            closing a cycle back to them become the back
+                            edges (optional)
+        """
+        self.nodes = list(dict.fromkeys(nodes))
+        self._index = {n: i for i, n in enumerate(self.nodes)}
+        _n = len(self.nodes)
+        self.succ = [[] for _ in range(_n)]
+        self.pred = [[] for _ in range(_n)]
+        for i, node in enumerate(self.nodes):
+            _seen = set()
+            for m in get_successors(node):
+                j = self._index.get(m)
+                if j is None or j == i or j in _seen:
+                    continue
+                _seen.add(j)
+                self.succ[i].append(j)
+                self.pred[j].append(i)
+        self._starts = [self._index[n] for n in (start_nodes or []) if n in self._index]
+        self.backEdges = set()
+        self.rank = None
+        self.layers = None
+
+    @property
+    def roots(self):
+        """
+        :return: node indices without predecessor in the snapshot
+        """
+        return [i for i, p in enumerate(self.pred) if not p]
+
+    def _find_back_edges(self):
+        _n = len(self.nodes)
+        # 0: white, 1: gray (on stack), 2: black
+        _color = [0] * _n
+        _back = set()
+        _order = list(dict.fromkeys(self._starts + self.roots + list(range(_n))))
+        for root in _order:
+            if _color[root]:
+                continue
+            _color[root] = 1
+            _stack = [(root, iter(self.succ[root]))]
+            while _stack:
+                _v, _it = _stack[-1]
+                _next = None
+                for w in _it:
+                    if _color[w] == 1:
+                        _back.add((_v, w))
+                    elif _color[w] == 0:
+                        _next = w
+                        break
+                if _next is None:
+                    _color[_v] = 2
+                    _stack.pop()
+                else:
+                    _color[_next] = 1
+                    _stack.append((_next, iter(self.succ[_next])))
+        return _back
+
+    def compute_rank(self):
+        """
+        assign every node the length of the longest path reaching it.
+
+        :return: list of ranks indexed like self.nodes
+        """
+        _n = len(self.nodes)
+        self.backEdges = self._find_back_edges()
+        _back = self.backEdges
+        _in_deg = [0] * _n
+        for i in range(_n):
+            for j in self.succ[i]:
+                if (i, j) not in _back:
+                    _in_deg[j] += 1
+        _rank = [0] * _n
+        _queue = [i for i in range(_n) if _in_deg[i] == 0]
+        _head = 0
+        while _head < len(_queue):
+            i = _queue[_head]
+            _head += 1
+            _r = _rank[i] + 1
+            for j in self.succ[i]:
+                if (i, j) in _back:
+                    continue
+                if _rank[j] < _r:
+                    _rank[j] = _r
+                _in_deg[j] -= 1
+                if _in_deg[j] == 0:
+                    _queue.append(j)
+        self.rank = _rank
+        _layers = [[] for _ in range(max(_rank) + 1 if _rank else 0)]
+        for i in _queue:
+            _layers[_rank[i]].append(i)
+        self.layers = _layers
+        return _rank
+
+    def count_crossings(self, layers=None):
+        """
+        count the edge crossings between adjacent layers.
+
+        :param layers: list of ordered node index lists (default: self.layers)
+        :return: int, crossing count
+        """
+        layers = self.layers if layers is None else layers
+        _pos = self._positions(layers)
+        _total = 0
+        for layer in layers[:-1]:
+            _edges = []
+            for i in layer:
+                _r = self.rank[i] + 1
+                for j in self.succ[i]:
+                    if self.rank[j] == _r:
+                        _edges.append((_pos[i], _pos[j]))
+            if len(_edges) < 2:
+                continue
+            _edges.sort()
+            # crossings are the inversions of the lower end positions.
+            _sorted = []
+            for _, b in _edges:
+                _idx = bisect_left(_sorted, b + 1)
+                _total += len(_sorted) - _idx
+                _sorted.insert(_idx, b)
+        return _total
+
+    def _positions(self, layers):
+        _pos = [0] * len(self.nodes)
+        for layer in layers:
+            for p, i in enumerate(layer):
+                _pos[i] = p
+        return _pos
+
+    def _sweep(self, layers, downward):
+        _pos = self._positions(layers)
+        _range = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+        _adj = self.pred if downward else self.succ
+        _rank = self.rank
+        for r in _range:
+            _layer = layers[r]
+            _fixed = r - 1 if downward else r + 1
+            _keys = {}
+            for i in _layer:
+                _nbs = [_pos[j] for j in _adj[i] if _rank[j] == _fixed]
+                if _nbs:
+                    _keys[i] = sum(_nbs) / len(_nbs)
+                else:
+                    _keys[i] = _pos[i]
+            _layer.sort(key=lambda x: (_keys[x], _pos[x]))
+            for p, i in enumerate(_layer):
+                _pos[i] = p
+
+    def minimize_crossings(self, sweeps=8):
+        """
+        reorder the nodes inside their layers to reduce the edge crossings.
+
+        :param sweeps: number of alternating down/up barycenter sweeps
+        :return: list of layers, each a list of nodes
+        """
+        if self.layers is None:
+            self.compute_rank()
+        _best = [list(l) for l in self.layers]
+        _best_cnt = self.count_crossings(_best)
+        _layers = [list(l) for l in self.layers]
+        for s in range(sweeps):
+            if _best_cnt == 0:
+                break
+            self._sweep(_layers, downward=(s % 2 == 0))
+            _cnt = self.count_crossings(_layers)
+            if _cnt < _best_cnt:
+                _best_cnt = _cnt
+                _best = [list(l) for l in _layers]
+        self.layers = _best
+        return self.get_layers()
+
+    def get_layers(self):
+        """
+        :return: list of layers, each a list of nodes
+        """
+        if self.layers is None:
+            self.compute_rank()
+        return [[self.nodes[i] for i in layer] for layer in self.layers]
@@ -20,8 +20,18 @@
 #
 # ------------------------------------------------------------------------------
 class IPODInput:
-    def __init__(self):
-        pass
+    def __init__(self, data=None, constraints=None):
+        # IPODData parameter definitions.
+        self.data = list(data or [])
+        # list of (names, predicate(*values)), predicate returns False for an invalid combination.
+        self.constraints = list(constraints or [])
+
+    def add_data(self, data):
+        self.data.append(data)
+        return data
+
+    def add_constraint(self, names, predicate):
+        self.constraints.append((tuple(names), predicate))
 
 
 class IPODOutput:
@@ -30,5 +40,8 @@ class IPODOutput:
 
 
 class IPODData:
-    def __init__(self):
-        pass
+    def __init__(self, name=None, values=None, data_type=None):
+        self.name = name
+        # the (representative) values of the domain.
+        self.values = list(values or [])
+        self.dataType = data_type
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : __init__.py
+# ------------------------------------------------------------------------------
+#
+# File          : __init__.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from .state_vector import StateVectorLayout
+from .visited import hash64, HashVisitedSet, BitstateVisitedSet
+from .checker import (ModelChecker, ModelCheckResult, Violation, VIOLATION_DEADLOCK, VIOLATION_INVARIANT,
+                      SEARCH_BFS, SEARCH_DFS)
+from .stc_system import StatechartTransitionSystem
+from .parallel import ParallelModelChecker, ParallelModelCheckResult
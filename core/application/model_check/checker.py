@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : checker.py
+# ------------------------------------------------------------------------------
+#
+# File          : checker.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import time
+from collections import deque
+from ..core.exceptions import ModelCheckError
+from .visited import hash64, HashVisitedSet, BitstateVisitedSet
+
+VIOLATION_DEADLOCK = 'deadlock'
+VIOLATION_INVARIANT = 'invariant'
+SEARCH_BFS = 'bfs'
+SEARCH_DFS = 'dfs'
+
+
+class Violation:
+    def __init__(self, kind, message, trace=None, depth=None):
+        self.kind = kind
+        self.message = message
+        # list of (label, decoded state), label of the initial state is None.
+        self.trace = trace
+        self.depth = depth
+
+    def __repr__(self):
+        return '<Violation {}: {} depth={}>'.format(self.kind, self.message, self.depth)
+
+
+class ModelCheckResult:
+    def __init__(self):
+        self.states = 0
+        self.transitions = 0
+        self.maxDepth = 0
+        self.elapsed = 0.0
+        self.memoryBytes = 0
+        self.complete = True
+        self.violations = []
+        self.unreachable = []
+
+    @property
+    def states_per_second(self):
+        return self.states / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_state(self):
+        return self.memoryBytes / self.states if self.states else 0.0
+
+    @property
+    def ok(self):
+        return not self.violations
+
+    def summary(self):
+        return ('{} states, {} transitions, depth {}, {:.2f}s, {:.0f} states/s, {:.1f} bytes/state, '
+                '{} violations{}').format(self.states, self.transitions, self.maxDepth, self.elapsed,
+                                          self.states_per_second, self.bytes_per_state, len(self.violations),
+                                          '' if self.complete else ', incomplete')
+
+
+class ModelChecker:
+    """
+    Explicit state exploration of a transition system.
+
+    the system is duck typed, states are packed ints:
+
+    - ``initial_states()``: iterable of states
+    - ``successors(state)``: iterable of (label, state)
+    - ``decode(state)``: dict of the state variables, for invariants and traces
+    - ``is_final(state)``: optional, final states are no deadlocks
+    - ``control_of(state)`` and ``unreachable(seen_controls)``: optional, the
+      control part of a state (e.g. the statechart leaf) and the names of the
+      control states missing from the seen ones, reported as unreachable
+
+    visited states are stored as 64 bit hashes in :class:`HashVisitedSet`
+    or, with ``bitstate``, as bits in a :class:`BitstateVisitedSet`. bfs
+    gives shortest counterexamples from the parent ids, dfs takes the trace
+    from its stack and so also gives traces in bitstate mode.
+    """
+
+    def __init__(self, system, invariants=None, check_deadlock=True, search=SEARCH_BFS, bitstate=False,
+                 bitstate_bits=1 << 30, bitstate_k=3, max_states=None, max_violations=1, capacity=1 << 16):
+        """
+        :param system: transition system, see above
+        :param invariants: dict of name: predicate(decoded state) -> bool
+        :param check_deadlock: bool, report states without successors
+        :param search: str, SEARCH_BFS or SEARCH_DFS
+        :param bitstate: bool, use the bit state visited set
+        :param max_states: int, stop after this count of states, optional
+        :param max_violations: int, stop after this count of violations, None for all
+        """
+        if search not in (SEARCH_BFS, SEARCH_DFS):
+            raise ModelCheckError('unknown search "{}"'.format(search))
+        self.system = system
+        self.invariants = dict(invariants or {})
+        self.checkDeadlock = check_deadlock
+        self.search = search
+        self.maxStates = max_states
+        self.maxViolations = max_violations
+        if bitstate:
+            self.visited = BitstateVisitedSet(bitstate_bits, bitstate_k)
+        else:
+            self.visited = HashVisitedSet(capacity)
+        self._labelIds = dict()
+        self._labels = []
+        self._controlSeen = None
+        self._result = None
+
+    def _label_id(self, label):
+        _id = self._labelIds.get(label)
+        if _id is None:
+            _id = self._labelIds[label] = len(self._labels)
+            self._labels.append(label)
+        return _id
+
+    def _is_final(self, state):
+        _is_final = getattr(self.system, 'is_final', None)
+        return _is_final is not None and _is_final(state)
+
+    def _check_state(self, state):
+        """
+        Returns the name of the first violated invariant or None.
+        """
+        if not self.invariants:
+            return None
+        _values = self.system.decode(state)
+        for _name, _predicate in self.invariants.items():
+            if not _predicate(_values):
+                return _name
+        return None
+
+    def _report(self, kind, message, depth, trace):
+        self._result.violations.append(Violation(kind, message, trace, depth))
+        return self.maxViolations is not None and len(self._result.violations) >= self.maxViolations
+
+    def _replay(self, state_id):
+        # rebuild the states of a bfs path from their hashes.
+        if not isinstance(self.visited, HashVisitedSet):
+            return None
+        _ids = self.visited.path_to(state_id)
+        _hashes = self.visited.hashes
+        _state = next((s for s in self.system.initial_states() if hash64(s) == _hashes[_ids[0]]), None)
+        if _state is None:
+            return None
+        _trace = [(None, self.system.decode(_state))]
+        for _id in _ids[1:]:
+            _next = None
+            for _label, _succ in self.system.successors(_state):
+                if hash64(_succ) == _hashes[_id]:
+                    _next = (_label, _succ)
+                    break
+            if _next is None:
+                return None
+            _state = _next[1]
+            _trace.append((_next[0], self.system.decode(_state)))
+        return _trace
+
+    def _stack_trace(self, stack, label=None, state=None):
+        _trace = [(_lbl, self.system.decode(_s)) for _s, _lbl, _ in stack]
+        if state is not None:
+            _trace.append((label, self.system.decode(state)))
+        return _trace
+
+    def _see_control(self, state):
+        if self._controlSeen is not None:
+            self._controlSeen.add(self.system.control_of(state))
+
+    def run(self):
+        """
+        explore the state space.
+        :return: ModelCheckResult
+        """
+        self._result = ModelCheckResult()
+        self._controlSeen = set() if hasattr(self.system, 'control_of') else None
+        _t0 = time.perf_counter()
+        if self.search == SEARCH_BFS:
+            self._run_bfs()
+        else:
+            self._run_dfs()
+        _result = self._result
+        _result.elapsed = time.perf_counter() - _t0
+        _result.states = len(self.visited)
+        _result.memoryBytes = self.visited.memory_bytes
+        if isinstance(self.visited, BitstateVisitedSet):
+            _result.complete = False
+        if self._controlSeen is not None and _result.complete:
+            _result.unreachable = self.system.unreachable(self._controlSeen)
+        return _result
+
+    def _limit_reached(self):
+        if self.maxStates is not None and len(self.visited) >= self.maxStates:
+            self._result.complete = False
+            return True
+        return False
+
+    def _run_bfs(self):
+        _system = self.system
+        _visited = self.visited
+        _result = self._result
+        _queue = deque()
+        for _state in _system.initial_states():
+            _id = _visited.add(hash64(_state))
+            if _id < 0:
+                continue
+            self._see_control(_state)
+            _name = self._check_state(_state)
+            if _name is not None and self._report(VIOLATION_INVARIANT, 'invariant "{}" violated'.format(_name), 0,
+                                                  self._replay(_id)):
+                return
+            _queue.append((_state, _id, 0))
+        _successors = _system.successors
+        _add = _visited.add
+        _see_control = self._see_control if self._controlSeen is not None else None
+        _check = self._check_state if self.invariants else None
+        while _queue:
+            _state, _id, _depth = _queue.popleft()
+            if _depth > _result.maxDepth:
+                _result.maxDepth = _depth
+            _has_successor = False
+            for _label, _succ in _successors(_state):
+                _has_successor = True
+                _result.transitions += 1
+                _succ_id = _add(hash64(_succ), _id, self._label_id(_label))
+                if _succ_id < 0:
+                    continue
+                if _see_control is not None:
+                    _see_control(_succ)
+                if _check is not None:
+                    _name = _check(_succ)
+                    if _name is not None and self._report(
+                            VIOLATION_INVARIANT, 'invariant "{}" violated'.format(_name), _depth + 1,
+                            self._replay(_succ_id)):
+                        _result.complete = False
+                        return
+                _queue.append((_succ, _succ_id, _depth + 1))
+                if self._limit_reached():
+                    return
+            if not _has_successor and self.checkDeadlock and not self._is_final(_state):
+                if self._report(VIOLATION_DEADLOCK, 'deadlock', _depth, self._replay(_id)):
+                    _result.complete = False
+                    return
+
+    def _run_dfs(self):
+        _system = self.system
+        _visited = self.visited
+        _result = self._result
+        for _init in _system.initial_states():
+            if _visited.add(hash64(_init)) < 0:
+                continue
+            self._see_control(_init)
+            _stack = [(_init, None, iter(_system.successors(_init)))]
+            _name = self._check_state(_init)
+            if _name is not None and self._report(VIOLATION_INVARIANT, 'invariant "{}" violated'.format(_name), 0,
+                                                  self._stack_trace(_stack)):
+                _result.complete = False
+                return
+            _has_successor = [False]
+            while _stack:
+                _state, _, _it = _stack[-1]
+                if len(_stack) - 1 > _result.maxDepth:
+                    _result.maxDepth = len(_stack) - 1
+                _step = next(_it, None)
+                if _step is None:
+                    if not _has_successor[-1] and self.checkDeadlock and not self._is_final(_state):
+                        if self._report(VIOLATION_DEADLOCK, 'deadlock', len(_stack) - 1, self._stack_trace(_stack)):
+                            _result.complete = False
+                            return
+                    _stack.pop()
+                    _has_successor.pop()
+                    continue
+                _has_successor[-1] = True
+                _label, _succ = _step
+                _result.transitions += 1
+                if _visited.add(hash64(_succ)) < 0:
+                    continue
+                self._see_control(_succ)
+                _name = self._check_state(_succ)
+                if _name is not None and self._report(
+                        VIOLATION_INVARIANT, 'invariant "{}" violated'.format(_name), len(_stack),
+                        self._stack_trace(_stack, _label, _succ)):
+                    _result.complete = False
+                    return
+                _stack.append((_succ, _label, iter(_system.successors(_succ))))
+                _has_successor.append(False)
+                if self._limit_reached():
+                    return
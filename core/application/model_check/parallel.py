@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : parallel.py
+# ------------------------------------------------------------------------------
+#
+# File          : parallel.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+parallel breadth first exploration, the states are partitioned by hash
+over worker processes. each bfs level every worker expands its frontier
+and writes the successors owned by other workers as fixed size records
+into a shared memory segment, only the segment names and offsets go
+through the pipes. the owners read their slices, drop the visited states
+and keep the new ones as next frontier.
+"""
+import sys
+import time
+import struct
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+from ..core.exceptions import ModelCheckError
+from .visited import hash64, HashVisitedSet
+from .checker import ModelCheckResult, Violation, VIOLATION_DEADLOCK, VIOLATION_INVARIANT
+
+# record: hash, parent hash, successor index, then the packed state.
+_RECORD_HEAD = struct.Struct('<QQi')
+
+
+def _owner_of(h, count):
+    # the high bits pick the partition, the low bits stay for the slot table.
+    return (h >> 32) % count
+
+
+def _attach_shared_memory(name):
+    # the creator unlinks its segments, the reader must not track them.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    _shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(_shm._name, 'shared_memory')
+    return _shm
+
+
+class _PartitionExplorer:
+    def __init__(self, index, count, system, state_bytes, invariants, check_deadlock, capacity):
+        self.index = index
+        self.count = count
+        self.system = system
+        self.stateBytes = state_bytes
+        self.recordBytes = _RECORD_HEAD.size + state_bytes
+        self.invariants = invariants
+        self.checkDeadlock = check_deadlock
+        self.visited = HashVisitedSet(capacity, parent_typecode='Q')
+        self.frontier = []
+        self.local = []
+        self.controls = set() if hasattr(system, 'control_of') else None
+        self.segment = None
+        self.depth = 0
+
+    def _accept(self, state, h, parent, step, violations):
+        if self.visited.add(h, parent, step) < 0:
+            return
+        if self.controls is not None:
+            self.controls.add(self.system.control_of(state))
+        if self.invariants:
+            _values = self.system.decode(state)
+            for _name, _predicate in self.invariants.items():
+                if not _predicate(_values):
+                    violations.append((VIOLATION_INVARIANT, 'invariant "{}" violated'.format(_name), h, self.depth))
+                    break
+        self.frontier.append((state, h))
+
+    def _release(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+
+    def init(self):
+        _violations = []
+        for _state in self.system.initial_states():
+            _h = hash64(_state)
+            if _owner_of(_h, self.count) == self.index:
+                self._accept(_state, _h, 0, -1, _violations)
+        return len(self.frontier), _violations
+
+    def expand(self):
+        self._release()
+        _count = self.count
+        _index = self.index
+        _successors = self.system.successors
+        _buckets = [[] for _ in range(_count)]
+        _sent = set()
+        _transitions = 0
+        _violations = []
+        for _state, _h in self.frontier:
+            _step = -1
+            for _step, (_, _succ) in enumerate(_successors(_state)):
+                _succ_h = hash64(_succ)
+                if _succ_h in _sent:
+                    continue
+                _sent.add(_succ_h)
+                _buckets[_owner_of(_succ_h, _count)].append((_succ, _succ_h, _h, _step))
+            _transitions += _step + 1
+            if _step < 0 and self.checkDeadlock and not (hasattr(self.system, 'is_final')
+                                                         and self.system.is_final(_state)):
+                _violations.append((VIOLATION_DEADLOCK, 'deadlock', _h, self.depth))
+        self.frontier = []
+        self.local = _buckets[_index]
+        _buckets[_index] = []
+        _record = self.recordBytes
+        _total = sum(len(b) for b in _buckets)
+        _offsets = [0]
+        _name = None
+        if _total:
+            self.segment = shared_memory.SharedMemory(create=True, size=_total * _record)
+            _name = self.segment.name
+            _buf = self.segment.buf
+            _pack = _RECORD_HEAD.pack_into
+            _head = _RECORD_HEAD.size
+            _state_bytes = self.stateBytes
+            _offset = 0
+            for _bucket in _buckets:
+                for _succ, _succ_h, _parent, _step in _bucket:
+                    _pack(_buf, _offset, _succ_h, _parent, _step)
+                    _buf[_offset + _head:_offset + _record] = _succ.to_bytes(_state_bytes, 'little')
+                    _offset += _record
+                _offsets.append(_offset)
+            del _buf
+        else:
+            _offsets.extend([0] * _count)
+        return _name, _offsets, _transitions, _violations
+
+    def receive(self, batches):
+        self.depth += 1
+        _violations = []
+        _accept = self._accept
+        for _succ, _succ_h, _parent, _step in self.local:
+            _accept(_succ, _succ_h, _parent, _step, _violations)
+        self.local = []
+        _record = self.recordBytes
+        _head = _RECORD_HEAD.size
+        _unpack = _RECORD_HEAD.unpack_from
+        _from_bytes = int.from_bytes
+        for _name, _start, _end in batches:
+            _shm = _attach_shared_memory(_name)
+            try:
+                _data = bytes(_shm.buf[_start:_end])
+            finally:
+                _shm.close()
+            for _offset in range(0, len(_data), _record):
+                _h, _parent, _step = _unpack(_data, _offset)
+                _accept(_from_bytes(_data[_offset + _head:_offset + _record], 'little'), _h, _parent, _step,
+                        _violations)
+        return len(self.frontier), _violations
+
+    def parent_of(self, h):
+        _id = self.visited.index_of(h)
+        if _id < 0:
+            return None
+        return self.visited.parents[_id], self.visited.labels[_id]
+
+    def stats(self):
+        return len(self.visited), self.visited.memory_bytes, self.controls
+
+    def serve(self, conn):
+        _handlers = {'init': self.init, 'expand': self.expand, 'receive': self.receive,
+                     'parent': self.parent_of, 'stats': self.stats}
+        try:
+            while True:
+                _cmd, _args = conn.recv()
+                if _cmd == 'stop':
+                    break
+                try:
+                    conn.send(('ok', _handlers[_cmd](*_args)))
+                except Exception:
+                    conn.send(('error', traceback.format_exc()))
+        except (EOFError, KeyboardInterrupt):
+            pass
+        finally:
+            self._release()
+            conn.close()
+
+
+def _partition_main(conn, index, count, system, state_bytes, invariants, check_deadlock, capacity):
+    _PartitionExplorer(index, count, system, state_bytes, invariants, check_deadlock, capacity).serve(conn)
+
+
+class ParallelModelCheckResult(ModelCheckResult):
+    def __init__(self, workers):
+        ModelCheckResult.__init__(self)
+        self.workers = workers
+        self.partitionStates = []
+
+    def summary(self):
+        return '{}, {} workers'.format(ModelCheckResult.summary(self), self.workers)
+
+
+class ParallelModelChecker:
+    """
+    Breadth first exploration of a transition system (see
+    :class:`ModelChecker`) in ``workers`` processes.
+
+    the states must fit into ``state_bytes``, taken from the system
+    (``state_bytes`` or ``layout.byteWidth``) if not given. with the fork
+    start method the system is inherited by the workers, other methods
+    need a picklable system. the invariants are checked by the owner of a
+    state, deadlocks by the worker expanding it, the counterexample of a
+    violation is rebuilt by following the parent hashes over the owners
+    and replaying the successor indices from the initial state.
+    """
+
+    def __init__(self, system, workers=4, invariants=None, check_deadlock=True, state_bytes=None,
+                 max_states=None, max_violations=1, capacity=1 << 16, mp_context=None):
+        """
+        :param system: transition system
+        :param workers: int, count of worker processes
+        :param invariants: dict of name: predicate(decoded state) -> bool
+        :param check_deadlock: bool, report states without successors
+        :param state_bytes: int, byte width of a packed state, optional
+        :param max_states: int, stop after the level exceeding this count of states, optional
+        :param max_violations: int, stop after this count of violations, None for all
+        :param capacity: int, initial capacity of the visited set per worker
+        :param mp_context: str, multiprocessing start method, optional
+        """
+        if workers < 1:
+            raise ModelCheckError('at least one worker required')
+        if state_bytes is None:
+            state_bytes = getattr(system, 'state_bytes', None)
+        if state_bytes is None and hasattr(system, 'layout'):
+            state_bytes = system.layout.byteWidth
+        if not state_bytes:
+            raise ModelCheckError('state_bytes of the system unknown')
+        self.system = system
+        self.workers = workers
+        self.invariants = dict(invariants or {})
+        self.checkDeadlock = check_deadlock
+        self.stateBytes = state_bytes
+        self.maxStates = max_states
+        self.maxViolations = max_violations
+        self.capacity = capacity
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._conns = []
+        self._violationHashes = []
+
+    def _call_all(self, cmd, args_list):
+        for _conn, _args in zip(self._conns, args_list):
+            _conn.send((cmd, _args))
+        return [self._reply(_conn) for _conn in self._conns]
+
+    def _call(self, index, cmd, *args):
+        self._conns[index].send((cmd, args))
+        return self._reply(self._conns[index])
+
+    @staticmethod
+    def _reply(conn):
+        try:
+            _status, _value = conn.recv()
+        except EOFError:
+            raise ModelCheckError('model check worker died')
+        if _status == 'error':
+            raise ModelCheckError('model check worker failed:\n{}'.format(_value))
+        return _value
+
+    def _trace_of(self, h):
+        _chain = []
+        while h:
+            _parent = self._call(_owner_of(h, self.workers), 'parent', h)
+            if _parent is None:
+                return None
+            _chain.append((h, _parent[1]))
+            h = _parent[0]
+        _chain.reverse()
+        _system = self.system
+        _state = next((s for s in _system.initial_states() if hash64(s) == _chain[0][0]), None)
+        if _state is None:
+            return None
+        _trace = [(None, _system.decode(_state))]
+        for _h, _step in _chain[1:]:
+            for _i, (_label, _succ) in enumerate(_system.successors(_state)):
+                if _i == _step:
+                    break
+            else:
+                return None
+            if hash64(_succ) != _h:
+                return None
+            _state = _succ
+            _trace.append((_label, _system.decode(_state)))
+        return _trace
+
+    def _collect(self, result, violations):
+        for _kind, _message, _h, _depth in violations:
+            result.violations.append(Violation(_kind, _message, None, _depth))
+            self._violationHashes.append(_h)
+        return self.maxViolations is not None and len(result.violations) >= self.maxViolations
+
+    def run(self):
+        """
+        explore the state space.
+        :return: ParallelModelCheckResult
+        """
+        _count = self.workers
+        _result = ParallelModelCheckResult(_count)
+        _processes = []
+        self._violationHashes = []
+        _t0 = time.perf_counter()
+        try:
+            for _i in range(_count):
+                _parent_conn, _child_conn = self._ctx.Pipe()
+                _p = self._ctx.Process(target=_partition_main, daemon=True,
+                                       args=(_child_conn, _i, _count, self.system, self.stateBytes,
+                                             self.invariants, self.checkDeadlock, self.capacity))
+                _p.start()
+                _child_conn.close()
+                self._conns.append(_parent_conn)
+                _processes.append(_p)
+            _replies = self._call_all('init', [()] * _count)
+            _frontier = sum(r[0] for r in _replies)
+            _stop = self._collect(_result, [v for r in _replies for v in r[1]])
+            _states = _frontier
+            while _frontier and not _stop:
+                _sent = self._call_all('expand', [()] * _count)
+                _result.transitions += sum(s[2] for s in _sent)
+                _stop = self._collect(_result, [v for s in _sent for v in s[3]])
+                if _stop:
+                    break
+                _batches = [[(s[0], s[1][_dst], s[1][_dst + 1]) for s in _sent if s[1][_dst + 1] > s[1][_dst]]
+                            for _dst in range(_count)]
+                _replies = self._call_all('receive', [(b,) for b in _batches])
+                _frontier = sum(r[0] for r in _replies)
+                _states += _frontier
+                if _frontier:
+                    _result.maxDepth += 1
+                _stop = self._collect(_result, [v for r in _replies for v in r[1]])
+                if self.maxStates is not None and _states >= self.maxStates:
+                    break
+            if _frontier:
+                _result.complete = False
+            for _violation, _h in zip(_result.violations, self._violationHashes):
+                _violation.trace = self._trace_of(_h)
+            _stats = self._call_all('stats', [()] * _count)
+            _result.partitionStates = [s[0] for s in _stats]
+            _result.states = sum(_result.partitionStates)
+            _result.memoryBytes = sum(s[1] for s in _stats)
+            if _result.complete and hasattr(self.system, 'unreachable'):
+                _seen = set()
+                for _s in _stats:
+                    _seen.update(_s[2] or ())
+                _result.unreachable = self.system.unreachable(_seen)
+        finally:
+            for _conn in self._conns:
+                try:
+                    _conn.send(('stop', ()))
+                except (OSError, BrokenPipeError):
+                    pass
+            for _p in _processes:
+                _p.join(5.0)
+                if _p.is_alive():
+                    _p.terminate()
+            for _conn in self._conns:
+                _conn.close()
+            self._conns = []
+        _result.elapsed = time.perf_counter() - _t0
+        return _result
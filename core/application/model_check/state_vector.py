@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : state_vector.py
+# ------------------------------------------------------------------------------
+#
+# File          : state_vector.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from ..core.exceptions import ModelCheckError
+
+
+class StateVectorLayout:
+    """
+    Packs a state vector of bounded integer fields into one python int.
+
+    every field takes the bits needed for its domain size, values of a
+    field are indices into its domain, so enum like domains (lists of
+    arbitrary hashable values) are packed as well as int ranges.
+    """
+
+    def __init__(self, fields):
+        """
+        :param fields: list of (name, domain), domain is a range or a list of values
+        """
+        self.names = []
+        self.domains = []
+        self.shifts = []
+        self.masks = []
+        self._valueIndex = []
+        _shift = 0
+        for _name, _domain in fields:
+            _values = list(_domain)
+            if not _values:
+                raise ModelCheckError('domain of "{}" is empty'.format(_name))
+            _bits = max(1, (len(_values) - 1).bit_length())
+            self.names.append(_name)
+            self.domains.append(_values)
+            self.shifts.append(_shift)
+            self.masks.append((1 << _bits) - 1)
+            if isinstance(_domain, range) and _domain.step == 1:
+                self._valueIndex.append(_domain.start)
+            else:
+                self._valueIndex.append({v: i for i, v in enumerate(_values)})
+            _shift += _bits
+        self.bits = _shift
+        self.byteWidth = max(1, (_shift + 7) // 8)
+
+    def pack(self, values):
+        """
+        :param values: dict or sequence of the field values
+        :return: int, packed state
+        """
+        if isinstance(values, dict):
+            values = [values[n] for n in self.names]
+        _state = 0
+        for _i, _value in enumerate(values):
+            _index = self._valueIndex[_i]
+            if isinstance(_index, dict):
+                _idx = _index.get(_value)
+            else:
+                _idx = _value - _index
+                if not 0 <= _idx < len(self.domains[_i]):
+                    _idx = None
+            if _idx is None:
+                raise ModelCheckError('value {!r} out of the domain of "{}"'.format(_value, self.names[_i]))
+            _state |= _idx << self.shifts[_i]
+        return _state
+
+    def unpack(self, state):
+        """
+        :param state: int, packed state
+        :return: dict, field values by name
+        """
+        return {_name: self.domains[_i][(state >> self.shifts[_i]) & self.masks[_i]]
+                for _i, _name in enumerate(self.names)}
+
+    def get(self, state, index):
+        return self.domains[index][(state >> self.shifts[index]) & self.masks[index]]
+
+    def to_bytes(self, state):
+        return state.to_bytes(self.byteWidth, 'little')
+
+    def from_bytes(self, data):
+        return int.from_bytes(data, 'little')
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : stc_system.py
+# ------------------------------------------------------------------------------
+#
+# File          : stc_system.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from ..core.exceptions import ModelCheckError
+from ..statechart import StatechartRuntime
+from ..statechart.compiler import ROOT_STATE_ID
+from .state_vector import StateVectorLayout
+
+STATE_FIELD = 'state'
+
+
+class StatechartTransitionSystem:
+    """
+    Transition system of a compiled statechart over finite variables.
+
+    the state vector is the active leaf plus the variables, each variable
+    has a finite domain. every event of the chart is tried in every state,
+    guards and actions run on a context made of the constants and the
+    variable values, values leaving their domain are an error.
+    """
+
+    def __init__(self, compiled, variables=None, initial=None, constants=None, final_states=None):
+        """
+        :param compiled: CompiledStatechart
+        :param variables: dict of name: domain (range or list of values)
+        :param initial: dict of name: initial value, the first domain value by default
+        :param constants: dict, further globals of guards and actions
+        :param final_states: list of state names without deadlock report
+        """
+        self.compiled = compiled
+        _variables = dict(variables or {})
+        if STATE_FIELD in _variables:
+            raise ModelCheckError('"{}" is reserved for the statechart state'.format(STATE_FIELD))
+        self.variableNames = list(_variables.keys())
+        self.layout = StateVectorLayout([(STATE_FIELD, range(len(compiled.stateNames)))] + list(_variables.items()))
+        self._initial = {n: (initial or {}).get(n, list(d)[0]) for n, d in _variables.items()}
+        self._constants = dict(constants or {})
+        self._runtime = StatechartRuntime(compiled, dict())
+        self._events = [(_name, _id) for _name, _id in sorted(
+            compiled.eventIds.items(), key=lambda x: x[1])]
+        self._final = {compiled.stateIds[n] for n in (final_states or ())}
+
+    @property
+    def state_bytes(self):
+        return self.layout.byteWidth
+
+    def _context(self, values):
+        _ctx = dict(self._constants)
+        _ctx.update(values)
+        return _ctx
+
+    def _pack(self, leaf, ctx):
+        _values = [leaf]
+        for _name in self.variableNames:
+            _values.append(ctx[_name])
+        return self.layout.pack(_values)
+
+    def initial_states(self):
+        _runtime = self._runtime
+        _runtime.context = self._context(self._initial)
+        _runtime.start()
+        yield self._pack(_runtime.leaf, _runtime.context)
+
+    def successors(self, state):
+        _layout = self.layout
+        _leaf = state & _layout.masks[0]
+        _values = {n: _layout.get(state, i + 1) for i, n in enumerate(self.variableNames)}
+        _runtime = self._runtime
+        for _name, _event_id in self._events:
+            _runtime.context = self._context(_values)
+            _runtime.restore(_leaf)
+            if _runtime.dispatch_id(_event_id):
+                yield _name, self._pack(_runtime.leaf, _runtime.context)
+
+    def decode(self, state):
+        _values = self.layout.unpack(state)
+        _values[STATE_FIELD] = self.compiled.stateNames[_values[STATE_FIELD]]
+        return _values
+
+    def is_final(self, state):
+        return (state & self.layout.masks[0]) in self._final
+
+    def control_of(self, state):
+        return state & self.layout.masks[0]
+
+    def unreachable(self, seen_controls):
+        _active = set()
+        _parent = self.compiled.parent
+        for _leaf in seen_controls:
+            while _leaf != ROOT_STATE_ID and _leaf not in _active:
+                _active.add(_leaf)
+                _leaf = _parent[_leaf]
+        return [self.compiled.stateNames[i] for i in range(1, len(self.compiled.stateNames)) if i not in _active]
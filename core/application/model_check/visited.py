@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : visited.py
+# ------------------------------------------------------------------------------
+#
+# File          : visited.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from array import array
+
+_MASK64 = (1 << 64) - 1
+
+
+def hash64(state):
+    """
+    64 bit hash of a packed state (splitmix64 finalizer, wider states are
+    folded in 64 bit chunks), never 0.
+    """
+    _h = 0x9E3779B97F4A7C15
+    while True:
+        _h = (_h ^ (state & _MASK64)) * 0xBF58476D1CE4E5B9 & _MASK64
+        _h = (_h ^ (_h >> 27)) * 0x94D049BB133111EB & _MASK64
+        _h ^= _h >> 31
+        state >>= 64
+        if not state:
+            break
+    return _h or 1
+
+
+class HashVisitedSet:
+    """
+    Visited set of 64 bit state hashes with open addressing.
+
+    the slot table holds state ids, per id the hash, the parent id and the
+    label id are kept in flat arrays, which gives the counterexample
+    traces without storing the states. two states with the same 64 bit
+    hash are taken as one (hash compaction). the parents are ids by
+    default, ``parent_typecode='Q'`` allows to store parent hashes.
+    """
+    MAX_LOAD = 0.5
+
+    def __init__(self, capacity=1 << 16, parent_typecode='q'):
+        _cap = 1
+        while _cap < capacity:
+            _cap <<= 1
+        self._slots = array('q', [-1]) * _cap
+        self._mask = _cap - 1
+        self.hashes = array('Q')
+        self.parents = array(parent_typecode)
+        self.labels = array('i')
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @property
+    def memory_bytes(self):
+        return (self._slots.itemsize * len(self._slots) + self.hashes.itemsize * len(self.hashes)
+                + self.parents.itemsize * len(self.parents) + self.labels.itemsize * len(self.labels))
+
+    def _grow(self):
+        _cap = len(self._slots) * 2
+        _slots = array('q', [-1]) * _cap
+        _mask = _cap - 1
+        for _id, _h in enumerate(self.hashes):
+            _i = _h & _mask
+            while _slots[_i] != -1:
+                _i = (_i + 1) & _mask
+            _slots[_i] = _id
+        self._slots = _slots
+        self._mask = _mask
+
+    def add(self, h, parent=-1, label=-1):
+        """
+        :return: int, id of the new state or -1 if already visited
+        """
+        _slots = self._slots
+        _mask = self._mask
+        _hashes = self.hashes
+        _i = h & _mask
+        while True:
+            _id = _slots[_i]
+            if _id == -1:
+                break
+            if _hashes[_id] == h:
+                return -1
+            _i = (_i + 1) & _mask
+        _id = len(_hashes)
+        _slots[_i] = _id
+        _hashes.append(h)
+        self.parents.append(parent)
+        self.labels.append(label)
+        if _id + 1 > len(_slots) * self.MAX_LOAD:
+            self._grow()
+        return _id
+
+    def index_of(self, h):
+        """
+        :return: int, id of the state with the hash or -1
+        """
+        _i = h & self._mask
+        while True:
+            _id = self._slots[_i]
+            if _id == -1 or self.hashes[_id] == h:
+                return _id
+            _i = (_i + 1) & self._mask
+
+    def __contains__(self, h):
+        return self.index_of(h) != -1
+
+    def path_to(self, state_id):
+        """
+        Returns the ids from an initial state to the state.
+        """
+        _path = []
+        while state_id != -1:
+            _path.append(state_id)
+            state_id = self.parents[state_id]
+        _path.reverse()
+        return _path
+
+
+class BitstateVisitedSet:
+    """
+    Bit state (supertrace) visited set, every state sets k bits of a bit
+    array, derived from its 64 bit hash by double hashing. uses a fixed
+    amount of memory, a state whose bits are all set by others is missed,
+    so the exploration may be incomplete.
+    """
+
+    def __init__(self, bits=1 << 30, k=3):
+        _bits = 8
+        while _bits < bits:
+            _bits <<= 1
+        self._bits = bytearray(_bits >> 3)
+        self._mask = _bits - 1
+        self._k = k
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def memory_bytes(self):
+        return len(self._bits)
+
+    def add(self, h, parent=-1, label=-1):
+        """
+        :return: int, 0 for a new state or -1 if (probably) visited
+        """
+        _h1 = h & 0xFFFFFFFF
+        _h2 = (h >> 32) | 1
+        _bits = self._bits
+        _mask = self._mask
+        _new = False
+        for _j in range(self._k):
+            _b = (_h1 + _j * _h2) & _mask
+            _byte = _b >> 3
+            _bit = 1 << (_b & 7)
+            if not _bits[_byte] & _bit:
+                _bits[_byte] |= _bit
+                _new = True
+        if _new:
+            self._count += 1
+            return 0
+        return -1
+
+    def fill_ratio(self):
+        return sum(bin(b).count('1') for b in self._bits) / (len(self._bits) * 8)
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : __init__.py
+# ------------------------------------------------------------------------------
+#
+# File          : __init__.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from .des_kernel import DESKernel, SimTimer, EnumSimulationStatus
+from .stc_simulation import StatechartSimulation
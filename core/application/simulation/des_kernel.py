@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : des_kernel.py
+# ------------------------------------------------------------------------------
+#
+# File          : des_kernel.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import heapq, itertools
+
+
+class EnumSimulationStatus:
+    IDLE = 'idle'
+    RUNNING = 'running'
+    PAUSED = 'paused'
+    FINISHED = 'finished'
+    ERROR = 'error'
+
+
+class SimTimer:
+    """
+    handle of a scheduled callback, a cancelled timer stays in the calendar
+    and is dropped when it comes up.
+    """
+    __slots__ = ('time', 'interval', 'callback', 'args', 'cancelled')
+
+    def __init__(self, time, interval, callback, args):
+        self.time = time
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    @property
+    def repeating(self):
+        return self.interval is not None
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class DESKernel:
+    """
+    Discrete event simulation kernel.
+
+    the event calendar is a binary heap of ``(time, priority, sequence,
+    timer)``, events at the same time run by priority and then in
+    scheduling order. the virtual time jumps from event to event, nothing
+    sleeps, so the simulated time span does not cost wall time.
+    """
+
+    def __init__(self, start_time=0.0):
+        self._now = start_time
+        self._calendar = []
+        self._seq = itertools.count()
+        self._stopRequested = False
+        self.status = EnumSimulationStatus.IDLE
+        self.eventCount = 0
+        self.lastError = None
+
+    @property
+    def now(self):
+        return self._now
+
+    @property
+    def pending(self):
+        return len(self._calendar)
+
+    def peek(self):
+        """
+        Returns the time of the next event or None.
+        """
+        self._drop_cancelled()
+        return self._calendar[0][0] if self._calendar else None
+
+    def _push(self, timer, priority):
+        heapq.heappush(self._calendar, (timer.time, priority, next(self._seq), timer))
+
+    def schedule_at(self, time, callback, *args, priority=0):
+        """
+        call the callback at the absolute model time.
+        :param time: float, model time, not before now
+        :param callback: callable, called with args
+        :param priority: int, lower runs first among events at the same time
+        :return: SimTimer
+        """
+        if time < self._now:
+            raise ValueError('cannot schedule at {} before the current time {}'.format(time, self._now))
+        _timer = SimTimer(time, None, callback, args)
+        self._push(_timer, priority)
+        return _timer
+
+    def after(self, delay, callback, *args, priority=0):
+        """
+        call the callback once after the delay.
+        """
+        if delay < 0:
+            raise ValueError('delay must not be negative')
+        return self.schedule_at(self._now + delay, callback, *args, priority=priority)
+
+    def every(self, interval, callback, *args, priority=0, start_delay=None):
+        """
+        call the callback every interval until the timer is cancelled.
+        :param interval: float, period in model time
+        :param start_delay: float, delay of the first call, the interval by default
+        """
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+        _timer = SimTimer(self._now + (interval if start_delay is None else start_delay), interval, callback, args)
+        self._push(_timer, priority)
+        return _timer
+
+    def _drop_cancelled(self):
+        _calendar = self._calendar
+        while _calendar and _calendar[0][3].cancelled:
+            heapq.heappop(_calendar)
+
+    def _fire(self, entry):
+        _time, _priority, _, _timer = entry
+        self._now = _time
+        if _timer.interval is not None:
+            _timer.time = _time + _timer.interval
+            self._push(_timer, _priority)
+        self.eventCount += 1
+        _timer.callback(*_timer.args)
+
+    def step(self):
+        """
+        process the next event.
+        :return: bool, False if the calendar is empty
+        """
+        self._drop_cancelled()
+        if not self._calendar:
+            self.status = EnumSimulationStatus.FINISHED
+            return False
+        self._run_guarded(lambda: self._fire(heapq.heappop(self._calendar)))
+        return True
+
+    def run_until(self, end_time, max_events=None):
+        """
+        process the events up to and including the end time, the current
+        time is the end time afterwards unless stopped early.
+        :param end_time: float, model time
+        :param max_events: int, bound of processed events, optional
+        :return: int, count of processed events
+        """
+        self._stopRequested = False
+        self.status = EnumSimulationStatus.RUNNING
+        _calendar = self._calendar
+        _start_count = self.eventCount
+        _limit = None if max_events is None else _start_count + max_events
+
+        def _loop():
+            _pop = heapq.heappop
+            while _calendar and not self._stopRequested:
+                _entry = _calendar[0]
+                if _entry[3].cancelled:
+                    _pop(_calendar)
+                    continue
+                if _entry[0] > end_time or (_limit is not None and self.eventCount >= _limit):
+                    break
+                self._fire(_pop(_calendar))
+
+        self._run_guarded(_loop)
+        if self.status == EnumSimulationStatus.RUNNING:
+            if self._stopRequested or (_limit is not None and self.eventCount >= _limit):
+                self.status = EnumSimulationStatus.PAUSED
+            else:
+                if end_time != float('inf'):
+                    self._now = max(self._now, end_time)
+                self.status = EnumSimulationStatus.PAUSED if _calendar else EnumSimulationStatus.FINISHED
+        return self.eventCount - _start_count
+
+    def run_for(self, duration, max_events=None):
+        return self.run_until(self._now + duration, max_events)
+
+    def run(self, max_events=None):
+        """
+        process events until the calendar is empty or stopped.
+        """
+        return self.run_until(float('inf'), max_events)
+
+    def stop(self):
+        """
+        stop a running loop after the current event.
+        """
+        self._stopRequested = True
+
+    def _run_guarded(self, func):
+        try:
+            func()
+        except Exception as e:
+            self.status = EnumSimulationStatus.ERROR
+            self.lastError = e
+            raise
+
+    def reset(self, start_time=0.0):
+        self._calendar.clear()
+        self._now = start_time
+        self._stopRequested = False
+        self.status = EnumSimulationStatus.IDLE
+        self.eventCount = 0
+        self.lastError = None
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : stc_simulation.py
+# ------------------------------------------------------------------------------
+#
+# File          : stc_simulation.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from ..statechart import StatechartRuntime
+from .des_kernel import DESKernel
+
+
+class StatechartSimulation:
+    """
+    Runs a compiled statechart on the discrete event kernel.
+
+    the after/every timeouts of a state are started when the state is
+    entered and cancelled when it is left, external events are posted with
+    a delay in model time. with ``record_trace`` every taken transition is
+    recorded as ``(time, state name)``.
+    """
+
+    def __init__(self, compiled, kernel=None, context=None, record_trace=False):
+        self.compiled = compiled
+        self.kernel = kernel if kernel is not None else DESKernel()
+        self.runtime = StatechartRuntime(compiled, context)
+        self.runtime.set_transition_listener(self._on_transition)
+        self.trace = [] if record_trace else None
+        self._timeouts = compiled.timeouts
+        self._parent = compiled.parent
+        self._activeTimers = dict()
+
+    @property
+    def now(self):
+        return self.kernel.now
+
+    @property
+    def current_state(self):
+        return self.runtime.current_state
+
+    def start(self):
+        self.runtime.start()
+
+    def post(self, event, delay=0.0):
+        """
+        dispatch the event after the delay, unknown events are ignored.
+        :param event: str, event name
+        :param delay: float, model time delay
+        :return: SimTimer or None
+        """
+        _event_id = self.compiled.eventIds.get(event)
+        if _event_id is None:
+            return None
+        return self.kernel.after(delay, self.runtime.dispatch_id, _event_id)
+
+    def run_until(self, end_time, max_events=None):
+        return self.kernel.run_until(end_time, max_events)
+
+    def run_for(self, duration, max_events=None):
+        return self.kernel.run_for(duration, max_events)
+
+    def step(self):
+        return self.kernel.step()
+
+    def _on_transition(self, prev_leaf, domain, target_leaf):
+        _parent = self._parent
+        _s = prev_leaf
+        while _s != domain:
+            _timers = self._activeTimers.pop(_s, None)
+            if _timers:
+                for _timer in _timers:
+                    _timer.cancel()
+            _s = _parent[_s]
+        _s = target_leaf
+        _kernel = self.kernel
+        _dispatch = self.runtime.dispatch_id
+        while _s != domain:
+            if self._timeouts[_s]:
+                _timers = []
+                for _delay, _event_id, _repeat in self._timeouts[_s]:
+                    if _repeat:
+                        _timers.append(_kernel.every(_delay, _dispatch, _event_id))
+                    else:
+                        _timers.append(_kernel.after(_delay, _dispatch, _event_id))
+                self._activeTimers[_s] = _timers
+            _s = _parent[_s]
+        if self.trace is not None:
+            self.trace.append((_kernel.now, self.compiled.stateNames[target_leaf]))
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : __init__.py
+# ------------------------------------------------------------------------------
+#
+# File          : __init__.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from .compiler import (StatechartSpec, CompiledStatechart, compile_statechart, STATE_KIND_STATE,
+                       STATE_KIND_COMPOSITE, STATE_KIND_FINAL, COMPLETION_EVENT)
+from .runtime import StatechartRuntime
+from .session_adapter import statechart_spec_from_session
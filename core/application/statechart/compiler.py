@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : compiler.py
+# ------------------------------------------------------------------------------
+#
+# File          : compiler.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from array import array
+from ..core.exceptions import StatechartCompileError
+from ..utils_helper import util_py_script_compile
+
+STATE_KIND_STATE = 'state'
+STATE_KIND_COMPOSITE = 'composite'
+STATE_KIND_FINAL = 'final'
+# event id 0, transitions without event, taken after the target is entered,
+# for a composite state after its final sub state is entered.
+COMPLETION_EVENT = None
+ROOT_STATE_ID = 0
+
+
+def _as_guard(guard):
+    if guard is None or callable(guard):
+        return guard
+    _code = compile(guard, '<guard>', 'eval')
+    return lambda ctx, _c=_code: eval(_c, ctx)
+
+
+def _as_action(action):
+    if action is None or callable(action):
+        return action
+    _code = util_py_script_compile(action)
+    return lambda ctx, _c=_code: exec(_c, ctx)
+
+
+class StatechartSpec:
+    """
+    Plain description of a hierarchical statechart, the input of
+    :func:`compile_statechart`.
+
+    guards and actions are callables taking the context dict or python
+    source strings, guards are expressions, actions are statements, both
+    evaluated with the context dict as globals.
+    """
+
+    def __init__(self, name='statechart'):
+        self.name = name
+        self.states = dict()
+        self.transitions = []
+        self.timeouts = []
+
+    def add_state(self, name, parent=None, kind=STATE_KIND_STATE, initial=False, entry=None, exit=None):
+        """
+        :param name: str, unique state name
+        :param parent: str, name of the composite parent state, None for top level
+        :param kind: str, one of STATE_KIND_*
+        :param initial: bool, initial state of its parent
+        :param entry: callable or str, entry action
+        :param exit: callable or str, exit action
+        """
+        if name in self.states:
+            raise StatechartCompileError('state "{}" already defined'.format(name))
+        self.states[name] = {'parent': parent, 'kind': kind, 'initial': initial, 'entry': entry, 'exit': exit}
+        return self
+
+    def set_initial(self, name):
+        """
+        mark the state as the initial state of its parent.
+        """
+        _parent = self.states[name]['parent']
+        for _st in self.states.values():
+            if _st['parent'] == _parent:
+                _st['initial'] = False
+        self.states[name]['initial'] = True
+
+    def add_transition(self, source, target, event=COMPLETION_EVENT, guard=None, action=None):
+        """
+        :param source: str, source state name
+        :param target: str, target state name
+        :param event: str, trigger event, None for a completion transition
+        :param guard: callable or str, guard condition
+        :param action: callable or str, transition action
+        """
+        self.transitions.append((source, target, event, guard, action))
+        return self
+
+    def add_timeout(self, state, delay, event, repeat=False):
+        """
+        raise the event after the delay (after) or every delay (every) while
+        the state is active, timers are started on entry and stopped on exit.
+        :param state: str, state name
+        :param delay: float, delay in model time units
+        :param event: str, event raised on timeout
+        :param repeat: bool, every instead of after
+        """
+        if delay <= 0:
+            raise StatechartCompileError('timeout of "{}" must be positive'.format(state))
+        self.timeouts.append((state, delay, event, repeat))
+        return self
+
+
+class CompiledStatechart:
+    """
+    Statechart compiled into flat integer indexed tables.
+
+    states are numbered 1..n, 0 is the implicit root. ``parent``, ``depth``
+    and ``initialChild`` are arrays indexed by state id. dispatch is a list
+    lookup at ``leaf * eventCount + event``, the entry holds the candidate
+    transitions of the leaf and its ancestors, innermost first, each with
+    its guard, the resolved exit/action/entry callables, the target leaf
+    and the transition domain, so no hierarchy walk is done at run time.
+    completion transitions of a composite are only listed for its final
+    sub states.
+    """
+
+    def __init__(self, name, state_names, parent, depth, initial_child, kinds, event_ids, table, initial_ops,
+                 initial_leaf, transition_count, timeouts):
+        self.name = name
+        self.stateNames = state_names
+        self.stateIds = {n: i for i, n in enumerate(state_names)}
+        self.parent = parent
+        self.depth = depth
+        self.initialChild = initial_child
+        self.kinds = kinds
+        self.eventIds = event_ids
+        self.eventCount = len(event_ids) + 1
+        self.table = table
+        self.initialOps = initial_ops
+        self.initialLeaf = initial_leaf
+        self.transitionCount = transition_count
+        # per state id, tuple of (delay, event id, repeat).
+        self.timeouts = timeouts
+
+    @property
+    def state_count(self):
+        return len(self.stateNames) - 1
+
+    def event_id(self, event):
+        return 0 if event is COMPLETION_EVENT else self.eventIds[event]
+
+    def configuration_of(self, leaf):
+        """
+        Returns the active state ids from the leaf up to the top level.
+        """
+        _ids = []
+        while leaf != ROOT_STATE_ID:
+            _ids.append(leaf)
+            leaf = self.parent[leaf]
+        return _ids
+
+    def enabled_entries(self, leaf, event_id):
+        return self.table[leaf * self.eventCount + event_id]
+
+
+def _lca(parent, depth, a, b):
+    while depth[a] > depth[b]:
+        a = parent[a]
+    while depth[b] > depth[a]:
+        b = parent[b]
+    while a != b:
+        a, b = parent[a], parent[b]
+    return a
+
+
+def _is_ancestor(parent, ancestor, state):
+    while state != ROOT_STATE_ID:
+        if state == ancestor:
+            return True
+        state = parent[state]
+    return ancestor == ROOT_STATE_ID
+
+
+def compile_statechart(spec):
+    """
+    compile the statechart description into flat tables.
+    :param spec: StatechartSpec
+    :return: CompiledStatechart
+    """
+    _names = [None] + list(spec.states.keys())
+    _ids = {n: i for i, n in enumerate(_names) if i}
+    _count = len(_names)
+    _parent = array('i', [-1] * _count)
+    _depth = array('i', [0] * _count)
+    _initial = array('i', [0] * _count)
+    _kinds = [None] * _count
+    _entry = [None] * _count
+    _exit = [None] * _count
+    for _name, _st in spec.states.items():
+        _id = _ids[_name]
+        if _st['parent'] is not None and _st['parent'] not in _ids:
+            raise StatechartCompileError('parent "{}" of state "{}" is not defined'.format(_st['parent'], _name))
+        _parent[_id] = _ids[_st['parent']] if _st['parent'] is not None else ROOT_STATE_ID
+        _kinds[_id] = _st['kind']
+        _entry[_id] = _as_action(_st['entry'])
+        _exit[_id] = _as_action(_st['exit'])
+    _children = [[] for _ in range(_count)]
+    for _id in range(1, _count):
+        _children[_parent[_id]].append(_id)
+        _d, _p = 0, _id
+        while _p != ROOT_STATE_ID:
+            _p = _parent[_p]
+            _d += 1
+            if _d > _count:
+                raise StatechartCompileError('state hierarchy of "{}" is cyclic'.format(_names[_id]))
+        _depth[_id] = _d
+    for _name, _st in spec.states.items():
+        if not _st['initial']:
+            continue
+        _id = _ids[_name]
+        if _initial[_parent[_id]]:
+            raise StatechartCompileError('"{}" has more than one initial state'.format(
+                _st['parent'] or spec.name))
+        _initial[_parent[_id]] = _id
+    for _id in range(_count):
+        if _children[_id] and not _initial[_id]:
+            raise StatechartCompileError('"{}" has no initial state'.format(_names[_id] or spec.name))
+        if _children[_id] and _kinds[_id] == STATE_KIND_FINAL:
+            raise StatechartCompileError('final state "{}" can not have sub states'.format(_names[_id]))
+
+    def _descend(state, ops):
+        # default entry into the state, returns the reached leaf.
+        while _children[state]:
+            state = _initial[state]
+            if _entry[state] is not None:
+                ops.append(_entry[state])
+        return state
+
+    _leaves = [i for i in range(1, _count) if not _children[i]]
+    _event_ids = dict()
+    _by_source = [[] for _ in range(_count)]
+    for _source, _target, _event, _guard, _action in spec.transitions:
+        if _source not in _ids or _target not in _ids:
+            raise StatechartCompileError('transition {} -> {} refers to an undefined state'.format(_source, _target))
+        if _event is not COMPLETION_EVENT and _event not in _event_ids:
+            _event_ids[_event] = len(_event_ids) + 1
+        _by_source[_ids[_source]].append(
+            (_ids[_target], 0 if _event is COMPLETION_EVENT else _event_ids[_event], _as_guard(_guard),
+             _as_action(_action)))
+    _timeouts = [()] * _count
+    for _state, _delay, _event, _repeat in spec.timeouts:
+        if _state not in _ids:
+            raise StatechartCompileError('timeout refers to the undefined state "{}"'.format(_state))
+        if _event not in _event_ids:
+            _event_ids[_event] = len(_event_ids) + 1
+        _timeouts[_ids[_state]] += ((_delay, _event_ids[_event], _repeat),)
+    _event_count = len(_event_ids) + 1
+    _table = [None] * (_count * _event_count)
+    for _leaf in _leaves:
+        _state = _leaf
+        while _state != ROOT_STATE_ID:
+            for _target, _event_id, _guard, _action in _by_source[_state]:
+                if _event_id == 0 and _state != _leaf and not (
+                        _kinds[_leaf] == STATE_KIND_FINAL and _parent[_leaf] == _state):
+                    # a composite completes only once its final sub state is active.
+                    continue
+                _domain = _lca(_parent, _depth, _state, _target)
+                if _domain == _state or _domain == _target:
+                    # external transition, leave and re-enter the main source/target.
+                    _domain = _parent[_domain]
+                _ops = []
+                _s = _leaf
+                while _s != _domain:
+                    if _exit[_s] is not None:
+                        _ops.append(_exit[_s])
+                    _s = _parent[_s]
+                if _action is not None:
+                    _ops.append(_action)
+                _path = []
+                _s = _target
+                while _s != _domain:
+                    _path.append(_s)
+                    _s = _parent[_s]
+                for _s in reversed(_path):
+                    if _entry[_s] is not None:
+                        _ops.append(_entry[_s])
+                _target_leaf = _descend(_target, _ops)
+                _key = _leaf * _event_count + _event_id
+                if _table[_key] is None:
+                    _table[_key] = []
+                _table[_key].append((_guard, tuple(_ops), _target_leaf, _domain))
+            _state = _parent[_state]
+    for _i, _entries in enumerate(_table):
+        if _entries is not None:
+            _table[_i] = tuple(_entries)
+    _initial_ops = []
+    if _entry[_initial[ROOT_STATE_ID]] is not None:
+        _initial_ops.append(_entry[_initial[ROOT_STATE_ID]])
+    _initial_leaf = _descend(_initial[ROOT_STATE_ID], _initial_ops)
+    _names[ROOT_STATE_ID] = '<root>'
+    return CompiledStatechart(spec.name, _names, _parent, _depth, _initial, _kinds, _event_ids, _table,
+                              tuple(_initial_ops), _initial_leaf, len(spec.transitions), _timeouts)
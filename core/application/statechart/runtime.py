@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : runtime.py
+# ------------------------------------------------------------------------------
+#
+# File          : runtime.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from ..core.exceptions import StatechartError
+from .compiler import ROOT_STATE_ID
+
+
+class StatechartRuntime:
+    """
+    Executes a :class:`CompiledStatechart`.
+
+    the runtime state is the id of the active leaf, a dispatch is a table
+    lookup, the guard checks of the candidates and the call of their
+    precomputed action sequence. completion transitions are taken right
+    after a state is entered, those of a composite state after its final
+    sub state is entered (run to completion).
+
+    an optional transition listener is called as
+    ``listener(prev_leaf, domain, target_leaf)`` for every taken transition,
+    the states between a leaf and the domain are the exited respectively
+    entered ones.
+    """
+    # bound of chained completion transitions, protects against livelocks.
+    MAX_COMPLETION_STEPS = 1000
+
+    def __init__(self, compiled, context=None):
+        self.compiled = compiled
+        self.context = context if context is not None else dict()
+        self.stepCount = 0
+        self._table = compiled.table
+        self._eventCount = compiled.eventCount
+        self._eventIds = compiled.eventIds
+        self._hasCompletion = bytearray(
+            compiled.table[i * compiled.eventCount] is not None for i in range(len(compiled.stateNames)))
+        self._leaf = ROOT_STATE_ID
+        self._listener = None
+
+    def set_transition_listener(self, listener):
+        self._listener = listener
+
+    @property
+    def started(self):
+        return self._leaf != ROOT_STATE_ID
+
+    @property
+    def leaf(self):
+        return self._leaf
+
+    @property
+    def current_state(self):
+        return self.compiled.stateNames[self._leaf] if self._leaf != ROOT_STATE_ID else None
+
+    @property
+    def configuration(self):
+        """
+        names of the active states, innermost first.
+        """
+        return [self.compiled.stateNames[i] for i in self.compiled.configuration_of(self._leaf)]
+
+    def is_in(self, state_name):
+        _id = self.compiled.stateIds.get(state_name)
+        if _id is None:
+            return False
+        _s = self._leaf
+        _parent = self.compiled.parent
+        while _s != ROOT_STATE_ID:
+            if _s == _id:
+                return True
+            _s = _parent[_s]
+        return False
+
+    def start(self):
+        """
+        enter the initial configuration.
+        """
+        for _op in self.compiled.initialOps:
+            _op(self.context)
+        self._leaf = self.compiled.initialLeaf
+        if self._listener is not None:
+            self._listener(ROOT_STATE_ID, ROOT_STATE_ID, self._leaf)
+        if self._hasCompletion[self._leaf]:
+            self._complete()
+
+    def snapshot(self):
+        return self._leaf
+
+    def restore(self, leaf):
+        """
+        set the active leaf without running any action, see :meth:`snapshot`.
+        """
+        self._leaf = leaf
+
+    def dispatch(self, event):
+        """
+        process one event, unknown events are ignored.
+        :param event: str, event name
+        :return: bool, True if a transition was taken
+        """
+        _event_id = self._eventIds.get(event)
+        if _event_id is None:
+            return False
+        return self.dispatch_id(_event_id)
+
+    def dispatch_id(self, event_id):
+        """
+        process one event by its id, see :meth:`CompiledStatechart.event_id`.
+        """
+        _entries = self._table[self._leaf * self._eventCount + event_id]
+        if _entries is None:
+            return False
+        _ctx = self.context
+        for _guard, _ops, _target, _domain in _entries:
+            if _guard is None or _guard(_ctx):
+                for _op in _ops:
+                    _op(_ctx)
+                _prev = self._leaf
+                self._leaf = _target
+                self.stepCount += 1
+                if self._listener is not None:
+                    self._listener(_prev, _domain, _target)
+                if self._hasCompletion[_target]:
+                    self._complete()
+                return True
+        return False
+
+    def _complete(self):
+        _table = self._table
+        _event_count = self._eventCount
+        _ctx = self.context
+        for _ in range(self.MAX_COMPLETION_STEPS):
+            _entries = _table[self._leaf * _event_count]
+            if _entries is None:
+                return
+            for _guard, _ops, _target, _domain in _entries:
+                if _guard is None or _guard(_ctx):
+                    for _op in _ops:
+                        _op(_ctx)
+                    _prev = self._leaf
+                    self._leaf = _target
+                    self.stepCount += 1
+                    if self._listener is not None:
+                        self._listener(_prev, _domain, _target)
+                    break
+            else:
+                return
+        raise StatechartError('more than {} completion transitions in a row at "{}"'.format(
+            self.MAX_COMPLETION_STEPS, self.current_state))
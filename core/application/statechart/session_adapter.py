@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : session_adapter.py
+# ------------------------------------------------------------------------------
+#
+# File          : session_adapter.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from collections import Counter
+from .compiler import StatechartSpec, STATE_KIND_STATE, STATE_KIND_COMPOSITE
+
+# node class names of the stc editor, ``NodeObject.type_`` is the namespace
+# followed by the class name, matched on the part after the namespace.
+STC_NODE_STATE = 'STCStateNode'
+STC_NODE_COMPOSITE_STATE = 'STCCompositeStateNode'
+STC_NODE_INITIAL_STATE = 'STCInitialStateNode'
+
+
+def _type_name(type_):
+    return type_.rsplit('.', 1)[-1]
+
+
+def _collect(session, parent, out_states, out_connections, out_initials):
+    for _node_id, _n_data in session.get('nodes', {}).items():
+        _type = _type_name(_n_data.get('type_', ''))
+        if _type == STC_NODE_INITIAL_STATE:
+            out_initials[_node_id] = parent
+            continue
+        if _type not in (STC_NODE_STATE, STC_NODE_COMPOSITE_STATE):
+            continue
+        out_states[_node_id] = (_n_data, parent, _type)
+        _sub = _n_data.get('sub_graph')
+        if _sub:
+            _collect(_sub, _node_id, out_states, out_connections, out_initials)
+    out_connections.extend(session.get('connections', []))
+
+
+def statechart_spec_from_session(session, name='statechart'):
+    """
+    build the statechart description from a stc node graph session, the
+    format of ``NodeGraph._serialize``.
+
+    states are the state and composite state nodes, the children of a
+    composite state are read from its ``sub_graph`` session. the connection
+    of an initial state node marks the initial state of its level. a
+    connection is a transition, it may carry ``event``, ``guard`` and
+    ``action`` keys, entry and exit actions are the ``entry`` and ``exit``
+    node properties. states are named by their label, labels used more than
+    once get the node id appended.
+    :param session: dict, serialized node graph
+    :param name: str, name of the statechart
+    :return: StatechartSpec
+    """
+    _states = dict()
+    _connections = []
+    _initials = dict()
+    _collect(session, None, _states, _connections, _initials)
+    _labels = {_node_id: _n_data.get('label') or _node_id for _node_id, (_n_data, _, _) in _states.items()}
+    _label_count = Counter(_labels.values())
+    _names = dict()
+    for _node_id, _label in _labels.items():
+        _names[_node_id] = _label if _label_count[_label] == 1 else '{}:{}'.format(_label, _node_id)
+    _spec = StatechartSpec(name)
+
+    def _add(node_id):
+        if _names[node_id] in _spec.states:
+            return
+        _n_data, _parent, _type = _states[node_id]
+        if _parent is not None:
+            _add(_parent)
+        _props = _n_data.get('properties', {})
+        _spec.add_state(_names[node_id], parent=_names[_parent] if _parent is not None else None,
+                        kind=STATE_KIND_COMPOSITE if _type == STC_NODE_COMPOSITE_STATE else STATE_KIND_STATE,
+                        entry=_props.get('entry') or None, exit=_props.get('exit') or None)
+
+    for _node_id in _states:
+        _add(_node_id)
+    for _conn in _connections:
+        _src_id, _trg_id = _conn['out'][0], _conn['in'][0]
+        if _trg_id not in _states:
+            continue
+        if _src_id in _initials:
+            _spec.set_initial(_names[_trg_id])
+        elif _src_id in _states:
+            _spec.add_transition(_names[_src_id], _names[_trg_id], event=_conn.get('event'),
+                                 guard=_conn.get('guard') or None, action=_conn.get('action') or None)
+    return _spec
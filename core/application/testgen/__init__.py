@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : __init__.py
+# ------------------------------------------------------------------------------
+#
+# File          : __init__.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from .fsm_graph import FSMGraph, fsm_graph_from_statechart
+from .fsm_tour import (FSMTestGenerator, FSMTestSuite, postman_circuit, COVERAGE_ALL_STATES, COVERAGE_ALL_TRANSITIONS,
+                       COVERAGE_TRANSITION_PAIRS)
+from .covering_array import CoveringArrayGenerator, CoveringArray, covering_array
+from .random_walk import RandomWalkGenerator, RandomWalkResult
+from .fd_solver import FDSolver, GuardSolver
+from .coverage import (CoverageSpace, CoverageMap, bitmap_of, iter_bits, popcount, COVERAGE_STATE, COVERAGE_TRANSITION,
+                       COVERAGE_GUARD, COVERAGE_PARAMETER)
+from .suite_minimizer import SuiteMinimizer, MinimizedSuite, PrioritizedSuite
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : coverage.py
+# ------------------------------------------------------------------------------
+#
+# File          : coverage.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from array import array
+from ..core.exceptions import TestGenerationError
+from ..ipod.class_iod import IPODInput
+
+COVERAGE_STATE = 'state'
+COVERAGE_TRANSITION = 'transition'
+COVERAGE_GUARD = 'guard'
+COVERAGE_PARAMETER = 'parameter'
+
+if hasattr(int, 'bit_count'):
+    def popcount(bits):
+        return bits.bit_count()
+else:
+    def popcount(bits):
+        return bin(bits).count('1')
+
+
+def bitmap_of(indices):
+    """
+    Returns the int bitmap with the bits of the indices set.
+    """
+    _indices = list(indices)
+    if not _indices:
+        return 0
+    _buf = bytearray((max(_indices) >> 3) + 1)
+    for _i in _indices:
+        _buf[_i >> 3] |= 1 << (_i & 7)
+    return int.from_bytes(_buf, 'little')
+
+
+def iter_bits(bits):
+    """
+    Yields the indices of the set bits in ascending order, the bitmap is
+    scanned bytewise, so the cost is linear in its size plus the count of
+    set bits.
+    """
+    _data = bits.to_bytes((bits.bit_length() + 7) >> 3, 'little')
+    for _k, _byte in enumerate(_data):
+        if _byte:
+            _base = _k << 3
+            for _j in range(8):
+                if _byte >> _j & 1:
+                    yield _base + _j
+
+
+class CoverageSpace:
+    """
+    Numbering of the coverable elements.
+
+    every element, a (kind, key) pair, gets an index, a coverage is an
+    int bitmap over the indices. the kinds are the states and
+    transitions of a FSMGraph (keyed by their ids), the outcomes of the
+    guarded transitions (keyed by (transition, bool)) and the values of
+    the IPOD parameters (keyed by (name, value index)). ``masks`` holds
+    the bitmap of all elements of a kind.
+    """
+
+    def __init__(self):
+        self.elements = []
+        self._index = dict()
+        self.masks = dict()
+        self.graph = None
+        self._stepIndices = None
+        self._parameterValues = dict()
+
+    def __len__(self):
+        return len(self.elements)
+
+    def add(self, kind, key):
+        _element = (kind, key)
+        _i = self._index.get(_element)
+        if _i is None:
+            _i = self._index[_element] = len(self.elements)
+            self.elements.append(_element)
+            self.masks[kind] = self.masks.get(kind, 0) | (1 << _i)
+        return _i
+
+    def index_of(self, kind, key):
+        try:
+            return self._index[(kind, key)]
+        except KeyError:
+            raise TestGenerationError('no coverage element {} {!r}'.format(kind, key))
+
+    def element(self, index):
+        return self.elements[index]
+
+    def add_graph(self, graph):
+        """
+        add the states, transitions and guard outcomes of the FSMGraph.
+        """
+        self.graph = graph
+        for _s in range(graph.state_count):
+            self.add(COVERAGE_STATE, _s)
+        self._stepIndices = []
+        for _t in range(graph.transition_count):
+            self._stepIndices.append((self.add(COVERAGE_TRANSITION, _t),
+                                      self._index[(COVERAGE_STATE, graph.targets[_t])]))
+        for _t in range(graph.transition_count):
+            if graph.guards[_t] is not None:
+                self.add(COVERAGE_GUARD, (_t, True))
+                self.add(COVERAGE_GUARD, (_t, False))
+        return self
+
+    def add_parameters(self, parameters):
+        """
+        :param parameters: IPODInput or iterable of (name, values)
+        """
+        if isinstance(parameters, IPODInput):
+            parameters = [(d.name, d.values) for d in parameters.data]
+        for _name, _values in parameters:
+            _values = list(_values)
+            self._parameterValues[_name] = {v: k for k, v in enumerate(_values)}
+            for _k in range(len(_values)):
+                self.add(COVERAGE_PARAMETER, (_name, _k))
+        return self
+
+    def new_map(self, counts=False):
+        return CoverageMap(self, counts=counts)
+
+    def sequence_indices(self, sequence):
+        """
+        Returns the indices covered by a transition sequence from the initial state.
+        """
+        if self._stepIndices is None:
+            raise TestGenerationError('no graph in the coverage space')
+        _steps = self._stepIndices
+        _indices = [self._index[(COVERAGE_STATE, self.graph.initial)]]
+        for _t in sequence:
+            _indices.extend(_steps[_t])
+        return _indices
+
+    def guard_index(self, transition, outcome):
+        return self._index[(COVERAGE_GUARD, (transition, bool(outcome)))]
+
+    def parameter_indices(self, values):
+        """
+        Returns the indices of a dict of parameter name: value.
+        """
+        _indices = []
+        for _name, _value in values.items():
+            _k = self._parameterValues.get(_name, {}).get(_value)
+            if _k is not None:
+                _indices.append(self._index[(COVERAGE_PARAMETER, (_name, _k))])
+        return _indices
+
+    def sequence_bitmap(self, sequence):
+        return bitmap_of(self.sequence_indices(sequence))
+
+
+class CoverageMap:
+    """
+    Coverage as int bitmap over a CoverageSpace, with optional hit counts.
+
+    union, intersection and difference are single big int operations,
+    linear in the bitmap size over machine words. the hit counts (an
+    array per element) are only touched for the elements hit, so merging
+    a run costs its count of covered elements.
+    """
+
+    def __init__(self, space, bits=0, counts=False):
+        self.space = space
+        self.bits = bits
+        self.counts = array('L', [0]) * len(space) if counts else None
+
+    def copy(self):
+        _copy = CoverageMap(self.space, self.bits)
+        if self.counts is not None:
+            _copy.counts = array('L', self.counts)
+        return _copy
+
+    def _grow_counts(self):
+        if len(self.counts) < len(self.space):
+            self.counts.extend([0] * (len(self.space) - len(self.counts)))
+
+    def hit(self, indices):
+        """
+        record the elements hit, repeated indices count repeatedly.
+        :return: int, count of newly covered elements
+        """
+        _indices = list(indices)
+        _bits = bitmap_of(_indices)
+        _new = popcount(_bits & ~self.bits)
+        self.bits |= _bits
+        if self.counts is not None:
+            self._grow_counts()
+            _counts = self.counts
+            for _i in _indices:
+                _counts[_i] += 1
+        return _new
+
+    def hit_sequence(self, sequence):
+        return self.hit(self.space.sequence_indices(sequence))
+
+    def merge(self, other):
+        """
+        add the coverage and the hit counts of another map (or bitmap).
+        :return: int, count of newly covered elements
+        """
+        _bits = other.bits if isinstance(other, CoverageMap) else other
+        _new = popcount(_bits & ~self.bits)
+        self.bits |= _bits
+        if self.counts is not None:
+            self._grow_counts()
+            _counts = self.counts
+            if isinstance(other, CoverageMap) and other.counts is not None:
+                for _i in iter_bits(_bits):
+                    _counts[_i] += other.counts[_i]
+            else:
+                for _i in iter_bits(_bits):
+                    _counts[_i] += 1
+        return _new
+
+    def gain(self, bits):
+        """
+        Returns the count of elements a test (bitmap) would newly cover.
+        """
+        return popcount(bits & ~self.bits)
+
+    def union(self, other):
+        return CoverageMap(self.space, self.bits | _bits_of(other))
+
+    def intersection(self, other):
+        return CoverageMap(self.space, self.bits & _bits_of(other))
+
+    def difference(self, other):
+        return CoverageMap(self.space, self.bits & ~_bits_of(other))
+
+    def __contains__(self, index):
+        return bool(self.bits >> index & 1)
+
+    def covered(self, kind=None):
+        if kind is None:
+            return popcount(self.bits)
+        return popcount(self.bits & self.space.masks.get(kind, 0))
+
+    def ratio(self, kind=None):
+        _total = len(self.space) if kind is None else popcount(self.space.masks.get(kind, 0))
+        return self.covered(kind) / _total if _total else 1.0
+
+    def uncovered(self, kind=None):
+        """
+        Returns the (kind, key) elements not covered.
+        """
+        _mask = (1 << len(self.space)) - 1 if kind is None else self.space.masks.get(kind, 0)
+        return [self.space.elements[i] for i in iter_bits(_mask & ~self.bits)]
+
+    def heatmap(self, kind):
+        """
+        Returns a dict of key: hit count of the elements of the kind, e.g.
+        state id: count for an overlay of the state chart view.
+        """
+        if self.counts is None:
+            raise TestGenerationError('coverage map without hit counts')
+        self._grow_counts()
+        return {self.space.elements[i][1]: self.counts[i] for i in iter_bits(self.space.masks.get(kind, 0))}
+
+    def to_bytes(self):
+        return self.bits.to_bytes((len(self.space) + 7) >> 3, 'little')
+
+    @classmethod
+    def from_bytes(cls, space, data):
+        return cls(space, int.from_bytes(data, 'little'))
+
+    def summary(self):
+        return ', '.join('{} {}/{}'.format(k, self.covered(k), popcount(m)) for k, m in self.space.masks.items())
+
+
+def _bits_of(other):
+    return other.bits if isinstance(other, CoverageMap) else other
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : covering_array.py
+# ------------------------------------------------------------------------------
+#
+# File          : covering_array.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import random
+from itertools import combinations, product
+from ..core.exceptions import TestGenerationError
+from ..ipod.class_iod import IPODInput, IPODData
+
+
+def _as_parameters(parameters):
+    # IPODInput, iterable of IPODData or of (name, values).
+    if isinstance(parameters, IPODInput):
+        parameters = parameters.data
+    _params = []
+    for _p in parameters:
+        if isinstance(_p, IPODData):
+            _params.append((_p.name, list(_p.values)))
+        else:
+            _params.append((_p[0], list(_p[1])))
+    return _params
+
+
+class CoveringArray:
+    def __init__(self, names, domains, rows, strength, tuple_count, infeasible):
+        self.names = names
+        self.domains = domains
+        # per row the value index of every parameter.
+        self.rows = rows
+        self.strength = strength
+        # count of t-tuples to cover and of those excluded by the constraints.
+        self.tupleCount = tuple_count
+        self.infeasible = infeasible
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.as_dicts())
+
+    def as_dicts(self):
+        return [{n: d[v] for n, d, v in zip(self.names, self.domains, _row)} for _row in self.rows]
+
+    def __repr__(self):
+        return '<CoveringArray t={}: {} rows, {} parameters>'.format(self.strength, len(self.rows), len(self.names))
+
+
+class CoveringArrayGenerator:
+    """
+    IPOG t-wise covering array generator (Lei et al., "IPOG: a general
+    strategy for t-way software testing", 2007).
+
+    the parameters are taken in descending domain size, the first t give
+    all their combinations, then each further parameter is added to the
+    existing rows (horizontal growth, the value covering most missing
+    tuples) and the tuples left are put into rows with free cells or new
+    rows (vertical growth). the missing tuples with the new parameter are
+    tracked per combination of the other t-1 parameters as a list of value
+    bitmasks. constraints are (names, predicate) pairs, a row is only kept
+    if its free cells can still be assigned without violating one, tuples
+    for which no valid row exists are counted as infeasible. seed rows,
+    possibly partial dicts of name: value, are taken as they are.
+    """
+
+    def __init__(self, parameters, strength=2, constraints=None, seeds=None, random_seed=0):
+        """
+        :param parameters: IPODInput, iterable of IPODData or of (name, values)
+        :param strength: int, t
+        :param constraints: list of (names, predicate(*values)), the constraints of an IPODInput are added
+        :param seeds: list of dict name: value, rows which must be part of the suite
+        :param random_seed: int, for the tie breaks
+        """
+        _params = _as_parameters(parameters)
+        _constraints = list(constraints or [])
+        if isinstance(parameters, IPODInput):
+            _constraints.extend(parameters.constraints)
+        if strength < 1:
+            raise TestGenerationError('strength must be at least 1')
+        if strength > len(_params):
+            raise TestGenerationError('strength {} exceeds the count of parameters'.format(strength))
+        for _name, _values in _params:
+            if not _values:
+                raise TestGenerationError('parameter "{}" has no values'.format(_name))
+        self.names = [n for n, _ in _params]
+        if len(set(self.names)) != len(self.names):
+            raise TestGenerationError('parameter names must be unique')
+        self.domains = [v for _, v in _params]
+        self.strength = strength
+        self._rng = random.Random(random_seed)
+        # internal column order, larger domains first.
+        self._order = sorted(range(len(_params)), key=lambda i: -len(self.domains[i]))
+        _col_of = {self.names[p]: c for c, p in enumerate(self._order)}
+        self._sizes = [len(self.domains[p]) for p in self._order]
+        self._constraints = []
+        self._consByCol = [[] for _ in self._order]
+        for _names, _predicate in _constraints:
+            try:
+                _cols = tuple(_col_of[n] for n in _names)
+            except KeyError as e:
+                raise TestGenerationError('constraint refers to the unknown parameter {}'.format(e))
+            _entry = (_cols, _predicate)
+            self._constraints.append(_entry)
+            for _c in set(_cols):
+                self._consByCol[_c].append(_entry)
+        self._constrainedCols = sorted({c for _cols, _ in self._constraints for c in _cols})
+        self._seeds = []
+        for _seed in seeds or ():
+            _row = [None] * len(self._order)
+            for _name, _value in _seed.items():
+                if _name not in _col_of:
+                    raise TestGenerationError('seed refers to the unknown parameter "{}"'.format(_name))
+                _c = _col_of[_name]
+                try:
+                    _row[_c] = self.domains[self._order[_c]].index(_value)
+                except ValueError:
+                    raise TestGenerationError('seed value {!r} not in the domain of "{}"'.format(_value, _name))
+            if not self._completable(_row):
+                raise TestGenerationError('seed {} violates the constraints'.format(_seed))
+            self._seeds.append(_row)
+
+    def _value(self, col, index):
+        return self.domains[self._order[col]][index]
+
+    def _check_col(self, row, col):
+        # constraints at col with all their cells assigned.
+        for _cols, _predicate in self._consByCol[col]:
+            _values = []
+            for _c in _cols:
+                if row[_c] is None:
+                    break
+                _values.append(self._value(_c, row[_c]))
+            else:
+                if not _predicate(*_values):
+                    return False
+        return True
+
+    def _completable(self, row, fill=False):
+        """
+        whether the free constrained cells of the row can be assigned, by
+        backtracking over them. with fill the row gets the assignment.
+        """
+        if not self._constraints:
+            return True
+        for _c in self._constrainedCols:
+            if row[_c] is not None and not self._check_col(row, _c):
+                return False
+        _free = [c for c in self._constrainedCols if row[c] is None]
+        if not _free:
+            return True
+        _work = list(row)
+        _pos = [0] * len(_free)
+        _k = 0
+        while 0 <= _k < len(_free):
+            _c = _free[_k]
+            if _pos[_k] >= self._sizes[_c]:
+                _work[_c] = None
+                _pos[_k] = 0
+                _k -= 1
+                if _k >= 0:
+                    _pos[_k] += 1
+                continue
+            _work[_c] = _pos[_k]
+            if self._check_col(_work, _c):
+                _k += 1
+            else:
+                _pos[_k] += 1
+        if _k < 0:
+            return False
+        if fill:
+            row[:] = _work
+        return True
+
+    def _fits(self, row, assignment):
+        # row agrees with or is free at the (col, value) pairs and stays completable.
+        _changed = []
+        for _c, _v in assignment:
+            if row[_c] is None:
+                row[_c] = _v
+                _changed.append(_c)
+            elif row[_c] != _v:
+                for _u in _changed:
+                    row[_u] = None
+                return False
+        _ok = self._completable(row)
+        for _u in _changed:
+            row[_u] = None
+        return _ok
+
+    def _initial_rows(self, t):
+        _rows = [list(r) for r in self._seeds]
+        _cols = list(range(t))
+        _infeasible = 0
+        for _values in product(*[range(self._sizes[c]) for c in _cols]):
+            _assignment = list(zip(_cols, _values))
+            if any(all(r[c] == v for c, v in _assignment) for r in _rows):
+                continue
+            for _row in _rows:
+                if all(_row[c] is None or _row[c] == v for c, v in _assignment) \
+                        and self._fits(_row, _assignment):
+                    for _c, _v in _assignment:
+                        _row[_c] = _v
+                    break
+            else:
+                _row = [None] * len(self._order)
+                if self._fits(_row, _assignment):
+                    for _c, _v in _assignment:
+                        _row[_c] = _v
+                    _rows.append(_row)
+                else:
+                    _infeasible += 1
+        return _rows, _infeasible
+
+    def generate(self):
+        """
+        :return: CoveringArray
+        """
+        _t = self.strength
+        _n = len(self._order)
+        _sizes = self._sizes
+        _rows, _infeasible = self._initial_rows(_t)
+        _tuple_count = 1
+        for _c in range(_t):
+            _tuple_count *= _sizes[_c]
+        _rng = self._rng
+        for _i in range(_t, _n):
+            _size_i = _sizes[_i]
+            _full = (1 << _size_i) - 1
+            # per combination of t-1 earlier columns: the radix of its cells and
+            # per value combination the bitmask of the missing values of column i.
+            _combos = []
+            for _cols in combinations(range(_i), _t - 1):
+                _radix = []
+                _count = 1
+                for _c in reversed(_cols):
+                    _radix.append(_count)
+                    _count *= _sizes[_c]
+                _radix.reverse()
+                _combos.append((_cols, tuple(_radix), [_full] * _count))
+                _tuple_count += _count * _size_i
+            # horizontal growth, ties go to the least used value.
+            _used = [0] * _size_i
+            for _row in _rows:
+                _keys = []
+                for _cols, _radix, _missing in _combos:
+                    _key = 0
+                    for _c, _r in zip(_cols, _radix):
+                        if _row[_c] is None:
+                            break
+                        _key += _row[_c] * _r
+                    else:
+                        _keys.append((_missing, _key))
+                if _row[_i] is None:
+                    _gain = [0] * _size_i
+                    for _missing, _key in _keys:
+                        _m = _missing[_key]
+                        while _m:
+                            _low = _m & -_m
+                            _gain[_low.bit_length() - 1] += 1
+                            _m ^= _low
+                    _candidates = sorted(range(_size_i), key=lambda v: (-_gain[v], _used[v], _rng.random()))
+                    for _v in _candidates:
+                        _row[_i] = _v
+                        if not self._constraints or self._completable(_row):
+                            break
+                        _row[_i] = None
+                    if _row[_i] is None:
+                        continue
+                    if not _gain[_row[_i]]:
+                        # covers nothing new, leave the cell free for the vertical growth.
+                        _row[_i] = None
+                        continue
+                _used[_row[_i]] += 1
+                _bit = 1 << _row[_i]
+                for _missing, _key in _keys:
+                    _missing[_key] &= ~_bit
+            # vertical growth.
+            for _cols, _radix, _missing in _combos:
+                for _key, _m in enumerate(_missing):
+                    while _m:
+                        _low = _m & -_m
+                        _m ^= _low
+                        _assignment = [(_c, (_key // _r) % _sizes[_c]) for _c, _r in zip(_cols, _radix)]
+                        _assignment.append((_i, _low.bit_length() - 1))
+                        if any(all(_row[c] == v for c, v in _assignment) for _row in _rows):
+                            # covered by an earlier vertical growth.
+                            continue
+                        for _row in _rows:
+                            if _row[_i] is not None and _row[_i] != _assignment[-1][1]:
+                                continue
+                            if all(_row[c] is None or _row[c] == v for c, v in _assignment) \
+                                    and self._fits(_row, _assignment):
+                                break
+                        else:
+                            _row = [None] * _n
+                            if not self._fits(_row, _assignment):
+                                _infeasible += 1
+                                continue
+                            _rows.append(_row)
+                        for _c, _v in _assignment:
+                            _row[_c] = _v
+                    _missing[_key] = 0
+        # fill the free cells.
+        for _r, _row in enumerate(_rows):
+            if not self._completable(_row, fill=True):
+                raise TestGenerationError('row {} can not be completed'.format(_r))
+            for _c in range(_n):
+                if _row[_c] is None:
+                    _row[_c] = _r % _sizes[_c]
+        _rows_out = []
+        _index_of = {p: c for c, p in enumerate(self._order)}
+        for _row in _rows:
+            _rows_out.append([_row[_index_of[p]] for p in range(_n)])
+        return CoveringArray(self.names, self.domains, _rows_out, _t, _tuple_count, _infeasible)
+
+
+def covering_array(parameters, strength=2, constraints=None, seeds=None, random_seed=0):
+    """
+    shortcut for CoveringArrayGenerator(...).generate().
+    """
+    return CoveringArrayGenerator(parameters, strength, constraints, seeds, random_seed).generate()
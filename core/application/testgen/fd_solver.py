@@ -0,0 +1,661 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : fd_solver.py
+# ------------------------------------------------------------------------------
+#
+# File          : fd_solver.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import ast
+import random
+from collections import deque, OrderedDict
+from ..core.exceptions import TestGenerationError
+from ..ipod.class_iod import IPODInput
+
+
+class _RangeDomain:
+    """
+    integer interval, the removed values inside are kept as holes.
+    """
+    __slots__ = ('lo', 'hi', 'holes')
+    numeric = True
+
+    def __init__(self, lo, hi, holes=frozenset()):
+        while lo <= hi and lo in holes:
+            lo += 1
+        while hi >= lo and hi in holes:
+            hi -= 1
+        self.lo = lo
+        self.hi = hi
+        self.holes = frozenset(h for h in holes if lo < h < hi) if holes else holes
+
+    @property
+    def size(self):
+        return self.hi - self.lo + 1 - len(self.holes) if self.hi >= self.lo else 0
+
+    def min(self):
+        return self.lo
+
+    def max(self):
+        return self.hi
+
+    def __contains__(self, value):
+        return isinstance(value, int) and self.lo <= value <= self.hi and value not in self.holes
+
+    def values(self, start=None):
+        _lo = self.lo
+        if start is not None and self.lo < start <= self.hi:
+            # from start up, then wrap around.
+            for _v in range(start, self.hi + 1):
+                if _v not in self.holes:
+                    yield _v
+            _hi = start - 1
+        else:
+            _hi = self.hi
+        for _v in range(_lo, _hi + 1):
+            if _v not in self.holes:
+                yield _v
+
+    def bounds(self, lo, hi):
+        if lo <= self.lo and hi >= self.hi:
+            return self
+        return _RangeDomain(max(lo, self.lo), min(hi, self.hi), self.holes)
+
+    def remove(self, value):
+        if value not in self:
+            return self
+        return _RangeDomain(self.lo, self.hi, self.holes | {value})
+
+    def only(self, value):
+        return _RangeDomain(value, value) if value in self else _RangeDomain(1, 0)
+
+
+class _ValueDomain:
+    """
+    enumerated values, sorted if all are numeric.
+    """
+    __slots__ = ('items', 'numeric')
+
+    def __init__(self, items, numeric=None):
+        if numeric is None:
+            numeric = all(isinstance(v, (int, float)) for v in items)
+            if numeric:
+                items = sorted(set(items))
+        self.items = tuple(items)
+        self.numeric = numeric
+
+    @property
+    def size(self):
+        return len(self.items)
+
+    def min(self):
+        return self.items[0]
+
+    def max(self):
+        return self.items[-1]
+
+    def __contains__(self, value):
+        return value in self.items
+
+    def values(self, start=None):
+        if start is None:
+            return iter(self.items)
+        _k = start % len(self.items)
+        return iter(self.items[_k:] + self.items[:_k])
+
+    def bounds(self, lo, hi):
+        if lo <= self.items[0] and hi >= self.items[-1]:
+            return self
+        return _ValueDomain(tuple(v for v in self.items if lo <= v <= hi), True)
+
+    def remove(self, value):
+        if value not in self.items:
+            return self
+        return _ValueDomain(tuple(v for v in self.items if v != value), self.numeric)
+
+    def only(self, value):
+        return _ValueDomain((value,) if value in self.items else (), self.numeric)
+
+
+def _as_domain(spec):
+    # range, (lo, hi) of ints, bool, or an iterable of values.
+    if isinstance(spec, (_RangeDomain, _ValueDomain)):
+        return spec
+    if spec is bool:
+        return _ValueDomain((False, True), True)
+    if isinstance(spec, range):
+        if spec.step != 1:
+            return _ValueDomain(tuple(spec))
+        return _RangeDomain(spec.start, spec.stop - 1)
+    if isinstance(spec, tuple) and len(spec) == 2 and all(type(v) is int for v in spec):
+        return _RangeDomain(spec[0], spec[1])
+    return _ValueDomain(tuple(spec))
+
+
+class _Linear:
+    """
+    sum(coeff * var) <= const, or != const with ``not_equal``.
+    """
+    __slots__ = ('vars', 'coeffs', 'const', 'notEqual')
+
+    def __init__(self, variables, coeffs, const, not_equal=False):
+        self.vars = variables
+        self.coeffs = coeffs
+        self.const = const
+        self.notEqual = not_equal
+
+    def propagate(self, doms):
+        _vars = self.vars
+        _coeffs = self.coeffs
+        if self.notEqual:
+            _free = -1
+            _sum = 0
+            for _k, _v in enumerate(_vars):
+                _d = doms[_v]
+                if _d.size == 1:
+                    _sum += _coeffs[_k] * _d.min()
+                elif _free >= 0:
+                    return ()
+                else:
+                    _free = _k
+            if _free < 0:
+                return None if _sum == self.const else ()
+            _rest = self.const - _sum
+            if _rest % _coeffs[_free]:
+                return ()
+            _d = doms[_vars[_free]]
+            _new = _d.remove(_rest // _coeffs[_free])
+            if _new is _d:
+                return ()
+            if not _new.size:
+                return None
+            doms[_vars[_free]] = _new
+            return (_vars[_free],)
+        _mins = []
+        for _k, _v in enumerate(_vars):
+            _a = _coeffs[_k]
+            _d = doms[_v]
+            _mins.append(_a * _d.min() if _a > 0 else _a * _d.max())
+        _total = sum(_mins)
+        if _total > self.const:
+            return None
+        _changed = []
+        for _k, _v in enumerate(_vars):
+            _a = _coeffs[_k]
+            _slack = self.const - (_total - _mins[_k])
+            _d = doms[_v]
+            if _a > 0:
+                _new = _d.bounds(_d.min(), _slack // _a)
+            else:
+                _new = _d.bounds(-(-_slack // _a), _d.max())
+            if _new is not _d:
+                if not _new.size:
+                    return None
+                doms[_v] = _new
+                _changed.append(_v)
+        return _changed
+
+
+class _Predicate:
+    """
+    any boolean function, checked once its variables are assigned, the
+    last free variable of a small domain is filtered (forward checking).
+    """
+    __slots__ = ('vars', 'names', 'function')
+    FILTER_SIZE = 256
+
+    def __init__(self, variables, names, function):
+        self.vars = variables
+        self.names = names
+        self.function = function
+
+    def propagate(self, doms):
+        _free = -1
+        for _k, _v in enumerate(self.vars):
+            if doms[_v].size != 1:
+                if _free >= 0:
+                    return ()
+                _free = _k
+        _values = {n: doms[v].min() if doms[v].size == 1 else None for n, v in zip(self.names, self.vars)}
+        if _free < 0:
+            return () if self.function(_values) else None
+        _v = self.vars[_free]
+        _d = doms[_v]
+        if _d.size > self.FILTER_SIZE:
+            return ()
+        _name = self.names[_free]
+        _keep = []
+        for _x in _d.values():
+            _values[_name] = _x
+            if self.function(_values):
+                _keep.append(_x)
+        if len(_keep) == _d.size:
+            return ()
+        if not _keep:
+            return None
+        doms[_v] = _ValueDomain(tuple(_keep), _d.numeric)
+        return (_v,)
+
+
+class FDSolver:
+    """
+    Finite domain constraint solver.
+
+    variables are integer ranges, enumerations or booleans. linear
+    constraints are propagated on the bounds, unary membership
+    constraints prune the domains up front, other boolean expressions are
+    checked by forward checking. the search takes the variable with the
+    smallest domain first and propagates after every assignment. guard
+    expressions (python syntax as in the statechart guards) are parsed
+    into these constraints, see :meth:`add_guard`.
+    """
+
+    def __init__(self, max_nodes=100000):
+        """
+        :param max_nodes: int, search nodes per solve before giving up
+        """
+        self.names = []
+        self.varIds = dict()
+        self.domains = []
+        self.constraints = []
+        self._watch = []
+        self.maxNodes = max_nodes
+        self.nodes = 0
+        # set by constraints which are false regardless of the variables.
+        self.unsat = False
+
+    def add_variable(self, name, domain):
+        """
+        :param name: str
+        :param domain: range, (lo, hi) of ints, bool or an iterable of values
+        """
+        if name in self.varIds:
+            raise TestGenerationError('variable "{}" already defined'.format(name))
+        _d = _as_domain(domain)
+        self.varIds[name] = len(self.names)
+        self.names.append(name)
+        self.domains.append(_d)
+        self._watch.append([])
+        return self
+
+    def add_int(self, name, lo, hi):
+        return self.add_variable(name, _RangeDomain(lo, hi))
+
+    def add_enum(self, name, values):
+        return self.add_variable(name, _ValueDomain(tuple(values)))
+
+    def add_bool(self, name):
+        return self.add_variable(name, bool)
+
+    def _var(self, name):
+        try:
+            return self.varIds[name]
+        except KeyError:
+            raise TestGenerationError('unknown variable "{}"'.format(name))
+
+    def _add(self, constraint):
+        self.constraints.append(constraint)
+        for _v in set(constraint.vars):
+            self._watch[_v].append(constraint)
+
+    def add_linear(self, coeffs, op, const):
+        """
+        sum(coeff * var) op const.
+        :param coeffs: dict of name: int
+        :param op: str, one of <, <=, >, >=, ==, !=
+        :param const: int
+        """
+        _coeffs = {}
+        for _name, _a in coeffs.items():
+            if _a:
+                _coeffs[self._var(_name)] = _coeffs.get(self._var(_name), 0) + _a
+        _coeffs = {v: a for v, a in _coeffs.items() if a}
+        for _v in _coeffs:
+            if not self.domains[_v].numeric:
+                raise TestGenerationError('variable "{}" is not numeric'.format(self.names[_v]))
+        _vars = list(_coeffs)
+        _a = [_coeffs[v] for v in _vars]
+        if not _vars:
+            if not {'<': 0 < const, '<=': 0 <= const, '>': 0 > const, '>=': 0 >= const, '==': 0 == const,
+                    '!=': 0 != const}[op]:
+                self.unsat = True
+            return self
+        _neg = [-x for x in _a]
+        if op == '<':
+            self._add(_Linear(_vars, _a, const - 1))
+        elif op == '<=':
+            self._add(_Linear(_vars, _a, const))
+        elif op == '>':
+            self._add(_Linear(_vars, _neg, -const - 1))
+        elif op == '>=':
+            self._add(_Linear(_vars, _neg, -const))
+        elif op == '==':
+            self._add(_Linear(_vars, _a, const))
+            self._add(_Linear(_vars, _neg, -const))
+        elif op == '!=':
+            self._add(_Linear(_vars, _a, const, not_equal=True))
+        else:
+            raise TestGenerationError('unknown operator "{}"'.format(op))
+        return self
+
+    def add_member(self, name, values, negate=False):
+        _v = self._var(name)
+        _d = self.domains[_v]
+        if not negate:
+            self.domains[_v] = _ValueDomain(tuple(x for x in dict.fromkeys(values) if x in _d))
+        elif _d.size > 1 << 16:
+            for _x in values:
+                _d = _d.remove(_x)
+            self.domains[_v] = _d
+        else:
+            _values = set(values)
+            self.domains[_v] = _ValueDomain(tuple(x for x in _d.values() if x not in _values), _d.numeric)
+        return self
+
+    def add_predicate(self, names, function):
+        """
+        :param names: names of the variables used
+        :param function: callable(dict of name: value) -> bool
+        """
+        _names = tuple(names)
+        self._add(_Predicate([self._var(n) for n in _names], _names, function))
+        return self
+
+    def add_guard(self, expression, constants=None):
+        """
+        add a guard expression like ``speed > 10 and mode in ('a', 'b')``.
+        linear comparisons, membership tests and boolean variables become
+        native constraints, the rest (e.g. ``or``) a predicate.
+        :param expression: str
+        :param constants: dict of name: value for the names which are no variables
+        """
+        try:
+            _tree = ast.parse(expression, mode='eval').body
+        except SyntaxError as e:
+            raise TestGenerationError('invalid guard "{}": {}'.format(expression, e))
+        _GuardTranslator(self, dict(constants or {})).add(_tree)
+        return self
+
+    def _propagate(self, doms, constraints):
+        _queue = deque(constraints)
+        _queued = set(map(id, constraints))
+        while _queue:
+            _c = _queue.popleft()
+            _queued.discard(id(_c))
+            _changed = _c.propagate(doms)
+            if _changed is None:
+                return False
+            for _v in _changed:
+                for _w in self._watch[_v]:
+                    if id(_w) not in _queued:
+                        _queued.add(id(_w))
+                        _queue.append(_w)
+        return True
+
+    def solutions(self, limit=None, seed=None):
+        """
+        generator of solutions, dicts of name: value.
+        :param limit: int, max count of solutions
+        :param seed: int, randomizes the value order, optional
+        """
+        self.nodes = 0
+        if self.unsat or any(not d.size for d in self.domains):
+            return
+        _rng = random.Random(seed) if seed is not None else None
+        _doms = list(self.domains)
+        if not self._propagate(_doms, self.constraints):
+            return
+        _count = 0
+        _stack = [(_doms, None)]
+        while _stack:
+            _doms, _values = _stack[-1]
+            if _values is None:
+                _best = -1
+                _size = None
+                for _v, _d in enumerate(_doms):
+                    if _d.size > 1 and (_size is None or _d.size < _size):
+                        _best, _size = _v, _d.size
+                if _best < 0:
+                    _stack.pop()
+                    yield {n: d.min() for n, d in zip(self.names, _doms)}
+                    _count += 1
+                    if limit is not None and _count >= limit:
+                        return
+                    continue
+                _d = _doms[_best]
+                _start = None
+                if _rng is not None:
+                    _start = _d.min() + _rng.randrange(_d.max() - _d.min() + 1) if isinstance(_d, _RangeDomain) \
+                        else _rng.randrange(_d.size)
+                _values = (_best, _d.values(_start))
+                _stack[-1] = (_doms, _values)
+            _best, _it = _values
+            _x = next(_it, _values)
+            if _x is _values:
+                _stack.pop()
+                continue
+            self.nodes += 1
+            if self.nodes > self.maxNodes:
+                raise TestGenerationError('search exceeded {} nodes'.format(self.maxNodes))
+            _child = list(_doms)
+            _child[_best] = _doms[_best].only(_x)
+            if self._propagate(_child, self._watch[_best]):
+                _stack.append((_child, None))
+
+    def solve(self, seed=None):
+        """
+        :return: dict of name: value or None if unsatisfiable
+        """
+        return next(self.solutions(1, seed), None)
+
+
+_COMPARE_OPS = {ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=', ast.Eq: '==', ast.NotEq: '!='}
+
+
+class _GuardTranslator:
+    def __init__(self, solver, constants):
+        self.solver = solver
+        self.constants = constants
+
+    def _constant(self, node):
+        if isinstance(node, ast.Constant):
+            return True, node.value
+        if isinstance(node, ast.Name) and node.id in self.constants and node.id not in self.solver.varIds:
+            return True, self.constants[node.id]
+        if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+            _items = [self._constant(e) for e in node.elts]
+            if all(ok for ok, _ in _items):
+                return True, tuple(v for _, v in _items)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            _ok, _v = self._constant(node.operand)
+            if _ok and isinstance(_v, (int, float)):
+                return True, -_v
+        return False, None
+
+    def _linear(self, node):
+        # (dict of name: coeff, const) or None if not linear over ints.
+        _ok, _v = self._constant(node)
+        if _ok:
+            return ({}, _v) if isinstance(_v, int) else None
+        if isinstance(node, ast.Name):
+            if node.id not in self.solver.varIds:
+                raise TestGenerationError('unknown name "{}" in guard'.format(node.id))
+            return {node.id: 1}, 0
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            _inner = self._linear(node.operand)
+            if _inner is None or isinstance(node.op, ast.UAdd):
+                return _inner
+            return {n: -a for n, a in _inner[0].items()}, -_inner[1]
+        if isinstance(node, ast.BinOp):
+            _l = self._linear(node.left)
+            _r = self._linear(node.right)
+            if _l is None or _r is None:
+                return None
+            if isinstance(node.op, (ast.Add, ast.Sub)):
+                _sign = 1 if isinstance(node.op, ast.Add) else -1
+                _coeffs = dict(_l[0])
+                for _n, _a in _r[0].items():
+                    _coeffs[_n] = _coeffs.get(_n, 0) + _sign * _a
+                return _coeffs, _l[1] + _sign * _r[1]
+            if isinstance(node.op, ast.Mult):
+                if not _l[0]:
+                    _l, _r = _r, _l
+                if not _r[0]:
+                    return {n: a * _r[1] for n, a in _l[0].items()}, _l[1] * _r[1]
+        return None
+
+    def _names(self, node):
+        return sorted({n.id for n in ast.walk(node) if isinstance(n, ast.Name) and n.id in self.solver.varIds})
+
+    def _fallback(self, node):
+        _names = self._names(node)
+        for _n in {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}:
+            if _n not in self.solver.varIds and _n not in self.constants:
+                raise TestGenerationError('unknown name "{}" in guard'.format(_n))
+        # split comparisons are built without positions.
+        _code = compile(ast.fix_missing_locations(ast.Expression(node)), '<guard>', 'eval')
+        _globals = dict(self.constants)
+        _globals['__builtins__'] = {}
+        self.solver.add_predicate(_names, lambda values, _c=_code, _g=_globals: bool(eval(_c, _g, values)))
+
+    def add(self, node):
+        _solver = self.solver
+        if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+            for _value in node.values:
+                self.add(_value)
+            return
+        if isinstance(node, ast.Name) and node.id in _solver.varIds:
+            _solver.add_member(node.id, (True,))
+            return
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not) and isinstance(node.operand, ast.Name) \
+                and node.operand.id in _solver.varIds:
+            _solver.add_member(node.operand.id, (False,))
+            return
+        if isinstance(node, ast.Compare):
+            _parts = []
+            _left = node.left
+            for _op, _right in zip(node.ops, node.comparators):
+                _parts.append((_left, _op, _right))
+                _left = _right
+            for _left, _op, _right in _parts:
+                if not self._add_compare(_left, _op, _right):
+                    self._fallback(ast.copy_location(ast.Compare(_left, [_op], [_right]), node))
+            return
+        _ok, _v = self._constant(node)
+        if _ok:
+            if not _v:
+                _solver.unsat = True
+            return
+        self._fallback(node)
+
+    def _add_compare(self, left, op, right):
+        # True if the comparison became a native constraint.
+        _solver = self.solver
+        if isinstance(op, (ast.In, ast.NotIn)) and isinstance(left, ast.Name) and left.id in _solver.varIds:
+            _ok, _values = self._constant(right)
+            if _ok and isinstance(_values, tuple):
+                _solver.add_member(left.id, _values, negate=isinstance(op, ast.NotIn))
+                return True
+            return False
+        if type(op) not in _COMPARE_OPS:
+            return False
+        _op = _COMPARE_OPS[type(op)]
+        if _op in ('==', '!='):
+            for _a, _b in ((left, right), (right, left)):
+                if isinstance(_a, ast.Name) and _a.id in _solver.varIds:
+                    _ok, _value = self._constant(_b)
+                    if _ok and not (isinstance(_value, int) and _solver.domains[_solver.varIds[_a.id]].numeric):
+                        _solver.add_member(_a.id, (_value,), negate=_op == '!=')
+                        return True
+        _l = self._linear(left)
+        _r = self._linear(right)
+        if _l is None or _r is None:
+            return False
+        _coeffs = dict(_l[0])
+        for _n, _a in _r[0].items():
+            _coeffs[_n] = _coeffs.get(_n, 0) - _a
+        if any(not _solver.domains[_solver.varIds[n]].numeric for n, a in _coeffs.items() if a):
+            return False
+        _solver.add_linear(_coeffs, _op, _r[1] - _l[1])
+        return True
+
+
+def _variables_of(variables):
+    if isinstance(variables, IPODInput):
+        return OrderedDict((d.name, list(d.values)) for d in variables.data)
+    return OrderedDict(variables)
+
+
+class GuardSolver:
+    """
+    Cached solving of guard conjunctions over input variables.
+
+    a path of a test generator gives the conjunction of its guards, the
+    result (a dict of input values or None) is cached for the set of the
+    guard strings, so the same conjunction is solved once. conjunctions
+    containing a known unsatisfiable one are rejected without search.
+    the guards are evaluated on the input variables only, updates of the
+    variables by actions along the path are not taken into account.
+    """
+
+    def __init__(self, variables, constants=None, maxsize=4096, max_nodes=100000, seed=None):
+        """
+        :param variables: dict of name: domain (see FDSolver.add_variable) or an IPODInput
+        :param constants: dict of name: value usable in the guards
+        :param maxsize: int, max count of cached conjunctions
+        :param max_nodes: int, search nodes per solve
+        :param seed: int, randomizes the values of the solutions, optional
+        """
+        self.variables = _variables_of(variables)
+        self.constants = dict(constants or {})
+        self.maxsize = maxsize
+        self.maxNodes = max_nodes
+        self.seed = seed
+        self._domains = [(n, _as_domain(d)) for n, d in self.variables.items()]
+        self._cache = OrderedDict()
+        self._unsat = []
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, guards):
+        """
+        :param guards: iterable of guard expressions, None entries are ignored
+        :return: dict of name: value or None if the conjunction is unsatisfiable
+        """
+        _key = frozenset(g for g in guards if g is not None)
+        if _key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(_key)
+            return self._cache[_key]
+        self.misses += 1
+        if any(_u <= _key for _u in self._unsat):
+            _result = None
+        else:
+            _solver = FDSolver(self.maxNodes)
+            for _name, _domain in self._domains:
+                _solver.add_variable(_name, _domain)
+            for _guard in sorted(_key):
+                _solver.add_guard(_guard, self.constants)
+            _result = _solver.solve(self.seed)
+            if _result is None and len(self._unsat) < self.maxsize:
+                self._unsat.append(_key)
+        self._cache[_key] = _result
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return _result
+
+    def is_satisfiable(self, guards):
+        return self.solve(guards) is not None
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : fsm_graph.py
+# ------------------------------------------------------------------------------
+#
+# File          : fsm_graph.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from collections import deque
+from ..core.exceptions import TestGenerationError
+
+
+class FSMGraph:
+    """
+    Flat finite state machine used by the test generators.
+
+    states and transitions are numbered in insertion order, the
+    transitions are kept in parallel lists (``sources``, ``targets``,
+    ``labels``, ``costs``, ``guards``), ``outEdges`` holds the transition ids leaving
+    every state. the cost of a transition is its execution cost, e.g. one
+    step or its duration.
+    """
+
+    def __init__(self, initial=None):
+        self.states = []
+        self.stateIds = dict()
+        self.sources = []
+        self.targets = []
+        self.labels = []
+        self.costs = []
+        self.guards = []
+        self.outEdges = []
+        self.initial = None
+        if initial is not None:
+            self.initial = self.add_state(initial)
+
+    @property
+    def state_count(self):
+        return len(self.states)
+
+    @property
+    def transition_count(self):
+        return len(self.sources)
+
+    def add_state(self, name):
+        _id = self.stateIds.get(name)
+        if _id is None:
+            _id = self.stateIds[name] = len(self.states)
+            self.states.append(name)
+            self.outEdges.append([])
+        return _id
+
+    def set_initial(self, name):
+        self.initial = self.add_state(name)
+
+    def add_transition(self, source, target, label=None, cost=1, guard=None):
+        """
+        :param source: hashable, source state, added if unknown
+        :param target: hashable, target state, added if unknown
+        :param label: transition label, e.g. the event
+        :param cost: positive number
+        :param guard: guard of the transition (expression or callable), optional
+        :return: int, transition id
+        """
+        if cost <= 0:
+            raise TestGenerationError('cost of transition {} -> {} must be positive'.format(source, target))
+        _s = self.add_state(source)
+        _t = self.add_state(target)
+        _id = len(self.sources)
+        self.sources.append(_s)
+        self.targets.append(_t)
+        self.labels.append(label)
+        self.costs.append(cost)
+        self.guards.append(guard)
+        self.outEdges[_s].append(_id)
+        return _id
+
+    def reachable_states(self):
+        """
+        Returns the list of flags of the states reachable from the initial state.
+        """
+        if self.initial is None:
+            raise TestGenerationError('initial state is not defined')
+        _seen = [False] * len(self.states)
+        _seen[self.initial] = True
+        _queue = deque([self.initial])
+        while _queue:
+            _s = _queue.popleft()
+            for _t in self.outEdges[_s]:
+                _d = self.targets[_t]
+                if not _seen[_d]:
+                    _seen[_d] = True
+                    _queue.append(_d)
+        return _seen
+
+    def describe(self, transition):
+        return self.states[self.sources[transition]], self.labels[transition], self.states[self.targets[transition]]
+
+
+def fsm_graph_from_statechart(compiled):
+    """
+    flatten a compiled statechart into a FSMGraph over its leaf states.
+    every dispatch table entry becomes one transition labelled with its
+    event (None for completion transitions), a transition of a composite
+    state thus appears once per leaf inside it. guards are kept as the
+    compiled callables, they are not evaluated.
+    :param compiled: CompiledStatechart
+    :return: FSMGraph
+    """
+    _names = compiled.stateNames
+    _events = {_id: _name for _name, _id in compiled.eventIds.items()}
+    _events[0] = None
+    _graph = FSMGraph(_names[compiled.initialLeaf])
+    _event_count = compiled.eventCount
+    for _leaf in range(1, len(_names)):
+        if compiled.initialChild[_leaf]:
+            continue
+        _graph.add_state(_names[_leaf])
+        for _event_id in range(_event_count):
+            for _guard, _ops, _target, _domain in compiled.table[_leaf * _event_count + _event_id] or ():
+                _graph.add_transition(_names[_leaf], _names[_target], _events[_event_id], guard=_guard)
+    return _graph
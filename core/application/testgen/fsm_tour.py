@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : fsm_tour.py
+# ------------------------------------------------------------------------------
+#
+# File          : fsm_tour.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import heapq
+from collections import deque
+from ..core.exceptions import TestGenerationError
+
+COVERAGE_ALL_STATES = 'all_states'
+COVERAGE_ALL_TRANSITIONS = 'all_transitions'
+COVERAGE_TRANSITION_PAIRS = 'transition_pairs'
+_INF = float('inf')
+
+
+def _shortest_tree(n, start, adjacency, dst, cost):
+    # dijkstra, returns the distances and the edge leading to every node.
+    _dist = [_INF] * n
+    _via = [-1] * n
+    _dist[start] = 0
+    _heap = [(0, start)]
+    while _heap:
+        _d, _u = heapq.heappop(_heap)
+        if _d > _dist[_u]:
+            continue
+        for _e in adjacency[_u]:
+            _v = dst[_e]
+            _nd = _d + cost[_e]
+            if _nd < _dist[_v]:
+                _dist[_v] = _nd
+                _via[_v] = _e
+                heapq.heappush(_heap, (_nd, _v))
+    return _dist, _via
+
+
+def _balance_flow(n, src, dst, cost, out_adj, in_adj, delta):
+    """
+    min cost flow from the nodes with more incoming than outgoing required
+    edges to the nodes with more outgoing ones (primal dual: dijkstra with
+    potentials, then blocking flows on the zero reduced cost arcs). the
+    edges have unbounded capacity.
+    :return: list, extra traversals per edge
+    """
+    _flow = [0] * len(src)
+    _supply = [-d if d < 0 else 0 for d in delta]
+    _demand = [d if d > 0 else 0 for d in delta]
+    _left = sum(_supply)
+    _pot = [0] * n
+    while _left:
+        # dijkstra over the residual graph with reduced costs.
+        _dist = [_INF] * n
+        _heap = []
+        for _v in range(n):
+            if _supply[_v]:
+                _dist[_v] = 0
+                _heap.append((0, _v))
+        heapq.heapify(_heap)
+        while _heap:
+            _d, _u = heapq.heappop(_heap)
+            if _d > _dist[_u]:
+                continue
+            _pu = _pot[_u]
+            for _e in out_adj[_u]:
+                _v = dst[_e]
+                _nd = _d + cost[_e] + _pu - _pot[_v]
+                if _nd < _dist[_v]:
+                    _dist[_v] = _nd
+                    heapq.heappush(_heap, (_nd, _v))
+            for _e in in_adj[_u]:
+                if _flow[_e]:
+                    _v = src[_e]
+                    _nd = _d - cost[_e] + _pu - _pot[_v]
+                    if _nd < _dist[_v]:
+                        _dist[_v] = _nd
+                        heapq.heappush(_heap, (_nd, _v))
+        if not any(_demand[v] and _dist[v] < _INF for v in range(n)):
+            raise TestGenerationError('the required transitions can not be balanced, graph is not connected')
+        _max = max(d for d in _dist if d < _INF)
+        for _v in range(n):
+            _pot[_v] += _dist[_v] if _dist[_v] < _INF else _max
+        # blocking flows on the admissible arcs, levelled by bfs.
+        while _left:
+            _level = [-1] * n
+            _queue = deque()
+            for _v in range(n):
+                if _supply[_v]:
+                    _level[_v] = 0
+                    _queue.append(_v)
+            _found = False
+            while _queue:
+                _u = _queue.popleft()
+                if _demand[_u]:
+                    _found = True
+                for _e in out_adj[_u]:
+                    _v = dst[_e]
+                    if _level[_v] < 0 and cost[_e] + _pot[_u] - _pot[_v] == 0:
+                        _level[_v] = _level[_u] + 1
+                        _queue.append(_v)
+                for _e in in_adj[_u]:
+                    _v = src[_e]
+                    if _flow[_e] and _level[_v] < 0 and _pot[_u] - _pot[_v] - cost[_e] == 0:
+                        _level[_v] = _level[_u] + 1
+                        _queue.append(_v)
+            if not _found:
+                break
+            _pos_out = [0] * n
+            _pos_in = [0] * n
+            for _s in range(n):
+                while _supply[_s]:
+                    # iterative dfs along increasing levels.
+                    _path = []
+                    _u = _s
+                    while not _demand[_u]:
+                        _advanced = False
+                        _outs = out_adj[_u]
+                        while _pos_out[_u] < len(_outs):
+                            _e = _outs[_pos_out[_u]]
+                            _v = dst[_e]
+                            if _level[_v] == _level[_u] + 1 and cost[_e] + _pot[_u] - _pot[_v] == 0:
+                                _path.append((_e, 1))
+                                _u = _v
+                                _advanced = True
+                                break
+                            _pos_out[_u] += 1
+                        if _advanced:
+                            continue
+                        _ins = in_adj[_u]
+                        while _pos_in[_u] < len(_ins):
+                            _e = _ins[_pos_in[_u]]
+                            _v = src[_e]
+                            if _flow[_e] and _level[_v] == _level[_u] + 1 and _pot[_u] - _pot[_v] - cost[_e] == 0:
+                                _path.append((_e, -1))
+                                _u = _v
+                                _advanced = True
+                                break
+                            _pos_in[_u] += 1
+                        if _advanced:
+                            continue
+                        # dead end, retreat.
+                        _level[_u] = -1
+                        if not _path:
+                            break
+                        _e, _dir = _path.pop()
+                        _u = src[_e] if _dir > 0 else dst[_e]
+                    if not _demand[_u]:
+                        break
+                    _amount = min(_supply[_s], _demand[_u])
+                    for _e, _dir in _path:
+                        if _dir < 0:
+                            _amount = min(_amount, _flow[_e])
+                    for _e, _dir in _path:
+                        _flow[_e] += _dir * _amount
+                    _supply[_s] -= _amount
+                    _demand[_u] -= _amount
+                    _left -= _amount
+    return _flow
+
+
+def postman_circuit(n, start, src, dst, cost, required):
+    """
+    Closed walk from start traversing every required edge at least once
+    with minimal added cost (chinese postman, rural postman if only a
+    part of the edges is required).
+
+    required edges unreachable from start are skipped. when the required
+    edges do not form one connected part with start, each other part is
+    joined by a shortest path from start (rural postman heuristic), then
+    the degrees are balanced by a min cost flow over all edges and an
+    euler circuit is taken.
+    :param n: int, count of nodes
+    :param start: int, start node
+    :param src: list, source node per edge
+    :param dst: list, target node per edge
+    :param cost: list, positive cost per edge
+    :param required: iterable of edge ids, the others may be used but need not be covered
+    :return: list of edge ids in walk order
+    """
+    _m = len(src)
+    _out = [[] for _ in range(n)]
+    _in = [[] for _ in range(n)]
+    for _e in range(_m):
+        _out[src[_e]].append(_e)
+        _in[dst[_e]].append(_e)
+    _dist, _via = _shortest_tree(n, start, _out, dst, cost)
+    _count = [0] * _m
+    for _e in required:
+        if _dist[src[_e]] < _INF:
+            _count[_e] = 1
+    if not any(_count):
+        return []
+    # join the parts of the required edges not connected to start.
+    _comp = list(range(n))
+
+    def _find(x):
+        while _comp[x] != x:
+            _comp[x] = _comp[_comp[x]]
+            x = _comp[x]
+        return x
+
+    for _e in range(_m):
+        if _count[_e]:
+            _comp[_find(src[_e])] = _find(dst[_e])
+    _nodes = sorted({src[e] for e in range(_m) if _count[e]}, key=lambda v: _dist[v])
+    for _v in _nodes:
+        if _find(_v) == _find(start):
+            continue
+        _u = _v
+        while _u != start:
+            _e = _via[_u]
+            _count[_e] += 1
+            _comp[_find(src[_e])] = _find(_u)
+            _u = src[_e]
+    _delta = [0] * n
+    for _e in range(_m):
+        if _count[_e]:
+            _delta[src[_e]] += _count[_e]
+            _delta[dst[_e]] -= _count[_e]
+    if any(_delta):
+        _flow = _balance_flow(n, src, dst, cost, _out, _in, _delta)
+        for _e in range(_m):
+            _count[_e] += _flow[_e]
+    # hierholzer on the multigraph.
+    _pending = [[] for _ in range(n)]
+    for _e in range(_m - 1, -1, -1):
+        if _count[_e]:
+            _pending[src[_e]].extend([_e] * _count[_e])
+    _circuit = []
+    _stack = [(start, -1)]
+    while _stack:
+        _u, _e_in = _stack[-1]
+        if _pending[_u]:
+            _e = _pending[_u].pop()
+            _stack.append((dst[_e], _e))
+        else:
+            _stack.pop()
+            if _e_in >= 0:
+                _circuit.append(_e_in)
+    _circuit.reverse()
+    return _circuit
+
+
+class FSMTestSuite:
+    def __init__(self, graph, criterion, sequences, uncoverable=None):
+        self.graph = graph
+        self.criterion = criterion
+        # per sequence the transition ids, every sequence starts at the initial state.
+        self.sequences = sequences
+        self.uncoverable = uncoverable or []
+
+    @property
+    def count(self):
+        return len(self.sequences)
+
+    @property
+    def length(self):
+        return sum(len(s) for s in self.sequences)
+
+    @property
+    def cost(self):
+        _costs = self.graph.costs
+        return sum(_costs[t] for s in self.sequences for t in s)
+
+    def describe(self):
+        """
+        Returns the sequences as lists of (source, label, target) names.
+        """
+        return [[self.graph.describe(t) for t in s] for s in self.sequences]
+
+    def __repr__(self):
+        return '<FSMTestSuite {}: {} sequences, length {}>'.format(self.criterion, self.count, self.length)
+
+
+class FSMTestGenerator:
+    """
+    Test sequences over a FSMGraph.
+
+    every sequence starts at the initial state, a reset back to the
+    initial state (cost ``reset_cost``) ends it. the all transitions and
+    transition pair suites are postman tours: one closed walk which
+    covers every transition (or pair of adjacent transitions, as edges of
+    the line graph) and may use resets, cut at the resets. the all states
+    suite walks to the nearest uncovered state until none is reachable.
+    """
+
+    def __init__(self, graph, reset_cost=1):
+        """
+        :param graph: FSMGraph
+        :param reset_cost: positive number, cost of a reset to the initial state
+        """
+        if graph.initial is None:
+            raise TestGenerationError('initial state is not defined')
+        if reset_cost <= 0:
+            raise TestGenerationError('reset_cost must be positive')
+        self.graph = graph
+        self.resetCost = reset_cost
+
+    def generate(self, criterion, **kwargs):
+        if criterion == COVERAGE_ALL_STATES:
+            return self.all_states()
+        if criterion == COVERAGE_ALL_TRANSITIONS:
+            return self.all_transitions(**kwargs)
+        if criterion == COVERAGE_TRANSITION_PAIRS:
+            return self.transition_pairs()
+        raise TestGenerationError('unknown coverage criterion "{}"'.format(criterion))
+
+    def _unreachable_transitions(self, reachable):
+        return [t for t, s in enumerate(self.graph.sources) if not reachable[s]]
+
+    def all_states(self):
+        _graph = self.graph
+        _n = _graph.state_count
+        _reachable = _graph.reachable_states()
+        _covered = [not r for r in _reachable]
+        _covered[_graph.initial] = True
+        _left = sum(1 for c in _covered if not c)
+        _sequences = []
+        _current = []
+        _at = _graph.initial
+        while _left:
+            # bfs to the nearest uncovered state.
+            _via = {_at: -1}
+            _queue = deque([_at])
+            _hit = None
+            while _queue and _hit is None:
+                _u = _queue.popleft()
+                for _t in _graph.outEdges[_u]:
+                    _v = _graph.targets[_t]
+                    if _v not in _via:
+                        _via[_v] = _t
+                        if not _covered[_v]:
+                            _hit = _v
+                            break
+                        _queue.append(_v)
+            if _hit is None:
+                # nothing left from here, reset.
+                if _current:
+                    _sequences.append(_current)
+                _current = []
+                _at = _graph.initial
+                continue
+            _path = []
+            _v = _hit
+            while _via[_v] != -1:
+                _path.append(_via[_v])
+                _v = _graph.sources[_via[_v]]
+            for _t in reversed(_path):
+                _d = _graph.targets[_t]
+                if not _covered[_d]:
+                    _covered[_d] = True
+                    _left -= 1
+            _current.extend(reversed(_path))
+            _at = _hit
+        if _current:
+            _sequences.append(_current)
+        return FSMTestSuite(_graph, COVERAGE_ALL_STATES, _sequences,
+                            [s for s in range(_n) if not _reachable[s]])
+
+    def all_transitions(self, required=None):
+        """
+        :param required: iterable of transition ids to cover, all if None (rural postman for a subset)
+        :return: FSMTestSuite
+        """
+        _graph = self.graph
+        _n = _graph.state_count
+        _m = _graph.transition_count
+        _reachable = _graph.reachable_states()
+        _src = list(_graph.sources)
+        _dst = list(_graph.targets)
+        _cost = list(_graph.costs)
+        for _v in range(_n):
+            if _v != _graph.initial and _reachable[_v]:
+                _src.append(_v)
+                _dst.append(_graph.initial)
+                _cost.append(self.resetCost)
+        _required = range(_m) if required is None else list(required)
+        _circuit = postman_circuit(_n, _graph.initial, _src, _dst, _cost, _required)
+        return FSMTestSuite(_graph, COVERAGE_ALL_TRANSITIONS, self._cut(_circuit, _m),
+                            self._unreachable_transitions(_reachable))
+
+    def transition_pairs(self):
+        """
+        cover every pair of transitions t1, t2 with target(t1) == source(t2),
+        as postman tour on the line graph: node 0 is the initial state,
+        node t + 1 is "transition t was taken".
+        """
+        _graph = self.graph
+        _m = _graph.transition_count
+        _reachable = _graph.reachable_states()
+        _src, _dst, _cost, _step = [], [], [], []
+        for _t in _graph.outEdges[_graph.initial]:
+            _src.append(0)
+            _dst.append(_t + 1)
+            _cost.append(_graph.costs[_t])
+            _step.append(_t)
+        _required = []
+        for _t1 in range(_m):
+            if not _reachable[_graph.sources[_t1]]:
+                continue
+            for _t2 in _graph.outEdges[_graph.targets[_t1]]:
+                _required.append(len(_src))
+                _src.append(_t1 + 1)
+                _dst.append(_t2 + 1)
+                _cost.append(_graph.costs[_t2])
+                _step.append(_t2)
+        for _t in range(_m):
+            if _reachable[_graph.sources[_t]]:
+                _src.append(_t + 1)
+                _dst.append(0)
+                _cost.append(self.resetCost)
+                _step.append(-1)
+        _circuit = postman_circuit(_m + 1, 0, _src, _dst, _cost, _required)
+        return FSMTestSuite(_graph, COVERAGE_TRANSITION_PAIRS, self._cut([_step[e] for e in _circuit], _m),
+                            self._unreachable_transitions(_reachable))
+
+    @staticmethod
+    def _cut(circuit, transition_count):
+        # split the walk at the resets (ids beyond the transitions, or -1).
+        _sequences = []
+        _current = []
+        for _e in circuit:
+            if _e < 0 or _e >= transition_count:
+                if _current:
+                    _sequences.append(_current)
+                _current = []
+            else:
+                _current.append(_e)
+        if _current:
+            _sequences.append(_current)
+        return _sequences
+
+    def naive_transitions(self):
+        """
+        one sequence per transition, the shortest path to its source and
+        the transition itself, as reference for the tour based suites.
+        """
+        _graph = self.graph
+        _n = _graph.state_count
+        _dist, _via = _shortest_tree(_n, _graph.initial, _graph.outEdges, _graph.targets, _graph.costs)
+        _sequences = []
+        for _t in range(_graph.transition_count):
+            _s = _graph.sources[_t]
+            if _dist[_s] == _INF:
+                continue
+            _path = [_t]
+            while _s != _graph.initial:
+                _path.append(_via[_s])
+                _s = _graph.sources[_via[_s]]
+            _path.reverse()
+            _sequences.append(_path)
+        return FSMTestSuite(_graph, COVERAGE_ALL_TRANSITIONS, _sequences,
+                            self._unreachable_transitions([d < _INF for d in _dist]))
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : random_walk.py
+# ------------------------------------------------------------------------------
+#
+# File          : random_walk.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import time
+import random
+import multiprocessing
+from ..core.exceptions import TestGenerationError
+from .fsm_graph import FSMGraph, fsm_graph_from_statechart
+
+
+def _walk(targets, out_edges, initial, weights, seed, steps, max_length, uncovered_bias):
+    """
+    one walker, plain lists only so it runs the same in a worker process.
+    :return: tuple of (sequences, coverage bitmap int, steps)
+    """
+    _rng = random.Random(seed)
+    _random = _rng.random
+    _covered = bytearray(len(targets))
+    # per state the count of outgoing transitions not yet taken.
+    _pending = [len(e) for e in out_edges]
+    _sequences = []
+    _done = 0
+    while _done < steps:
+        _state = initial
+        _sequence = []
+        while len(_sequence) < max_length and _done < steps:
+            _edges = out_edges[_state]
+            if not _edges:
+                break
+            if len(_edges) == 1:
+                _t = _edges[0]
+            else:
+                _total = 0.0
+                _cumulative = []
+                for _e in _edges:
+                    _w = weights[_e]
+                    if not _covered[_e]:
+                        _w *= uncovered_bias
+                    if _pending[targets[_e]]:
+                        _w *= uncovered_bias
+                    _total += _w
+                    _cumulative.append(_total)
+                _r = _random() * _total
+                _k = 0
+                while _cumulative[_k] <= _r and _k < len(_edges) - 1:
+                    _k += 1
+                _t = _edges[_k]
+            if not _covered[_t]:
+                _covered[_t] = 1
+                _pending[_state] -= 1
+            _sequence.append(_t)
+            _state = targets[_t]
+            _done += 1
+        if not _sequence:
+            break
+        _sequences.append(tuple(_sequence))
+    _bitmap = 0
+    for _t, _flag in enumerate(_covered):
+        if _flag:
+            _bitmap |= 1 << _t
+    return _sequences, _bitmap, _done
+
+
+def _walk_task(args):
+    return _walk(*args)
+
+
+class RandomWalkResult:
+    def __init__(self, graph, sequences, coverage, steps, elapsed, seeds):
+        self.graph = graph
+        # deduplicated transition id sequences, sequences which are the prefix of another are dropped.
+        self.sequences = sequences
+        # bitmap of the covered transition ids.
+        self.coverage = coverage
+        self.steps = steps
+        self.elapsed = elapsed
+        self.seeds = seeds
+
+    @property
+    def covered(self):
+        return bin(self.coverage).count('1')
+
+    @property
+    def coverage_ratio(self):
+        return self.covered / self.graph.transition_count if self.graph.transition_count else 1.0
+
+    @property
+    def steps_per_second(self):
+        return self.steps / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def length(self):
+        return sum(len(s) for s in self.sequences)
+
+    def uncovered(self):
+        return [t for t in range(self.graph.transition_count) if not (self.coverage >> t) & 1]
+
+    def summary(self):
+        return '{} walkers, {} steps, {:.2f}s, {:.0f} steps/s, {} sequences, length {}, coverage {:.1%}'.format(
+            len(self.seeds), self.steps, self.elapsed, self.steps_per_second, len(self.sequences), self.length,
+            self.coverage_ratio)
+
+
+class RandomWalkGenerator:
+    """
+    Random and coverage directed walks for models too large for tours.
+
+    every walker starts at the initial state and picks the next transition
+    by its weight, multiplied with ``uncovered_bias`` as long as the
+    walker has not taken it yet and once more if its target state still
+    has transitions the walker has not taken, a walk ends after ``max_length`` steps
+    or in a state without outgoing transitions. the walkers are
+    independent and seeded with ``seed + index``, so the result depends
+    on the seeds only and not on the count of worker processes. the
+    sequences of all walkers are merged in walker order without
+    duplicates and prefixes, the coverage bitmaps are or-ed. compiled
+    statecharts are walked on their flattened leaf graph, guards are not
+    evaluated.
+    """
+
+    def __init__(self, model, walkers=4, steps=10000, max_length=50, uncovered_bias=10.0, weights=None, seed=0,
+                 workers=None, mp_context=None):
+        """
+        :param model: FSMGraph or CompiledStatechart
+        :param walkers: int, count of independent walkers
+        :param steps: int, steps per walker
+        :param max_length: int, max count of transitions per sequence
+        :param uncovered_bias: float, weight factor of the transitions not yet taken
+        :param weights: list of float per transition id, optional
+        :param seed: int, seed of the first walker
+        :param workers: int, count of worker processes, count of cpus if None, 1 runs in process
+        :param mp_context: str, multiprocessing start method, optional
+        """
+        self.graph = model if isinstance(model, FSMGraph) else fsm_graph_from_statechart(model)
+        if self.graph.initial is None:
+            raise TestGenerationError('initial state is not defined')
+        if weights is not None and len(weights) != self.graph.transition_count:
+            raise TestGenerationError('one weight per transition required')
+        if max_length < 1 or steps < 0 or walkers < 1:
+            raise TestGenerationError('walkers and max_length must be positive')
+        if uncovered_bias <= 0:
+            raise TestGenerationError('uncovered_bias must be positive')
+        self.walkers = walkers
+        self.steps = steps
+        self.maxLength = max_length
+        self.uncoveredBias = float(uncovered_bias)
+        self.weights = [float(w) for w in weights] if weights is not None else [1.0] * self.graph.transition_count
+        self.seed = seed
+        self.workers = workers or multiprocessing.cpu_count()
+        self.mpContext = mp_context
+
+    def _tasks(self):
+        _graph = self.graph
+        _out_edges = [list(e) for e in _graph.outEdges]
+        for _i in range(self.walkers):
+            yield (_graph.targets, _out_edges, _graph.initial, self.weights, self.seed + _i, self.steps,
+                   self.maxLength, self.uncoveredBias)
+
+    def run(self):
+        """
+        :return: RandomWalkResult
+        """
+        _t0 = time.perf_counter()
+        _workers = min(self.workers, self.walkers)
+        if _workers <= 1:
+            _results = [_walk_task(t) for t in self._tasks()]
+        else:
+            with multiprocessing.get_context(self.mpContext).Pool(_workers) as _pool:
+                _results = _pool.map(_walk_task, self._tasks(), chunksize=1)
+        _sequences = []
+        _coverage = 0
+        _steps = 0
+        for _walk_sequences, _bitmap, _done in _results:
+            _sequences.extend(_walk_sequences)
+            _coverage |= _bitmap
+            _steps += _done
+        return RandomWalkResult(self.graph, self._merge(_sequences), _coverage, _steps, time.perf_counter() - _t0,
+                                [self.seed + i for i in range(self.walkers)])
+
+    @staticmethod
+    def _merge(sequences):
+        # keep the first occurrence, drop duplicates and prefixes of other sequences.
+        _sorted = sorted(set(sequences))
+        _redundant = set()
+        for _a, _b in zip(_sorted, _sorted[1:]):
+            if _b[:len(_a)] == _a:
+                _redundant.add(_a)
+        _seen = set()
+        _merged = []
+        for _s in sequences:
+            if _s in _redundant or _s in _seen:
+                continue
+            _seen.add(_s)
+            _merged.append(list(_s))
+        return _merged
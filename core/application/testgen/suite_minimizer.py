@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : suite_minimizer.py
+# ------------------------------------------------------------------------------
+#
+# File          : suite_minimizer.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import heapq
+from ..core.exceptions import TestGenerationError
+from .coverage import CoverageMap, popcount
+
+
+class MinimizedSuite:
+    def __init__(self, selected, cost, covered, target_count, original_cost):
+        # indices of the kept tests, in selection order.
+        self.selected = selected
+        self.cost = cost
+        self.covered = covered
+        self.targetCount = target_count
+        self.originalCost = original_cost
+
+    def __len__(self):
+        return len(self.selected)
+
+    @property
+    def saving(self):
+        return 1.0 - self.cost / self.originalCost if self.originalCost else 0.0
+
+    def summary(self):
+        return '{} tests, cost {:g} of {:g} ({:.1%} saved), {} of {} elements covered'.format(
+            len(self.selected), self.cost, self.originalCost, self.saving, self.covered, self.targetCount)
+
+
+class PrioritizedSuite:
+    def __init__(self, order, curve, total_duration):
+        # indices of all tests in execution order.
+        self.order = order
+        # (elapsed time, covered count) after every test.
+        self.curve = curve
+        self.totalDuration = total_duration
+
+    def time_to(self, covered):
+        """
+        Returns the elapsed time until the count of covered elements is reached, None if never.
+        """
+        for _time, _covered in self.curve:
+            if _covered >= covered:
+                return _time
+        return None
+
+    def area(self):
+        """
+        area under the step curve of the coverage over time, normalized to
+        1.0 for all coverage at time 0. higher is better, comparable
+        between orders of the same tests.
+        """
+        if not self.curve or not self.totalDuration or not self.curve[-1][1]:
+            return 0.0
+        _area = 0.0
+        _prev_time = 0.0
+        _prev_covered = 0
+        for _time, _covered in self.curve:
+            _area += (_time - _prev_time) * _prev_covered
+            _prev_time, _prev_covered = _time, _covered
+        _area += (self.totalDuration - _prev_time) * _prev_covered
+        return _area / (self.totalDuration * self.curve[-1][1])
+
+
+def _bits_of(test):
+    return test.bits if isinstance(test, CoverageMap) else test
+
+
+class SuiteMinimizer:
+    """
+    Minimization and prioritization of a test suite by its coverage.
+
+    every test is given by its coverage bitmap (int or CoverageMap). the
+    minimization is a weighted greedy set cover (the test with the most
+    newly covered elements per cost first, evaluated lazily since the
+    gains only shrink), followed by a local search: a test not in the
+    suite is added if the tests it makes redundant cost more than it,
+    redundant tests are dropped most expensive first. the prioritization
+    orders all tests by additional coverage per second of their recorded
+    duration, when nothing new is left the coverage is reset and the
+    remaining tests are ordered the same way.
+    """
+
+    def __init__(self, tests, costs=None, target=None):
+        """
+        :param tests: list of coverage bitmaps (int or CoverageMap)
+        :param costs: list of positive costs per test, e.g. durations, 1 each if None
+        :param target: bitmap of the elements to keep covered, the union of all tests if None
+        """
+        self.tests = [_bits_of(t) for t in tests]
+        if costs is None:
+            costs = [1] * len(self.tests)
+        if len(costs) != len(self.tests):
+            raise TestGenerationError('one cost per test required')
+        if any(c <= 0 for c in costs):
+            raise TestGenerationError('costs must be positive')
+        self.costs = list(costs)
+        _union = 0
+        for _t in self.tests:
+            _union |= _t
+        self.target = _union if target is None else _bits_of(target) & _union
+
+    @staticmethod
+    def _greedy(tests, costs, target, candidates):
+        # lazy weighted greedy, returns the selected indices in order.
+        _covered = 0
+        _selected = []
+        _heap = []
+        for _i in candidates:
+            _gain = popcount(tests[_i] & target)
+            if _gain:
+                _heap.append((-_gain / costs[_i], _i))
+        heapq.heapify(_heap)
+        while _heap and _covered != target:
+            _ratio, _i = heapq.heappop(_heap)
+            _gain = popcount(tests[_i] & target & ~_covered)
+            if not _gain:
+                continue
+            _current = -_gain / costs[_i]
+            if _heap and _current > _heap[0][0]:
+                heapq.heappush(_heap, (_current, _i))
+                continue
+            _selected.append(_i)
+            _covered |= tests[_i]
+        return _selected
+
+    def _drop_redundant(self, selected):
+        """
+        drop the tests whose target elements are all covered by others,
+        most expensive first.
+        """
+        _tests = self.tests
+        _target = self.target
+        _selected = list(selected)
+        while True:
+            _once = 0
+            _multi = 0
+            for _i in _selected:
+                _bits = _tests[_i] & _target
+                _multi |= _once & _bits
+                _once |= _bits
+            _redundant = [i for i in _selected if not (_tests[i] & _target & ~_multi)]
+            if not _redundant:
+                return _selected
+            _drop = max(_redundant, key=lambda i: (self.costs[i], -i))
+            _selected.remove(_drop)
+
+    def _unique(self, selected):
+        # per selected test the target elements no other selected test covers.
+        _once = 0
+        _multi = 0
+        for _i in selected:
+            _bits = self.tests[_i] & self.target
+            _multi |= _once & _bits
+            _once |= _bits
+        return {i: self.tests[i] & self.target & ~_multi for i in selected}
+
+    def _local_search(self, selected, max_rounds):
+        """
+        add a test if the tests it makes redundant cost more. a selected
+        test can only become redundant through a test covering its unique
+        elements, one of them is its witness, so only the tests hitting a
+        witness are checked exactly.
+        """
+        _tests = self.tests
+        _costs = self.costs
+        _cost = sum(_costs[i] for i in selected)
+        _candidates = sorted((i for i in range(len(_tests)) if _tests[i] & self.target), key=lambda i: _costs[i])
+        for _ in range(max_rounds):
+            _improved = False
+            _stale = True
+            for _u in _candidates:
+                if _stale:
+                    _in_suite = set(selected)
+                    _unique = self._unique(selected)
+                    _witness = dict()
+                    _witness_mask = 0
+                    for _s, _bits in _unique.items():
+                        _low = _bits & -_bits
+                        _witness.setdefault(_low, []).append(_s)
+                        _witness_mask |= _low
+                    _stale = False
+                if _u in _in_suite:
+                    continue
+                _bits_u = _tests[_u]
+                _hits = _bits_u & _witness_mask
+                _freed = 0
+                while _hits:
+                    _low = _hits & -_hits
+                    _hits ^= _low
+                    for _s in _witness[_low]:
+                        if not _unique[_s] & ~_bits_u:
+                            _freed += _costs[_s]
+                if _freed <= _costs[_u]:
+                    continue
+                _trial = self._drop_redundant(selected + [_u])
+                _trial_cost = sum(_costs[i] for i in _trial)
+                if _trial_cost < _cost:
+                    selected, _cost = _trial, _trial_cost
+                    _improved = _stale = True
+            if not _improved:
+                break
+        return selected
+
+    def minimize(self, local_search=True, max_rounds=10):
+        """
+        :param local_search: bool, improve the greedy suite
+        :param max_rounds: int, max count of passes of the local search
+        :return: MinimizedSuite
+        """
+        _costs = self.costs
+        _selected = self._drop_redundant(self._greedy(self.tests, _costs, self.target, range(len(self.tests))))
+        if local_search:
+            _selected = self._local_search(_selected, max_rounds)
+        _covered = 0
+        for _i in _selected:
+            _covered |= self.tests[_i]
+        return MinimizedSuite(_selected, sum(_costs[i] for i in _selected), popcount(_covered & self.target),
+                              popcount(self.target), sum(_costs))
+
+    def prioritize(self, durations=None):
+        """
+        :param durations: list of recorded durations per test, the costs if None
+        :return: PrioritizedSuite
+        """
+        _durations = self.costs if durations is None else list(durations)
+        if len(_durations) != len(self.tests) or any(d <= 0 for d in _durations):
+            raise TestGenerationError('one positive duration per test required')
+        _left = list(range(len(self.tests)))
+        _order = []
+        _curve = []
+        _elapsed = 0.0
+        _total_covered = 0
+        while _left:
+            _round = self._greedy(self.tests, _durations, self.target, _left)
+            if not _round:
+                # no coverage left at all, shortest first.
+                _round = sorted(_left, key=lambda i: _durations[i])
+            _picked = set(_round)
+            _left = [i for i in _left if i not in _picked]
+            _order.extend(_round)
+        for _i in _order:
+            _elapsed += _durations[_i]
+            _total_covered |= self.tests[_i] & self.target
+            _curve.append((_elapsed, popcount(_total_covered)))
+        return PrioritizedSuite(_order, _curve, _elapsed)
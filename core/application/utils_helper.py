@@ -19,10 +19,11 @@
 #
 #
 # ------------------------------------------------------------------------------
-import ast, functools, json, decimal, gettext, pathlib
+import ast, functools, json, decimal, gettext, pathlib, hashlib, threading
 import datetime
 import os, sys, platform, math, uuid, bitstring, glob
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from concurrent.futures import Future
 from itertools import tee
 import psutil
 from .define import APP_CONSOLE_TIME_WX_FMT, SIZE_UNITS,APP_TIME_PY_FMT
@@ -30,6 +31,10 @@ from .define import APP_CONSOLE_TIME_WX_FMT, SIZE_UNITS,APP_TIME_PY_FMT
 # from .python.class_evaluator import DEFAULT_EXPRESSION_EVALUATOR
 
 RGET_RSET_DELIMITER = "."
+# compiled user scripts by content hash, see util_py_script_compile.
+PY_SCRIPT_CODE_CACHE_SIZE = 512
+_PY_SCRIPT_CODE_CACHE = OrderedDict()
+_PY_SCRIPT_CODE_CACHE_LOCK = threading.Lock()
 
 # gettext.bindtextdomain('myapplication', '/path/to/my/language/directory')
 # gettext.textdomain('myapplication')
@@ -50,32 +55,82 @@ def util_ellipse_str(s, length):
     return s[0:length] + '...' if len(s) > length else s
 
 
-def util_simple_py_script_execute(src, envs: dict):
-    _ast_object = ast.parse(src)
-    _code = compile(_ast_object, filename='', mode='exec')
-    exec(_code, envs)
-    envs.pop('__builtins__')
+def util_py_script_digest(src):
+    return hashlib.blake2b(src.encode('utf-8'), digest_size=16).digest()
 
 
-def util_py_script_execute(src, kwargs: dict, result_vars: list or str):
-    _ast_object = ast.parse(src)
-    _code = compile(_ast_object, filename='', mode='exec')
-    _local_d = dict(**kwargs)
-    exec(_code, _local_d)
+def util_py_script_compile(src, digest=None):
+    """
+    compile the script source once, the code object is cached by the
+    content hash of the source.
+    :param src: str, python source
+    :param digest: bytes, precomputed digest of the source, optional
+    :return: code object
+    """
+    if digest is None:
+        digest = util_py_script_digest(src)
+    with _PY_SCRIPT_CODE_CACHE_LOCK:
+        _code = _PY_SCRIPT_CODE_CACHE.get(digest)
+        if _code is not None:
+            _PY_SCRIPT_CODE_CACHE.move_to_end(digest)
+            return _code
+    _code = compile(ast.parse(src), filename='', mode='exec')
+    with _PY_SCRIPT_CODE_CACHE_LOCK:
+        _PY_SCRIPT_CODE_CACHE[digest] = _code
+        while len(_PY_SCRIPT_CODE_CACHE) > PY_SCRIPT_CODE_CACHE_SIZE:
+            _PY_SCRIPT_CODE_CACHE.popitem(last=False)
+    return _code
+
+
+def util_py_script_collect(local_d: dict, result_vars: list or str):
     if isinstance(result_vars, str):
-        if result_vars in _local_d:
-            return _local_d.get(result_vars)
+        if result_vars in local_d:
+            return local_d.get(result_vars)
         else:
             return None
     elif isinstance(result_vars, list):
         _ret = dict()
         for x in result_vars:
-            if x in _local_d:
-                _ret.update({x: _local_d.get(x)})
+            if x in local_d:
+                _ret.update({x: local_d.get(x)})
         return _ret
     return None
 
 
+def util_simple_py_script_execute(src, envs: dict):
+    _code = util_py_script_compile(src)
+    exec(_code, envs)
+    envs.pop('__builtins__')
+
+
+def util_py_script_execute(src, kwargs: dict, result_vars: list or str):
+    _code = util_py_script_compile(src)
+    _local_d = dict(**kwargs)
+    exec(_code, _local_d)
+    return util_py_script_collect(_local_d, result_vars)
+
+
+def util_py_script_submit(src, kwargs: dict, result_vars: list or str, pool=None, timeout=None):
+    """
+    execute the script asynchronously in the worker pool, without pool the
+    script runs in place and the returned future is already done.
+    :param src: str, python source
+    :param kwargs: dict, script globals, must be picklable for the pool
+    :param result_vars: list or str, names of the result variables
+    :param pool: PyScriptWorkerPool, optional
+    :param timeout: float, time limit in seconds, pool default if None
+    :return: concurrent.futures.Future
+    """
+    if pool is not None:
+        return pool.submit(src, kwargs, result_vars, timeout=timeout)
+    _future = Future()
+    try:
+        _future.set_result(util_py_script_execute(src, kwargs, result_vars))
+    except Exception as e:
+        _future.set_exception(e)
+    return _future
+
+
 def util_float_range(start, stop, step, precision=2):
     while start < stop:
         yield round(float(start), precision)
@@ -20,5 +20,7 @@
 #
 # ------------------------------------------------------------------------------
 import i18n
+from .class_i18n_catalog import CompiledI18n
 
-zI18n = i18n
+# python-i18n compatible, lookups go through compiled per locale catalogs.
+zI18n = CompiledI18n(i18n)
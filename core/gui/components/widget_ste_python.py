@@ -19,7 +19,7 @@
 #
 #
 # ------------------------------------------------------------------------------
-import keyword
+import re, io, keyword, tokenize
 from core.gui.qtimp import QtGui, QtCore, QtWidgets
 from .widget_ste import STETextEdit, STENumberBar
 
@@ -61,8 +61,111 @@ _STE_STYLES = {
 }
 
 
+_STE_STATE_NORMAL = 0
+_STE_STATE_TRI_SINGLE = 1
+_STE_STATE_TRI_DOUBLE = 2
+# end of a triple quoted string continued from the previous block.
+_STE_TRI_END = {
+    _STE_STATE_TRI_SINGLE: re.compile(r"(?:[^\\']|\\.|'(?!''))*'''"),
+    _STE_STATE_TRI_DOUBLE: re.compile(r'(?:[^\\"]|\\.|"(?!""))*"""'),
+}
+_STE_TRI_START = re.compile(r'(?i)(?<!\w)[rbuf]{0,2}(\'\'\'|""")')
+_STE_BRACES = frozenset('{}()[]')
+_STE_STRING_TOKENS = frozenset(('STRING', 'FSTRING_START', 'FSTRING_MIDDLE', 'FSTRING_END'))
+_STE_SKIP_TOKENS = frozenset((tokenize.INDENT, tokenize.DEDENT, tokenize.NL, tokenize.NEWLINE,
+                              tokenize.COMMENT, tokenize.ENDMARKER))
+
+
+def _ste_lex_python_line(text, state, keywords):
+    '''Lex one line with ``tokenize``, ``state`` tells if the line starts inside
+    a triple quoted string. Returns the spans (start, length, style name)
+    and the state at the end of the line.
+    '''
+    _spans = []
+    _offset = 0
+    if state in _STE_TRI_END:
+        _match = _STE_TRI_END[state].match(text)
+        if _match is None:
+            if text:
+                _spans.append((0, len(text), 'string2'))
+            return _spans, state
+        _offset = _match.end()
+        _spans.append((0, _offset, 'string2'))
+    _src = text[_offset:]
+    _prev = _prev2 = None
+    _pos = 0
+    try:
+        for _tok in tokenize.generate_tokens(io.StringIO(_src).readline):
+            if _tok.start[0] != 1:
+                break
+            _type = _tok.type
+            _string = _tok.string
+            _start = _tok.start[1]
+            _end = _tok.end[1] if _tok.end[0] == 1 else len(_src)
+            _style = None
+            if _type == tokenize.NAME:
+                if _string in keywords:
+                    _style = 'keyword'
+                elif _string == 'self':
+                    _style = 'self'
+                elif _prev == 'def':
+                    _style = 'defclass'
+                elif _prev == 'class':
+                    _style = 'classes'
+                elif _prev == '.' and _prev2 == 'self':
+                    _style = 'selfnext'
+                elif _prev in ('.', 'Q'):
+                    # attribute access, or a word after 'Q'.
+                    _style = 'Qnext'
+            elif _type == tokenize.NUMBER:
+                _style = 'numbers'
+            elif _type == tokenize.COMMENT:
+                _style = 'comment'
+            elif _type == tokenize.OP:
+                _style = 'brace' if _string in _STE_BRACES else 'operator'
+            elif tokenize.tok_name[_type] in _STE_STRING_TOKENS:
+                _style = 'string2' if _string.lstrip('rRbBuUfF')[:3] in ("'''", '"""') else 'string'
+            elif _type == tokenize.ERRORTOKEN and _string in ('"', "'"):
+                # unterminated string, the rest of the line.
+                _spans.append((_offset + _start, len(_src) - _start, 'string'))
+                break
+            if _style is not None:
+                _spans.append((_offset + _start, _end - _start, _style))
+            if _type not in _STE_SKIP_TOKENS:
+                _prev2, _prev = _prev, _string
+            _pos = _end
+    except (tokenize.TokenError, SyntaxError):
+        # an open triple quoted string runs into the next block.
+        _match = _STE_TRI_START.search(_src, _pos)
+        if _match is not None:
+            _spans.append((_offset + _match.start(), len(_src) - _match.start(), 'string2'))
+            if _match.group(1) == "'''":
+                return _spans, _STE_STATE_TRI_SINGLE
+            return _spans, _STE_STATE_TRI_DOUBLE
+    return _spans, _STE_STATE_NORMAL
+
+
+class STEBlockTokenData(QtGui.QTextBlockUserData):
+    '''Token spans of a block, valid as long as the block revision and the
+    state of the previous block are unchanged.
+    '''
+
+    def __init__(self, revision, prev_state, spans, state):
+        QtGui.QTextBlockUserData.__init__(self)
+        self.revision = revision
+        self.prevState = prev_state
+        self.spans = spans
+        self.state = state
+
+
 class STEPythonHighlighter(QtGui.QSyntaxHighlighter):
     '''Syntax highlighter for the Python language.
+
+    Blocks are lexed with ``tokenize``, the token spans are cached per block
+    and reused while the block revision and the incoming state are the same.
+    With an editor given, blocks outside the visible area are not lexed when
+    an edit changes the state of the following blocks, they keep their
+    format and are re-highlighted in chunks at idle time.
     '''
     # Python keywords
     keywords = [
@@ -73,135 +176,116 @@ class STEPythonHighlighter(QtGui.QSyntaxHighlighter):
         'raise', 'return', 'super', 'try', 'while', 'yield',
         'None', 'True', 'False',
     ]
-    # Python operators
-    operators = [
-        '=',
-        # Comparison
-        '==', '!=', '<', '<=', '>', '>=',
-        # Arithmetic
-        '\+', '-', '\*', '/', '//', '\%', '\*\*',
-        # In-place
-        '\+=', '-=', '\*=', '/=', '\%=',
-        # Bitwise
-        '\^', '\|', '\&', '\~', '>>', '<<',
-    ]
-    # Python braces
-    braces = [
-        '\{', '\}', '\(', '\)', '\[', '\]',
-    ]
+    # count of blocks lexed per idle step
+    IDLE_CHUNK = 200
+    # blocks around the viewport treated as visible
+    VISIBLE_MARGIN = 50
 
-    def __init__(self, document):
+    def __init__(self, document, editor=None):
         QtGui.QSyntaxHighlighter.__init__(self, document)
-        _tri = ("'''")
-        _trid = ('"""')
-        # Multi-line strings (expression, flag, style)
-        # FIXME: The triple-quotes in these two lines will mess up the
-        # syntax highlighting from this point onward
-        self.tri_single = (QtCore.QRegularExpression(_tri), 1, _STE_STYLES['string2'])
-        self.tri_double = (QtCore.QRegularExpression(_trid), 2, _STE_STYLES['string2'])
-        _rules = []
-        # Keyword, operator, and brace rules
-        _rules += [(r'\b%s\b' % w, 0, _STE_STYLES['keyword'])
-                   for w in self.keywords]
-        _rules += [(r'%s' % o, 0, _STE_STYLES['operator'])
-                   for o in self.operators]
-        _rules += [(r'%s' % b, 0, _STE_STYLES['brace'])
-                   for b in self.braces]
-        # All other rules
-        _rules += [
-            # Numeric literals
-            (r'\b[+-]?[0-9]+[lL]?\b', 0, _STE_STYLES['numbers']),
-            (r'\b[+-]?0[xX][0-9A-Fa-f]+[lL]?\b', 0, _STE_STYLES['numbers']),
-            (r'\b[+-]?[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?\b', 0, _STE_STYLES['numbers']),
-
-            # 'self'
-            (r'\bself\b', 0, _STE_STYLES['self']),
-
-            # Double-quoted string, possibly containing escape sequences ### "\"([^\"]*)\"" ### "\"(\\w)*\""
-            (r'"[^"\\]*(\\.[^"\\]*)*"', 0, _STE_STYLES['string']),
-            # Single-quoted string, possibly containing escape sequences
-            (r"'[^'\\]*(\\.[^'\\]*)*'", 0, _STE_STYLES['string']),
-
-            # 'def' followed by a word
-            (r'\bdef\b\s*(\w+)', 1, _STE_STYLES['defclass']),  ### (r'\bdef\b\s*(\w+)', 1, STYLES['defclass']),
-
-            # 'self.' followed by a word
-            (r'\bself\b)', 1, _STE_STYLES['selfnext']),  ### (r'\bself.\b\s*(\w+)', 1, STYLES['selfnext']),
-
-            # 'Q' followed by a word
-            (r'\b[Q.]\b\s*(\w+)', 1, _STE_STYLES['Qnext']),
-
-            # 'class' followed by an identifier
-            (r'\bclass\b\s*(\w+)', 1, _STE_STYLES['classes']),
-
-            # From '#' until a newline
-            (r'#[^\n]*', 0, _STE_STYLES['comment']),
-
-            # 'Q'  word
-            # (r'\\bQ[A-Za-z]+\\b', 1, STYLES['Qtclass']), #(QRegExp("\\bQ[A-Za-z]+\\b")
-        ]
-        # Build a QRegExp for each pattern
-        self.rules = [(QtCore.QRegularExpression(pat), index, fmt) for (pat, index, fmt) in _rules]
+        self._keywords = frozenset(self.keywords) | frozenset(keyword.kwlist)
+        self._editor = editor
+        self._visibleRange = None
+        self._pendingFrom = None
+        self._inIdle = False
+        self._idleBudget = 0
+        self._idleTimer = QtCore.QTimer(self)
+        self._idleTimer.setSingleShot(True)
+        self._idleTimer.setInterval(0)
+        self._idleTimer.timeout.connect(self._on_idle)
+        if editor is not None:
+            editor.updateRequest.connect(self._on_editor_update_request)
+            document.contentsChange.connect(self._invalidate_visible_range)
+
+    def _invalidate_visible_range(self, *args):
+        self._visibleRange = None
+
+    def _get_visible_range(self):
+        if self._visibleRange is None:
+            _first = self._editor.firstVisibleBlock().blockNumber()
+            _count = self._editor.viewport().height() // max(self._editor.fontMetrics().height(), 1) + 1
+            self._visibleRange = (_first - self.VISIBLE_MARGIN, _first + _count + self.VISIBLE_MARGIN)
+        return self._visibleRange
+
+    def _can_defer(self, block):
+        if self._editor is None or (self._inIdle and self._idleBudget > 0):
+            return False
+        _first, _last = self._get_visible_range()
+        return not _first <= block.blockNumber() <= _last
+
+    @staticmethod
+    def _is_stale(block):
+        _data = block.userData()
+        _prev = block.previous()
+        _prev_state = max(_prev.userState(), 0) if _prev.isValid() else 0
+        return (not isinstance(_data, STEBlockTokenData) or _data.revision != block.revision()
+                or _data.prevState != _prev_state)
+
+    def _mark_pending(self, block):
+        _number = block.blockNumber()
+        if self._pendingFrom is None or _number < self._pendingFrom:
+            self._pendingFrom = _number
+        if not self._idleTimer.isActive():
+            self._idleTimer.start()
 
     def highlightBlock(self, text):
-        # Apply syntax highlighting to the given block of text.
-        # Do other syntax formatting
-        for expression, nth, format_ in self.rules:
-            _match = expression.match(text, 0)
-            _index = _match.capturedStart()
-            while _index >= 0:
-                _index = _match.capturedStart(nth)
-                _length = _match.capturedLength()
-                self.setFormat(_index, _length, format_)
-                _match = expression.match(text, _index + _length)
-                _index = _match.capturedStart()
-
-        self.setCurrentBlockState(0)
-        # Do multi-line strings
-        _in_multiline = self.match_multiline(text, *self.tri_single)
-        if not _in_multiline:
-            _in_multiline = self.match_multiline(text, *self.tri_double)
-
-    def match_multiline(self, text, delimiter, in_state, style):
-        '''Do highlighting of multi-line strings. ``delimiter`` should be a
-        ``QRegularExpression`` for triple-single-quotes or triple-double-quotes, and
-        ``in_state`` should be a unique integer to represent the corresponding
-        state changes when inside those strings. Returns True if we're still
-        inside a multi-line string when this function is finished.
-        '''
-        # If inside triple-single quotes, start at 0
-        if self.previousBlockState() == in_state:
-            _start = 0
-            _len = 0
-        # Otherwise, look for the delimiter on this line
+        _block = self.currentBlock()
+        _prev_state = max(self.previousBlockState(), 0)
+        _revision = _block.revision()
+        _data = _block.userData()
+        _valid = isinstance(_data, STEBlockTokenData)
+        if _valid and _data.revision == _revision and _data.prevState == _prev_state:
+            _spans, _state = _data.spans, _data.state
+        elif self._can_defer(_block):
+            # keep the current state, so the cascade to the next blocks stops here.
+            _spans = _data.spans if _valid else ()
+            _state = self.currentBlockState()
+            if _state < 0:
+                _state = _prev_state
+            self._mark_pending(_block)
         else:
-            _match = delimiter.match(text)
-            _start = _match.capturedStart()
-            # Move past this match
-            _len = _match.capturedLength()
-        # As long as there's a delimiter match on this line...
-        while _start >= 0:
-            # Look for the ending delimiter
-            _match = delimiter.match(text, _start + _len)
-            _end = _match.capturedEnd()
-            # Ending delimiter on this line?
-            if _end >= _len:
-                _length = _end - _start + _len + _match.capturedLength()
-                self.setCurrentBlockState(0)
-            # No; multi-line string
+            _spans, _state = _ste_lex_python_line(text, _prev_state, self._keywords)
+            if _valid:
+                _data.revision, _data.prevState, _data.spans, _data.state = _revision, _prev_state, _spans, _state
             else:
-                self.setCurrentBlockState(in_state)
-                _length = len(text) - _start + _len
-            # Apply formatting
-            self.setFormat(_start, _length, style)
-            # Look for the next match
-            _match = delimiter.match(text, _start + _length)
-            _start = _match.capturedStart()
-        # Return True if still inside a multi-line string, False otherwise
-        if self.currentBlockState() == in_state:
-            return True
-        else:
-            return False
+                _block.setUserData(STEBlockTokenData(_revision, _prev_state, _spans, _state))
+            self._idleBudget -= 1
+        for _start, _length, _style in _spans:
+            self.setFormat(_start, _length, _STE_STYLES[_style])
+        self.setCurrentBlockState(_state)
+
+    def _on_idle(self):
+        if self._pendingFrom is None:
+            return
+        _block = self.document().findBlockByNumber(self._pendingFrom)
+        self._pendingFrom = None
+        self._inIdle = True
+        self._idleBudget = self.IDLE_CHUNK
+        _walk = self.IDLE_CHUNK * 10
+        try:
+            while _block.isValid() and self._idleBudget > 0 and _walk > 0:
+                if self._is_stale(_block):
+                    self.rehighlightBlock(_block)
+                _block = _block.next()
+                _walk -= 1
+        finally:
+            self._inIdle = False
+        if _block.isValid():
+            self._mark_pending(_block)
+
+    def _on_editor_update_request(self, rect, dy):
+        if not dy:
+            return
+        self._visibleRange = None
+        if self._pendingFrom is None:
+            return
+        # scrolled into deferred blocks, bring the visible ones up to date.
+        _first, _last = self._get_visible_range()
+        _block = self.document().findBlockByNumber(max(_first, self._pendingFrom))
+        while _block.isValid() and _block.blockNumber() <= _last:
+            if self._is_stale(_block):
+                self.rehighlightBlock(_block)
+            _block = _block.next()
 
 
 class PythonSTE(QtWidgets.QWidget):
@@ -210,7 +294,7 @@ class PythonSTE(QtWidgets.QWidget):
         self.mainLayout = QtWidgets.QHBoxLayout()
         self.editor = STETextEdit(self)
         self.lnWidget = STENumberBar(self.editor)
-        self.highlighter = STEPythonHighlighter(self.editor.document())
+        self.highlighter = STEPythonHighlighter(self.editor.document(), self.editor)
         self.completer = None
         self._init_completer()
         # layout
@@ -23,6 +23,39 @@ import weakref, addict, inspect
 from pubsub import pub
 from core.application.core.base import singleton
 from core.application.zI18n import zI18n
+from core.gui.qtimp import QtWidgets
+
+# how a registered setter is called, resolved once at register time.
+SETTER_CALL_NONE = 0
+SETTER_CALL_TEXT = 1
+SETTER_CALL_TEXT_TARGET = 2
+
+
+def resolve_setter_call(setter):
+    """
+    resolve how the setter is called on retranslate.
+    bound methods take (text) or (text, target), functions take (text) or
+    (text, target), other callables (e.g. Qt slots) take (text).
+
+    :param setter: callable or None
+    :return: int, one of SETTER_CALL_*
+    """
+    if setter is None:
+        return SETTER_CALL_NONE
+    _is_method = inspect.ismethod(setter)
+    if not _is_method and not inspect.isfunction(setter):
+        return SETTER_CALL_TEXT
+    try:
+        _arg_len = len(inspect.getfullargspec(setter).args)
+    except TypeError:
+        return SETTER_CALL_TEXT
+    if _is_method:
+        _arg_len -= 1
+    if _arg_len == 1:
+        return SETTER_CALL_TEXT
+    if _arg_len == 2:
+        return SETTER_CALL_TEXT_TARGET
+    return SETTER_CALL_NONE
 
 
 class I18nRepositoryUsageRegistryItem:
@@ -32,12 +65,15 @@ class I18nRepositoryUsageRegistryItem:
         self.setter = setter
         self.getter = getter
         self.options = options
+        self.setterCall = resolve_setter_call(setter)
 
 
 @singleton
 class I18nRepository:
     def __init__(self):
         self._map = weakref.WeakKeyDictionary()
+        # same registrations grouped by namespace, {ns: {target: item}}
+        self._nsMap = dict()
         pub.subscribe(self.on_locale_changed, 'locale')
 
     @property
@@ -46,19 +82,26 @@ class I18nRepository:
 
     @staticmethod
     def build_i18n(item: I18nRepositoryUsageRegistryItem, **options):
-        return zI18n.t('%s.%s' % (item.i18nNs, item.i18nKey))
+        return zI18n.tk(item.i18nNs, item.i18nKey)
 
     def _get_best_color(self):
         return self._themePalette.windowText().color()
 
     def register(self, target_obj, i18n_ns, i18n_key, setter=None, getter=None, options: dict = None):
         _item = I18nRepositoryUsageRegistryItem(i18n_ns, i18n_key, setter, getter, options)
+        _prev_item = self._map.get(target_obj)
+        if _prev_item is not None and _prev_item.i18nNs != i18n_ns:
+            self._nsMap[_prev_item.i18nNs].pop(target_obj, None)
         self._map[target_obj] = _item
+        if i18n_ns not in self._nsMap:
+            self._nsMap[i18n_ns] = weakref.WeakKeyDictionary()
+        self._nsMap[i18n_ns][target_obj] = _item
         return _item
 
     def unregister(self, target_obj):
         if target_obj in self._map:
-            self._map.pop(target_obj)
+            _item = self._map.pop(target_obj)
+            self._nsMap[_item.i18nNs].pop(target_obj, None)
 
     def get_i18n(self, target_obj, **kwargs):
         _key = target_obj
@@ -68,22 +111,29 @@ class I18nRepository:
         return self.build_i18n(_item)
 
     def _retranslate(self):
-        for k, v in self._map.items():
-            if v.setter is not None:
-                _arg_len = len(inspect.getfullargspec(v.setter).args)
-                _i18n_text = self.build_i18n(v)
-                if inspect.ismethod(v.setter):
-                    if _arg_len == 2:
-                        v.setter(_i18n_text)
-                    elif _arg_len == 3:
-                        v.setter(_i18n_text, k)
-                elif inspect.isfunction(v.setter):
-                    if _arg_len == 1:
+        # suspend painting of the windows until all texts are set.
+        _windows = []
+        if QtWidgets.QApplication.instance() is not None:
+            _windows = [w for w in QtWidgets.QApplication.topLevelWidgets() if w.updatesEnabled()]
+        for w in _windows:
+            w.setUpdatesEnabled(False)
+        try:
+            for _ns, _items in self._nsMap.items():
+                # each distinct key of the namespace is translated once.
+                _texts = dict()
+                for k, v in list(_items.items()):
+                    if v.setterCall == SETTER_CALL_NONE:
+                        continue
+                    _i18n_text = _texts.get(v.i18nKey)
+                    if _i18n_text is None:
+                        _i18n_text = _texts[v.i18nKey] = self.build_i18n(v)
+                    if v.setterCall == SETTER_CALL_TEXT:
                         v.setter(_i18n_text)
-                    elif _arg_len == 2:
+                    else:
                         v.setter(_i18n_text, k)
-                else:
-                    v.setter(_i18n_text)
+        finally:
+            for w in _windows:
+                w.setUpdatesEnabled(True)
 
     def on_locale_changed(self, topic: pub.Topic = pub.AUTO_TOPIC, **msg_data):
         self._retranslate()
@@ -19,20 +19,36 @@
 #
 #
 # ------------------------------------------------------------------------------
-import os, re, copy, json
+import os, re, gc, copy, json, logging, contextlib
 from core.application.core.base import Serializable
+from core.application.graph_algo import LayeredLayout, DynamicTopoOrder
 from core.gui.qtimp import QtGui, QtWidgets, QtCore, SerializableQObject, ClassFactory
 from .views.class_node_graph_view import NodeGraphView
 from .class_node_object import NodeObject
-from .core.define import (EnumLayoutDirection, URN_SCHEME, URI_SCHEME, EnumGraphViewFlag, EnumGraphFlag, EnumPipeShapeStyle)
+from .core.define import (EnumLayoutDirection, URN_SCHEME, URI_SCHEME, EnumGraphViewFlag, EnumGraphFlag, EnumPipeShapeStyle,
+                          EnumViewportBackend)
 from .core.class_menu import NodeGraphMenu, NodesMenu
 from .views.class_node_graph_widget import NodeGraphWidget
+from .views.class_node_find_widget import NodeFindWidget
 from .core.class_node_graph_view_setting import NodeGraphViewSetting
+from .core.class_node_graph_undo_stack import NodeGraphUndoStack
+from .core.class_node_find_index import (NodeFindIndex, FIND_FIELD_NAME, FIND_FIELD_PROP, FIND_FIELD_PORT,
+                                         make_field, split_field)
+from .core.clipboard import (CLIPBOARD_MIME_TYPE, CLIPBOARD_YAML_MIME_TYPE, CLIPBOARD_VERSION,
+                             encode_clipboard, decode_clipboard, validate_clipboard_data, is_encodable)
 from .core.exceptions import *
 from .core.commands import (NodeViewAddedCmd,
                             NodeViewRemovedCmd,
                             NodeViewMovedCmd,
-                            PortViewConnectedCmd)
+                            NodesViewMovedCmd,
+                            NodeViewBatchCmd,
+                            PortViewConnectedCmd,
+                            NodesRestoredCmd,
+                            connect_ports)
+
+logger = logging.getLogger(__name__)
+
+_NAME_SUFFIX_REGEX = re.compile(r'^(.*\S) (\d+)$')
 
 
 class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
@@ -62,6 +78,13 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
     :parameters: :class:`NodeGraphQt.NodeObject`
     :emits: created node
     """
+    sigNodesCreated = QtCore.Signal(list)
+    """
+    Signal triggered once when nodes were created inside a :meth:`NodeGraph.batch` block.
+
+    :parameters: list[:class:`NodeGraphQt.NodeObject`]
+    :emits: created nodes
+    """
     sigNodesDeleted = QtCore.Signal(list)
     """
     Signal triggered when nodes have been deleted from the node graph.
@@ -141,6 +164,17 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         self.__common_node_props = {}
 
         self.nodes = kwargs.get('nodes', {})
+        # secondary indices, kept in sync by add_node_ref/remove_node_ref.
+        self._nodeNameIndex = dict()
+        self._nodeTypeIndex = dict()
+        self._nodeNameSuffix = dict()
+        # inverted index over node names, property values and port names.
+        self._findIndex = NodeFindIndex()
+        self._findWidget = None
+        # node id topological order, answers the acyclic connection checks.
+        self._reachability = DynamicTopoOrder()
+        for _n in self.nodes.values():
+            self._index_node(_n)
         self.session = ''
         self._layoutDirection = kwargs.get('layout_direction', EnumLayoutDirection.HORIZONTAL.value)
         self._viewFlags = kwargs.get('view_flags', EnumGraphViewFlag.DEFAULT)
@@ -149,8 +183,16 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         self._viewFactory = kwargs.get('view_factory') or ClassFactory()
         self._nodeFactory = kwargs.get('node_factory') or ClassFactory()
         self._undoView = None
-        self._undoStack = kwargs.get('undo_stack') or QtGui.QUndoStack(self)
+        self._undoStack = kwargs.get('undo_stack') or NodeGraphUndoStack(
+            self,
+            undo_limit=kwargs.get('undo_limit', 1000),
+            memory_budget=kwargs.get('undo_memory_budget', 32 * 1024 * 1024))
         self._widget = None
+        # add a YAML text copy to the clipboard next to the binary payload.
+        self._clipboardYaml = kwargs.get('clipboard_yaml', False)
+        # commands and created nodes collected inside a batch() block.
+        self._batchCmds = None
+        self._batchNodes = None
         self._subGraphs = kwargs.get('sub_graphs', dict())
         self._contextMenu = {}
         # initial view instance
@@ -222,6 +264,7 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         self._view.sigNodeSelectionChanged.connect(self.on_node_selection_changed)
         self._view.sigDataDropped.connect(self.on_node_data_dropped)
         # self._view.sigBackdropNodeUpdated.connect(self.on_node_backdrop_updated)
+        self.sigPropertyChanged.connect(self._on_find_property_changed)
 
     @staticmethod
     def set_flag(flags, flag, on):
@@ -443,11 +486,7 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         Args:
             node_data (dict): {<node_view>: <previous_pos>}
         """
-        self._undoStack.beginMacro('move nodes')
-        for node_view, prev_pos in node_data.items():
-            _node = self.nodes[node_view.id]
-            self._undoStack.push(NodeViewMovedCmd(_node, _node.view.xy_pos, prev_pos))
-        self._undoStack.endMacro()
+        self._undoStack.push(NodesViewMovedCmd(self, node_data))
 
     # def on_node_backdrop_updated(self, node_id, update_property, value):
     #     """
@@ -535,6 +574,16 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         """
         return self._nodeFactory
 
+    @property
+    def shared_node_factory(self):
+        """
+        Return the read-only node factory shared by all sub graphs.
+
+        Returns:
+            FrozenClassFactory: read-only view of the root node factory.
+        """
+        return self._nodeFactory.frozen()
+
     @property
     def view_factory(self):
         return self._viewFactory
@@ -559,6 +608,7 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
                     _tab_btn.deleteLater()
                     _tab_bar.setTabButton(0, btn_flag, None)
             self._widget.tabCloseRequested.connect(self._on_close_sub_graph_request)
+            self._widget.currentChanged.connect(self._on_sub_graph_tab_changed)
         return self._widget
 
     @property
@@ -574,6 +624,19 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
             self._undoView.setWindowTitle('Undo History')
         return self._undoView
 
+    @property
+    def find_widget(self):
+        """
+        Returns the find/replace panel of the node graph.
+
+        Returns:
+            NodeFindWidget: find panel widget.
+        """
+        if self._findWidget is None:
+            self._findWidget = NodeFindWidget(self)
+            self._findWidget.setWindowTitle('Find Nodes')
+        return self._findWidget
+
     def toggle_node_search(self):
         """
         toggle the node search widget visibility.
@@ -743,6 +806,59 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         """
         self._undoStack.endMacro()
 
+    @property
+    def in_batch(self):
+        return self._batchCmds is not None
+
+    @contextlib.contextmanager
+    def batch(self, name='add nodes'):
+        """
+        Context for inserting a large number of nodes at once.
+
+        while the block is active the scene index is disabled, the view
+        and the navigation widget stop repainting, per node selection changes
+        and the :attr:`NodeGraph.sigNodeCreated` signal are suppressed. at the
+        end the scene index is rebuilt once, one compound undo command is
+        pushed and :attr:`NodeGraph.sigNodesCreated` is emitted once.
+        nested blocks are merged into the outermost one. the cyclic garbage
+        collector is paused inside the block, the many small objects of the
+        new nodes would otherwise trigger repeated full collections.
+
+        Example:
+            with graph.batch('import nodes'):
+                for i in range(1000):
+                    graph.create_node('pkg.MyNode', pos=[i * 10, 0])
+
+        Args:
+            name (str): name for the undo command.
+        """
+        if self._batchCmds is not None:
+            yield self
+            return
+        self._batchCmds = []
+        self._batchNodes = []
+        self.get_scene().clearSelection()
+        self._view.begin_bulk_update()
+        if self._widget is not None:
+            self._widget.setUpdatesEnabled(False)
+        _gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            yield self
+        finally:
+            if _gc_enabled:
+                gc.enable()
+            _cmds, _nodes = self._batchCmds, self._batchNodes
+            self._batchCmds = None
+            self._batchNodes = None
+            self._view.end_bulk_update()
+            if self._widget is not None:
+                self._widget.setUpdatesEnabled(True)
+            if _cmds:
+                self._undoStack.push(NodeViewBatchCmd(self, name, _cmds))
+            if _nodes:
+                self.sigNodesCreated.emit(_nodes)
+
     def get_graph_context_menu(self):
         """
         Returns the context menu for the node graph.
@@ -1207,16 +1323,20 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
             # _node.update()
 
             _undo_cmd = NodeViewAddedCmd(self, _node, _node.view.pos())
+            if self._batchCmds is not None:
+                _undo_cmd.redo()
+                if push_undo:
+                    self._batchCmds.append(_undo_cmd)
+                self._batchNodes.append(_node)
+                return _node
             if push_undo:
                 _undo_label = 'create node: "{}"'.format(_node.type_)
                 self._undoStack.beginMacro(_undo_label)
-                for n in self.get_selected_nodes():
-                    n.set_property('selected', False, push_undo=True)
+                self.get_scene().clearSelection()
                 self._undoStack.push(_undo_cmd)
                 self._undoStack.endMacro()
             else:
-                for n in self.get_selected_nodes():
-                    n.set_property('selected', False, push_undo=False)
+                self.get_scene().clearSelection()
                 NodeViewAddedCmd(self, _node, _node.view.pos()).redo()
 
             self.sigNodeCreated.emit(_node)
@@ -1236,31 +1356,22 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
             push_undo (bool): register the command to the undo stack. (default: True)
         """
         assert isinstance(node, NodeObject), 'node must be a Node instance.'
-        _node_props = node.properties
-
-        if self.get_node_common_properties(node.type_) is None:
-            _node_attrs = {node.type_: {
-                attr: {'widget_type': pp.widgetType} for attr, pp in _node_props.items()
-            }}
-            # for pname, pattrs in _prop_attrs.items():
-            #     _node_attrs[_node.type_][pname].update(pattrs)
-            self.set_node_common_properties(_node_attrs)
-
-        # node._graph = self
         # node.NODE_NAME = self.get_unique_name(node.NODE_NAME)
-        # node.p_model._graph_model = self._model
-        # node.p_model.name = node.NODE_NAME
         node.graph = self
+        # the properties live on the view item, like in create_node.
+        node.view.update_properties_with(layout_direction=self.layout_direction)
 
-        _kwargs = dict()
-        _kwargs.update({'layout_direction': self.layout_direction})
-        node.update_properties_with(**_kwargs)
-
+        if self._batchCmds is not None:
+            _undo_cmd = NodeViewAddedCmd(self, node, pos)
+            _undo_cmd.redo()
+            if push_undo:
+                self._batchCmds.append(_undo_cmd)
+            return
         if push_undo:
             self._undoStack.beginMacro('add node: "{}"'.format(node.type_))
             self._undoStack.push(NodeViewAddedCmd(self, node, pos))
             if selected:
-                node.selected = True
+                node.view.setSelected(True)
             self._undoStack.endMacro()
         else:
             NodeViewAddedCmd(self, node, pos).redo()
@@ -1295,10 +1406,10 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         # if isinstance(node, GroupNode) and node.is_expanded:
         #     node.collapse()
         if push_undo:
-            self._undoStack.push(NodeViewRemovedCmd(self, node))
+            self._undoStack.push(NodeViewRemovedCmd(self, node.view))
             self._undoStack.endMacro()
         else:
-            NodeViewRemovedCmd(self, node).redo()
+            NodeViewRemovedCmd(self, node.view).redo()
         self.sigNodesDeleted.emit([_node_id])
 
     def remove_node(self, node, push_undo=True):
@@ -1338,10 +1449,10 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         #         p.clear_connections(push_undo=push_undo)
 
         if push_undo:
-            self._undoStack.push(NodeViewRemovedCmd(self, node))
+            self._undoStack.push(NodeViewRemovedCmd(self, node.view))
             self._undoStack.endMacro()
         else:
-            NodeViewRemovedCmd(self, node).redo()
+            NodeViewRemovedCmd(self, node.view).redo()
 
     def delete_nodes(self, nodes, push_undo=True):
         """
@@ -1379,9 +1490,9 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
             #                          push_undo=push_undo)
             #         p.clear_connections(push_undo=push_undo)
             if push_undo:
-                self._undoStack.push(NodeViewRemovedCmd(self, node))
+                self._undoStack.push(NodeViewRemovedCmd(self, node.view))
             else:
-                NodeViewRemovedCmd(self, node).redo()
+                NodeViewRemovedCmd(self, node.view).redo()
         if push_undo:
             self._undoStack.endMacro()
         self.sigNodesDeleted.emit(_node_ids)
@@ -1445,9 +1556,9 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         Returns:
             NodeGraphQt.NodeObject: node object.
         """
-        for node_id, node in self.nodes.items():
-            if node.get_name() == name:
-                return node
+        _nodes = self._nodeNameIndex.get(name)
+        if _nodes:
+            return next(iter(_nodes.values()))
 
     def get_nodes_by_type(self, node_type):
         """
@@ -1460,7 +1571,7 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         Returns:
             list[NodeGraphQt.NodeObject]: list of nodes.
         """
-        return [n for n in self.nodes.values() if n.type_ == node_type]
+        return list(self._nodeTypeIndex.get(node_type, {}).values())
 
     def get_unique_name(self, name):
         """
@@ -1473,24 +1584,325 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
             str: unique node name.
         """
         name = ' '.join(name.split())
-        _node_names = [n.get_name() for n in self.get_all_nodes()]
-        if name not in _node_names:
+        if name not in self._nodeNameIndex:
             return name
+        _base, _ = self._split_name_suffix(name)
+        _suffix = self._nodeNameSuffix.get(_base, 0) + 1
+        _new_name = '{} {}'.format(_base, _suffix)
+        # only hit if a suffixed name was taken before the counter knew it.
+        while _new_name in self._nodeNameIndex:
+            _suffix += 1
+            _new_name = '{} {}'.format(_base, _suffix)
+        return _new_name
+
+    @staticmethod
+    def _split_name_suffix(name):
+        """
+        Split a node name into its base name and numeric suffix.
 
-        _regex = re.compile(r'\w+ (\d+)$')
-        _search = _regex.search(name)
+        Args:
+            name (str): node name. eg. ``"State 3"``
+
+        Returns:
+            tuple(str, int): base name and suffix, suffix is 0 if not present.
+        """
+        _search = _NAME_SUFFIX_REGEX.search(name)
         if not _search:
-            for x in range(1, len(_node_names) + 2):
-                _new_name = '{} {}'.format(name, x)
-                if _new_name not in _node_names:
-                    return _new_name
-
-        _version = _search.group(1)
-        name = name[:len(_version) * -1].strip()
-        for x in range(1, len(_node_names) + 2):
-            _new_name = '{} {}'.format(name, x)
-            if _new_name not in _node_names:
-                return _new_name
+            return name, 0
+        return _search.group(1), int(_search.group(2))
+
+    def _index_node(self, node):
+        """
+        Add the node into the name and type indices.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+        """
+        self._nodeTypeIndex.setdefault(node.type_, {})[node.id] = node
+        self._index_node_name(node, node.label)
+        self._findIndex.set_node(node.id, self._get_find_fields(node))
+
+    def _unindex_node(self, node):
+        """
+        Remove the node from the name and type indices.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+        """
+        _typed = self._nodeTypeIndex.get(node.type_)
+        if _typed is not None:
+            _typed.pop(node.id, None)
+            if not _typed:
+                del self._nodeTypeIndex[node.type_]
+        self._unindex_node_name(node, node.label)
+        self._findIndex.remove_node(node.id)
+
+    def _index_node_name(self, node, name):
+        if name is None:
+            return
+        self._nodeNameIndex.setdefault(name, {})[node.id] = node
+        _base, _suffix = self._split_name_suffix(name)
+        if _suffix > self._nodeNameSuffix.get(_base, 0):
+            self._nodeNameSuffix[_base] = _suffix
+
+    def _unindex_node_name(self, node, name):
+        _named = self._nodeNameIndex.get(name)
+        if _named is None:
+            return
+        _named.pop(node.id, None)
+        if not _named:
+            del self._nodeNameIndex[name]
+
+    def add_node_ref(self, node):
+        """
+        Register the node object in the graph and its lookup indices.
+        (used internally by the undo commands)
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+        """
+        _prev = self.nodes.get(node.id)
+        if _prev is not None:
+            self._unindex_node(_prev)
+        self.nodes[node.id] = node
+        self._index_node(node)
+        self._reachability.add_node(node.id)
+
+    def remove_node_ref(self, node):
+        """
+        Unregister the node object from the graph and its lookup indices.
+        (used internally by the undo commands)
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+
+        Returns:
+            NodeGraphQt.NodeObject: the removed node or None.
+        """
+        _node = self.nodes.pop(node.id, None)
+        if _node is not None:
+            self._unindex_node(_node)
+            self._reachability.remove_node(_node.id)
+        return _node
+
+    def add_connection_ref(self, out_node_id, in_node_id):
+        """
+        Register a connection between two nodes in the reachability order.
+        (used internally by the undo commands)
+
+        Args:
+            out_node_id (str): id of the node with the output port.
+            in_node_id (str): id of the node with the input port.
+        """
+        self._reachability.add_edge(out_node_id, in_node_id)
+
+    def add_connection_refs(self, node_id_pairs):
+        """
+        Register many connections at once, the reachability order is rebuilt
+        once instead of per connection.
+        (used internally by the bulk restore)
+
+        Args:
+            node_id_pairs (list[tuple(str, str)]): (output node id, input node id) pairs.
+        """
+        self._reachability.add_edges(node_id_pairs)
+
+    def remove_connection_ref(self, out_node_id, in_node_id):
+        """
+        Unregister a connection between two nodes in the reachability order.
+        (used internally by the undo commands)
+
+        Args:
+            out_node_id (str): id of the node with the output port.
+            in_node_id (str): id of the node with the input port.
+        """
+        self._reachability.remove_edge(out_node_id, in_node_id)
+
+    def get_connection_refs(self, node_id):
+        """
+        Returns the connections of the node registered in the reachability order.
+        (used internally by the undo commands)
+
+        Args:
+            node_id (str): node id.
+
+        Returns:
+            list[tuple(str, str)]: (output node id, input node id) pairs.
+        """
+        return self._reachability.incident_edges(node_id)
+
+    def is_node_reachable(self, src_node_id, dst_node_id):
+        """
+        Returns true if the destination node is down stream of the source node.
+
+        Args:
+            src_node_id (str): source node id.
+            dst_node_id (str): destination node id.
+
+        Returns:
+            bool: true if reachable.
+        """
+        return self._reachability.is_reachable(src_node_id, dst_node_id)
+
+    def would_create_cycle(self, out_node_id, in_node_id):
+        """
+        Returns true if connecting the output of the first node to the input
+        of the second node would make the graph cyclic.
+
+        Args:
+            out_node_id (str): id of the node with the output port.
+            in_node_id (str): id of the node with the input port.
+
+        Returns:
+            bool: true if the connection closes a cycle.
+        """
+        return self._reachability.would_create_cycle(out_node_id, in_node_id)
+
+    def on_node_renamed(self, node, old_name, new_name):
+        """
+        called from the node object when its label has changed, keeps the
+        name index in sync.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+            old_name (str): previous node name.
+            new_name (str): new node name.
+        """
+        if self.nodes.get(node.id) is not node:
+            return
+        self._unindex_node_name(node, old_name)
+        self._index_node_name(node, new_name)
+        self._findIndex.set_field(node.id, FIND_FIELD_NAME, new_name)
+
+    @staticmethod
+    def _get_find_fields(node):
+        """
+        Returns the searchable texts of a node, the name, the string
+        properties and the port names.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+
+        Returns:
+            dict: {<field>: <text>}.
+        """
+        _fields = {FIND_FIELD_NAME: node.label}
+        _view = node.view
+        if _view is not None:
+            for _prop in _view.properties:
+                if _prop.name == 'label' or _prop.valueType != 'str':
+                    continue
+                if isinstance(_prop.value, str):
+                    _fields[make_field(FIND_FIELD_PROP, _prop.name)] = _prop.value
+        for _getter in ('get_inputs', 'get_outputs'):
+            _get_ports = getattr(node, _getter, None)
+            if _get_ports is None:
+                continue
+            for _port_name in _get_ports():
+                _fields[make_field(FIND_FIELD_PORT, _port_name)] = _port_name
+        return _fields
+
+    def _on_find_property_changed(self, node, name, value):
+        if name == 'label' or self.nodes.get(node.id) is not node:
+            return
+        _prop = node.view.get_property(name)
+        if _prop is None or _prop.valueType != 'str':
+            return
+        self._findIndex.set_field(node.id, make_field(FIND_FIELD_PROP, name), value)
+
+    def refresh_find_index(self, nodes=None):
+        """
+        Re-read the searchable texts of the nodes, needed after changes
+        which emit no signal, e.g. ports added later or properties set by
+        ``update_properties_with``.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes, all nodes by default.
+        """
+        for n in (nodes if nodes is not None else self.nodes.values()):
+            if self.nodes.get(n.id) is n:
+                self._findIndex.set_node(n.id, self._get_find_fields(n))
+
+    def find_nodes(self, text, kinds=None, match_case=False, limit=None):
+        """
+        Find the nodes whose name, string property values or port names
+        contain the text. words of the text match the words of the node
+        texts by prefix, answered by the find index instead of a node scan.
+
+        Args:
+            text (str): search text.
+            kinds (list[str]): any of ``'name'``, ``'prop'``, ``'port'``, None for all.
+            match_case (bool): case sensitive compare.
+            limit (int): max. count of results. (optional)
+
+        Returns:
+            list[tuple(NodeGraphQt.NodeObject, str, str)]: (node, field, text) hits.
+        """
+        _hits = []
+        for _node_id, _field, _text in self._findIndex.find(text, kinds, match_case, limit):
+            _node = self.nodes.get(_node_id)
+            if _node is not None:
+                _hits.append((_node, _field, _text))
+        return _hits
+
+    def replace_in_nodes(self, text, replacement, hits=None, match_case=False):
+        """
+        Replace the text in node names and writable string properties, all
+        changes are pushed as one undo macro. port names are not replaced.
+
+        Args:
+            text (str): text to replace.
+            replacement (str): new text.
+            hits (list[tuple]): hits of :meth:`NodeGraph.find_nodes`, searched if None.
+            match_case (bool): case sensitive compare.
+
+        Returns:
+            int: count of changed fields.
+        """
+        if not text:
+            return 0
+        if hits is None:
+            hits = self.find_nodes(text, kinds=[FIND_FIELD_NAME, FIND_FIELD_PROP], match_case=match_case)
+        _regex = re.compile(re.escape(text), 0 if match_case else re.IGNORECASE)
+        _changes = []
+        for _node, _field, _text in hits:
+            _kind, _name = split_field(_field)
+            if _kind == FIND_FIELD_NAME:
+                _name = 'label'
+            elif _kind == FIND_FIELD_PROP:
+                _prop = _node.view.get_property(_name)
+                if _prop is None or _prop.readonly or _prop.setter is None:
+                    continue
+            else:
+                continue
+            _new_text = _regex.sub(lambda m: replacement, _text)
+            if _new_text != _text:
+                _changes.append((_node, _name, _new_text))
+        if not _changes:
+            return 0
+        self._view.begin_bulk_update()
+        self._undoStack.beginMacro('replace "{}" with "{}"'.format(text, replacement))
+        try:
+            for _node, _name, _new_text in _changes:
+                _node.view.set_property(_name, _new_text, push_undo=True)
+        finally:
+            self._undoStack.endMacro()
+            self._view.end_bulk_update()
+        return len(_changes)
+
+    def center_on_nodes(self, nodes, select=True):
+        """
+        Center the view on the nodes.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes.
+            select (bool): select only the nodes, no undo command.
+        """
+        if not nodes:
+            return
+        if select:
+            self._select_only(nodes)
+        self._view.center_selection([n.view for n in nodes])
 
     def get_current_session(self):
         """
@@ -1516,146 +1928,49 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
                 #     if p.is_locked():
                 #         p.set_locked(False, connected_ports=False)
                 #     p.clear_connections()
-            self._undoStack.push(NodeViewRemovedCmd(self, n))
+            self._undoStack.push(NodeViewRemovedCmd(self, n.view))
         self._undoStack.clear()
 
-    # def _serialize(self, nodes):
-    #     """
-    #     serialize nodes to a dict.
-    #     (used internally by the node graph)
-    #
-    #     Args:
-    #         nodes (list[NodeGraphQt.Nodes]): list of node instances.
-    #
-    #     Returns:
-    #         dict: serialized data.
-    #     """
-    #     _serial_data = {'graph': {}, 'nodes': {}, 'connections': []}
-    #     _nodes_data = {}
-    #
-    #     # serialize graph session.
-    #     _serial_data['graph']['acyclic'] = self.is_acyclic()
-    #     _serial_data['graph']['pipe_collision'] = self.is_pipe_collision_enabled()
-    #
-    #     # serialize nodes.
-    #     for n in nodes:
-    #         # update the node model.
-    #         n.update_model()
-    #
-    #         _node_dict = n.model.to_dict
-    #         _nodes_data.update(_node_dict)
-    #
-    #     for n_id, n_data in _nodes_data.items():
-    #         _serial_data['nodes'][n_id] = n_data
-    #
-    #         # serialize connections
-    #         _inputs = n_data.pop('inputs') if n_data.get('inputs') else {}
-    #         _outputs = n_data.pop('outputs') if n_data.get('outputs') else {}
-    #
-    #         for pname, conn_data in _inputs.items():
-    #             for conn_id, prt_names in conn_data.items():
-    #                 for conn_prt in prt_names:
-    #                     _pipe = {
-    #                         EnumPortType.IN.value: [n_id, pname],
-    #                         EnumPortType.OUT.value: [conn_id, conn_prt]
-    #                     }
-    #                     if _pipe not in _serial_data['connections']:
-    #                         _serial_data['connections'].append(_pipe)
-    #
-    #         for pname, conn_data in _outputs.items():
-    #             for conn_id, prt_names in conn_data.items():
-    #                 for conn_prt in prt_names:
-    #                     _pipe = {
-    #                         EnumPortType.OUT.value: [n_id, pname],
-    #                         EnumPortType.IN.value: [conn_id, conn_prt]
-    #                     }
-    #                     if _pipe not in _serial_data['connections']:
-    #                         _serial_data['connections'].append(_pipe)
-    #
-    #     if not _serial_data['connections']:
-    #         _serial_data.pop('connections')
-    #
-    #     return _serial_data
-    #
-    # def _deserialize(self, data, relative_pos=False, pos=None):
-    #     """
-    #     deserialize node data.
-    #     (used internally by the node graph)
-    #
-    #     Args:
-    #         data (dict): node data.
-    #         relative_pos (bool): position node relative to the cursor.
-    #         pos (tuple or list): custom x, y position.
-    #
-    #     Returns:
-    #         list[NodeGraphQt.Nodes]: list of node instances.
-    #     """
-    #     # update node graph properties.
-    #     for attr_name, attr_value in data.get('graph', {}).items():
-    #         if attr_name == 'acyclic':
-    #             self.set_acyclic(attr_value)
-    #         elif attr_name == 'pipe_collision':
-    #             self.set_pipe_collision(attr_value)
-    #
-    #     # build the nodes.
-    #     _nodes = {}
-    #     for n_id, n_data in data.get('nodes', {}).items():
-    #         _identifier = n_data['type_']
-    #         _node = self._nodeFactory.create_node_instance(_identifier)
-    #         if _node:
-    #             _node.NODE_NAME = n_data.get('name', _node.NODE_NAME)
-    #             # set properties.
-    #             for prop in _node.model.properties.keys():
-    #                 if prop in n_data.keys():
-    #                     _node.model.set_property(prop, n_data[prop])
-    #             # set custom properties.
-    #             for prop, val in n_data.get('custom', {}).items():
-    #                 _node.model.set_property(prop, val)
-    #                 if isinstance(_node, BaseNode):
-    #                     if prop in _node.view.widgets:
-    #                         _node.view.widgets[prop].set_value(val)
-    #
-    #             _nodes[n_id] = _node
-    #             self.add_node(_node, n_data.get('pos'))
-    #
-    #             if n_data.get('port_deletion_allowed', None):
-    #                 _node.set_ports({
-    #                     'input_ports': n_data['input_ports'],
-    #                     'output_ports': n_data['output_ports']
-    #                 })
-    #
-    #     # build the connections.
-    #     for connection in data.get('connections', []):
-    #         _nid, _pname = connection.get('in', ('', ''))
-    #         _in_node = _nodes.get(_nid) or self.get_node_by_id(_nid)
-    #         if not _in_node:
-    #             continue
-    #         _in_port = _in_node.get_inputs().get(_pname) if _in_node else None
-    #
-    #         _nid, _pname = connection.get('out', ('', ''))
-    #         _out_node = _nodes.get(_nid) or self.get_node_by_id(_nid)
-    #         if not _out_node:
-    #             continue
-    #         _out_port = _out_node.get_outputs().get(_pname) if _out_node else None
-    #
-    #         if _in_port and _out_port:
-    #             # only connect if input port is not connected yet or input port
-    #             # can have multiple connections.
-    #             # important when duplicating nodes.
-    #             _allow_connection = any([not _in_port.model.connectedPorts,
-    #                                      _in_port.model.multiConnection])
-    #             if _allow_connection:
-    #                 self._undoStack.push(PortConnectedCmd(_in_port, _out_port))
-    #
-    #     _node_objs = _nodes.values()
-    #     if relative_pos:
-    #         self._view.move_nodes([n.view for n in _node_objs])
-    #         [setattr(n.model, 'pos', n.view.xy_pos) for n in _node_objs]
-    #     elif pos:
-    #         self._view.move_nodes([n.view for n in _node_objs], pos=pos)
-    #         [setattr(n.model, 'pos', n.view.xy_pos) for n in _node_objs]
-    #
-    #     return _node_objs
+    def _serialize(self, nodes):
+        """
+        serialize nodes to plain data, the format read by :meth:`NodeGraph._deserialize`.
+        (used internally by the node graph)
+
+        only writable properties holding plain data are stored, connections
+        are stored if both nodes are in the list.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): list of node instances.
+
+        Returns:
+            dict: serialized data.
+        """
+        _node_ids = {n.id for n in nodes}
+        _nodes_data = {}
+        _connections = []
+        for n in nodes:
+            _props = {}
+            for prop in n.view.properties:
+                if prop.readonly or prop.setter is None or prop.name == 'label':
+                    continue
+                _value = prop.get() if prop.getter is not None else prop.value
+                if is_encodable(_value):
+                    _props[prop.name] = _value
+            _nodes_data[n.id] = {'type_': n.type_,
+                                 'label': n.label,
+                                 'pos': n.view.xy_pos,
+                                 'properties': _props}
+            # serialize connections from the input side, so each is stored once.
+            _get_inputs = getattr(n, 'get_inputs', None)
+            if _get_inputs is None:
+                continue
+            for _pname, _port in _get_inputs().items():
+                for _conn_id, _conn_pnames in _port.model.connectedPorts.items():
+                    if _conn_id not in _node_ids:
+                        continue
+                    for _conn_pname in _conn_pnames:
+                        _connections.append({'in': [n.id, _pname], 'out': [_conn_id, _conn_pname]})
+        return {'version': CLIPBOARD_VERSION, 'nodes': _nodes_data, 'connections': _connections}
 
     # def serialize_session(self):
     #     """
@@ -1690,28 +2005,27 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
 
     def save_session(self, file_path):
         """
-        Saves the current node graph session layout to a `JSON` formatted file.
+        Saves the current node graph session layout to a `YAML` formatted file.
+
+        the nodes and connections are written in the plain data format of
+        :meth:`NodeGraph._serialize`, together with the graph settings.
 
         See Also:
-            :meth:`NodeGraph.serialize_session`,
-            :meth:`NodeGraph.deserialize_session`,
             :meth:`NodeGraph.load_session`,
+            :meth:`NodeGraph.import_session`
 
         Args:
             file_path (str): path to the saved node layout.
         """
         import yaml
 
-        # _serialized_data = self._serialize(self.get_all_nodes())
+        _serialized_data = self._serialize(self.get_all_nodes())
+        _serialized_data['graph'] = {'acyclic': self._viewSetting.acyclic,
+                                     'pipe_collision': self._viewSetting.pipeCollisionEnabled}
         _file_path = file_path.strip()
-        with open(file_path, 'w') as file_out:
-            # json.dump(
-            #     _serialized_data,
-            #     file_out,
-            #     indent=2,
-            #     separators=(',', ':')
-            # )
-            yaml.dump(self.serializer, file_out, yaml.CDumper)
+        with open(_file_path, 'w') as file_out:
+            yaml.dump(_serialized_data, file_out, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+                      sort_keys=False)
 
     def load_session(self, file_path):
         """
@@ -1744,138 +2058,243 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         if not os.path.isfile(file_path):
             raise IOError('file does not exist: {}'.format(file_path))
         with open(file_path) as data_file:
-            _layout_data = yaml.load(data_file, Loader=yaml.CFullLoader)
-            print(_layout_data)
-        # try:
-        #     from gui.node_graph.core.class_node_graph_view_setting import NodeGraphViewSetting
-        #     with open(file_path) as data_file:
-        #         _layout_data =yaml.load(data_file,Loader=yaml.CFullLoader)
-        #         print(_layout_data)
-        #         #_layout_data = json.load(data_file)
-        # except Exception as e:
-        #     _layout_data = None
-        #     print('Cannot read data from file.\n{}'.format(e))
+            _layout_data = yaml.load(data_file, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
 
         if not _layout_data:
             return
+        if not isinstance(_layout_data, dict) or not isinstance(_layout_data.get('nodes'), dict):
+            raise IOError('not a node graph session file: {}'.format(file_path))
 
-        self._deserialize(_layout_data)
+        self._deserialize(_layout_data, push_undo=False)
         self._undoStack.clear()
         self.session = file_path
 
         self.sigSessionChanged.emit(file_path)
 
-    def _deserialize(self, data):
-        pass
+    def _deserialize(self, data, relative_pos=False, pos=None, push_undo=True, undo_text='load nodes',
+                     unique_names=False):
+        """
+        deserialize node data.
+        (used internally by the node graph)
 
-    # def copy_nodes(self, nodes=None):
-    #     """
-    #     Copy nodes to the clipboard.
-    #
-    #     See Also:
-    #         :meth:`NodeGraph.cut_nodes`
-    #
-    #     Args:
-    #         nodes (list[NodeGraphQt.BaseNode]):
-    #             list of nodes (default: selected nodes).
-    #     """
-    #     nodes = nodes or self.get_selected_nodes()
-    #     if not nodes:
-    #         return False
-    #     _clipboard = QtWidgets.QApplication.clipboard()
-    #     _serial_data = self._serialize(nodes)
-    #     _serial_str = json.dumps(_serial_data)
-    #     if _serial_str:
-    #         _clipboard.setText(_serial_str)
-    #         return True
-    #     return False
-    #
-    # def cut_nodes(self, nodes=None):
-    #     """
-    #     Cut nodes to the clipboard.
-    #
-    #     Note:
-    #         This function doesn't not trigger the
-    #         :attr:`NodeGraph.nodes_deleted` signal.
-    #
-    #     See Also:
-    #         :meth:`NodeGraph.copy_nodes`
-    #
-    #     Args:
-    #         nodes (list[NodeGraphQt.BaseNode]):
-    #             list of nodes (default: selected nodes).
-    #     """
-    #     nodes = nodes or self.get_selected_nodes()
-    #     self.copy_nodes(nodes)
-    #     self._undoStack.beginMacro('cut nodes')
-    #
-    #     for node in nodes:
-    #         if isinstance(node, BaseNode):
-    #             for p in node.get_input_ports():
-    #                 if p.is_locked():
-    #                     p.set_locked(False,
-    #                                  connected_ports=False,
-    #                                  push_undo=True)
-    #                 p.clear_connections()
-    #             for p in node.get_output_ports():
-    #                 if p.is_locked():
-    #                     p.set_locked(False,
-    #                                  connected_ports=False,
-    #                                  push_undo=True)
-    #                 p.clear_connections()
-    #
-    #         # collapse group node before removing.
-    #         if isinstance(node, GroupNode) and node.is_expanded:
-    #             node.collapse()
-    #
-    #         self._undoStack.push(NodeRemovedCmd(self, node))
-    #
-    #     self._undoStack.endMacro()
-    #
-    # def paste_nodes(self):
-    #     """
-    #     Pastes nodes copied from the clipboard.
-    #     """
-    #     _clipboard = QtWidgets.QApplication.clipboard()
-    #     _cb_text = _clipboard.text()
-    #     if not _cb_text:
-    #         return
-    #
-    #     try:
-    #         _serial_data = json.loads(_cb_text)
-    #     except json.decoder.JSONDecodeError as e:
-    #         print('ERROR: Can\'t Decode Clipboard Data:\n'
-    #               '"{}"'.format(_cb_text))
-    #         return
-    #
-    #     self._undoStack.beginMacro('pasted nodes')
-    #     self.clear_selection()
-    #     nodes = self._deserialize(_serial_data, relative_pos=True)
-    #     [n.set_selected(True) for n in nodes]
-    #     self._undoStack.endMacro()
-    #
-    # def duplicate_nodes(self, nodes):
-    #     """
-    #     Create duplicate copy from the list of nodes.
-    #
-    #     Args:
-    #         nodes (list[NodeGraphQt.BaseNode]): list of nodes.
-    #     Returns:
-    #         list[NodeGraphQt.BaseNode]: list of duplicated node instances.
-    #     """
-    #     if not nodes:
-    #         return
-    #     self._undoStack.beginMacro('duplicate nodes')
-    #     self.clear_selection()
-    #     _serial = self._serialize(nodes)
-    #     _new_nodes = self._deserialize(_serial)
-    #     _offset = 50
-    #     for n in _new_nodes:
-    #         _x, _y = n.get_pos()
-    #         n.set_pos(_x + _offset, _y + _offset)
-    #         n.set_property('selected', True)
-    #     self._undoStack.endMacro()
-    #     return _new_nodes
+        nodes and connections are created directly inside a
+        :meth:`NodeGraph.batch` block, at most one aggregate undo command
+        is pushed for the whole restore.
+
+        Args:
+            data (dict): node data.
+            relative_pos (bool): position node relative to the cursor.
+            pos (tuple or list): custom x, y position.
+            push_undo (bool): register the restore to the undo stack.
+            undo_text (str): text of the undo command.
+            unique_names (bool): rename nodes whose label is already used,
+                for pasted and duplicated nodes.
+
+        Returns:
+            list[NodeGraphQt.NodeObject]: list of node instances.
+        """
+        # update node graph properties.
+        for attr_name, attr_value in data.get('graph', {}).items():
+            if attr_name == 'acyclic':
+                self._viewSetting.acyclic = attr_value
+            elif attr_name == 'pipe_collision':
+                self._viewSetting.pipeCollisionEnabled = attr_value
+
+        _nodes = {}
+        with self.batch(undo_text):
+            # build the nodes.
+            for n_id, n_data in data.get('nodes', {}).items():
+                _node = self._nodeFactory.create_class_instance(n_data['type_'])
+                if not _node:
+                    continue
+                if n_data.get('label'):
+                    _node.label = self.get_unique_name(n_data['label']) if unique_names else n_data['label']
+                # properties before add_node, the find index reads them once.
+                _node.view.update_properties_with(**n_data.get('properties', {}))
+                self.add_node(_node, n_data.get('pos'), selected=False, push_undo=False)
+                _nodes[n_id] = _node
+            # build the connections.
+            _connections = self._restore_connections(data.get('connections', []), _nodes)
+
+            _node_objs = list(_nodes.values())
+            if relative_pos:
+                self._view.move_nodes([n.view for n in _node_objs])
+            elif pos:
+                self._view.move_nodes([n.view for n in _node_objs], pos=pos)
+
+        if push_undo and (_node_objs or _connections):
+            self._undoStack.push(NodesRestoredCmd(self, _node_objs, _connections, undo_text))
+        return _node_objs
+
+    def _restore_connections(self, connections, nodes):
+        """
+        connect the serialized connections directly without undo commands,
+        the reachability order is updated once at the end.
+        (used internally by the node graph)
+
+        Args:
+            connections (list[dict]): serialized connections
+                                      ``{'in': [node_id, port_name], 'out': [node_id, port_name]}``.
+            nodes (dict): {<serialized node id>: <node instance>}
+
+        Returns:
+            list[tuple]: connected (input port, output port) pairs.
+        """
+        _pairs = []
+        _node_ids = []
+        for connection in connections:
+            _nid, _pname = connection.get('in', ('', ''))
+            _in_node = nodes.get(_nid)
+            if not _in_node:
+                continue
+            _in_port = _in_node.get_inputs().get(_pname)
+
+            _nid, _pname = connection.get('out', ('', ''))
+            _out_node = nodes.get(_nid)
+            if not _out_node:
+                continue
+            _out_port = _out_node.get_outputs().get(_pname)
+
+            if _in_port and _out_port:
+                _node_ids.append(connect_ports(_in_port, _out_port, register=False))
+                _pairs.append((_in_port, _out_port))
+        self.add_connection_refs(_node_ids)
+        return _pairs
+
+    def copy_nodes(self, nodes=None):
+        """
+        Copy nodes to the clipboard.
+
+        the nodes are stored in the compact binary clipboard format, if the
+        graph was created with ``clipboard_yaml=True`` a YAML text copy is
+        added as well.
+
+        See Also:
+            :meth:`NodeGraph.cut_nodes`
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]):
+                list of nodes (default: selected nodes).
+
+        Returns:
+            bool: true if nodes were copied.
+        """
+        nodes = nodes or self.get_selected_nodes()
+        if not nodes:
+            return False
+        _serial_data = self._serialize(nodes)
+        _mime = QtCore.QMimeData()
+        _mime.setData(CLIPBOARD_MIME_TYPE, QtCore.QByteArray(encode_clipboard(_serial_data)))
+        if self._clipboardYaml:
+            import yaml
+            _text = yaml.dump(_serial_data, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper), sort_keys=False)
+            _mime.setData(CLIPBOARD_YAML_MIME_TYPE, QtCore.QByteArray(_text.encode('utf-8')))
+            _mime.setText(_text)
+        QtWidgets.QApplication.clipboard().setMimeData(_mime)
+        return True
+
+    def cut_nodes(self, nodes=None):
+        """
+        Cut nodes to the clipboard.
+
+        See Also:
+            :meth:`NodeGraph.copy_nodes`
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]):
+                list of nodes (default: selected nodes).
+        """
+        nodes = nodes or self.get_selected_nodes()
+        if not self.copy_nodes(nodes):
+            return
+        self._undoStack.beginMacro('cut nodes')
+        self.delete_nodes(nodes)
+        self._undoStack.endMacro()
+
+    @staticmethod
+    def _read_clipboard_data(mime):
+        """
+        Returns the serialized nodes of a clipboard mime data or None.
+
+        Args:
+            mime (QtCore.QMimeData): clipboard mime data.
+        """
+        if mime is None:
+            return None
+        if mime.hasFormat(CLIPBOARD_MIME_TYPE):
+            try:
+                return validate_clipboard_data(decode_clipboard(mime.data(CLIPBOARD_MIME_TYPE).data()))
+            except ClipboardFormatError as e:
+                logger.warning('can not decode the clipboard data: %s', e)
+                return None
+        if mime.hasFormat(CLIPBOARD_YAML_MIME_TYPE) or mime.hasText():
+            import yaml
+            if mime.hasFormat(CLIPBOARD_YAML_MIME_TYPE):
+                _text = mime.data(CLIPBOARD_YAML_MIME_TYPE).data().decode('utf-8', 'replace')
+            else:
+                _text = mime.text()
+            try:
+                _data = yaml.load(_text, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+            except yaml.YAMLError:
+                return None
+            # any text could be on the clipboard, no node data is not an error.
+            try:
+                return validate_clipboard_data(_data)
+            except ClipboardFormatError:
+                return None
+        return None
+
+    def _select_only(self, nodes):
+        """
+        Select only the given nodes without undo commands.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): list of nodes.
+        """
+        self._view.begin_bulk_update()
+        try:
+            self.get_scene().clearSelection()
+            for n in nodes:
+                n.view.setSelected(True)
+        finally:
+            self._view.end_bulk_update()
+
+    def paste_nodes(self):
+        """
+        Pastes nodes copied from the clipboard.
+
+        Returns:
+            list[NodeGraphQt.NodeObject]: list of pasted node instances.
+        """
+        _serial_data = self._read_clipboard_data(QtWidgets.QApplication.clipboard().mimeData())
+        if not _serial_data or not _serial_data['nodes']:
+            return []
+        self.get_scene().clearSelection()
+        _nodes = self._deserialize(_serial_data, relative_pos=True, undo_text='pasted nodes', unique_names=True)
+        self._select_only(_nodes)
+        return _nodes
+
+    def duplicate_nodes(self, nodes, offset=50):
+        """
+        Create duplicate copy from the list of nodes.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): list of nodes.
+            offset (float): x, y offset of the copies.
+
+        Returns:
+            list[NodeGraphQt.NodeObject]: list of duplicated node instances.
+        """
+        if not nodes:
+            return
+        _serial_data = self._serialize(nodes)
+        for _node_data in _serial_data['nodes'].values():
+            _x, _y = _node_data['pos']
+            _node_data['pos'] = [_x + offset, _y + offset]
+        self.get_scene().clearSelection()
+        _new_nodes = self._deserialize(_serial_data, undo_text='duplicate nodes', unique_names=True)
+        self._select_only(_new_nodes)
+        return _new_nodes
 
     def disable_nodes(self, nodes, mode=None):
         """
@@ -1906,63 +2325,74 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         """
         Set the viewport to use QOpenGLWidget widget to draw the graph.
         """
-        self._view.use_OpenGL()
+        self.set_viewport_backend(EnumViewportBackend.OPENGL.value)
+
+    def set_viewport_backend(self, backend, msaa_samples=None):
+        """
+        Set the viewport paint backend and store it in the view setting.
+
+        Args:
+            backend (str): :attr:`EnumViewportBackend` value.
+            msaa_samples (int): OpenGL multisample count. (optional)
+
+        Returns:
+            str: the backend actually in use.
+        """
+        self._viewSetting.viewportBackend = backend
+        if msaa_samples is not None:
+            self._viewSetting.msaaSamples = msaa_samples
+        return self._view.set_viewport_backend(backend, msaa_samples)
 
     # auto layout node functions.
     # --------------------------------------------------------------------------
 
     @staticmethod
-    def _update_node_rank(node, nodes_rank, down_stream=True):
+    def _get_connected_nodes(node, down_stream=True):
         """
-        Recursive function for updating the node ranking.
+        Return the nodes connected down stream or up stream to the node.
 
         Args:
-            node (NodeGraphQt.BaseNode): node to start from.
-            nodes_rank (dict): node ranking object to be updated.
-            down_stream (bool): true to rank down stram.
+            node (NodeGraphQt.BaseNode): node object.
+            down_stream (bool): true for the output connections.
+
+        Returns:
+            list[NodeGraphQt.BaseNode]: connected nodes.
         """
         if down_stream:
             _node_values = node.get_connected_output_nodes().values()
         else:
             _node_values = node.get_connected_input_nodes().values()
-
-        _connected_nodes = set()
-        for nodes in _node_values:
-            _connected_nodes.update(nodes)
-
-        _rank = nodes_rank[node] + 1
-        for n in _connected_nodes:
-            if n in nodes_rank:
-                nodes_rank[n] = max(nodes_rank[n], _rank)
-            else:
-                nodes_rank[n] = _rank
-            NodeGraph._update_node_rank(n, nodes_rank, down_stream)
+        return [n for nodes in _node_values for n in nodes]
 
     @staticmethod
-    def _compute_node_rank(nodes, down_stream=True):
+    def _compute_node_layers(nodes, down_stream=True, start_nodes=None):
         """
-        Compute the ranking of nodes.
+        Compute the ranked and crossing minimized layers of the nodes.
 
         Args:
-            nodes (list[NodeGraphQt.BaseNode]): nodes to start ranking from.
+            nodes (list[NodeGraphQt.BaseNode]): nodes to layout.
             down_stream (bool): true to compute down stream.
+            start_nodes (list[NodeGraphQt.BaseNode]): nodes the cycle removal
+                starts from, connections closing a cycle back to them are ignored.
 
         Returns:
-            dict: {NodeGraphQt.BaseNode: node_rank, ...}
+            list[list[NodeGraphQt.BaseNode]]: nodes per rank, rank 0 first.
         """
-        _nodes_rank = {}
-        for node in nodes:
-            _nodes_rank[node] = 0
-            NodeGraph._update_node_rank(node, _nodes_rank, down_stream)
-        return _nodes_rank
+        _layout = LayeredLayout(nodes,
+                                lambda n: NodeGraph._get_connected_nodes(n, down_stream),
+                                start_nodes)
+        _layout.compute_rank()
+        return _layout.minimize_crossings()
 
     def auto_layout_nodes(self, nodes=None, down_stream=True, start_nodes=None):
         """
         Auto layout the nodes in the node graph.
 
         Note:
-            If the node graph is acyclic then the ``start_nodes`` will need
-            to be specified.
+            Nodes are ranked by the longest path from the nodes without up
+            stream (or down stream) connections, cyclic connections are
+            ignored while ranking. The ``start_nodes`` decide which connection
+            of a cycle is ignored, the cycle is laid out starting from them.
 
         Args:
             nodes (list[NodeGraphQt.BaseNode]): list of nodes to auto layout
@@ -1971,50 +2401,33 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
             start_nodes (list[NodeGraphQt.BaseNode]):
                 list of nodes to start the auto layout from (Optional).
         """
-        self.begin_undo('Auto Layout Nodes')
-
         _nodes = nodes or self.get_all_nodes()
+        if not _nodes:
+            return
 
         # filter out the backdrops.
         _backdrops = {
-            n: n.get_nodes() for n in nodes if isinstance(n, BackdropNode)
+            n: n.get_nodes() for n in _nodes if isinstance(n, BackdropNode)
         }
-        _filtered_nodes = [n for n in nodes if not isinstance(n, BackdropNode)]
-
-        start_nodes = start_nodes or []
-        if down_stream:
-            start_nodes += [
-                n for n in _filtered_nodes
-                if not any(n.get_connected_input_nodes().values())
-            ]
-        else:
-            start_nodes += [
-                n for n in _filtered_nodes
-                if not any(n.get_connected_output_nodes().values())
-            ]
-
-        if not start_nodes:
+        _filtered_nodes = [n for n in _nodes if not isinstance(n, BackdropNode)]
+        if not _filtered_nodes:
             return
 
-        _node_views = [n.view for n in nodes]
+        self.begin_undo('Auto Layout Nodes')
+        _node_views = [n.view for n in _nodes]
         _nodes_center_0 = self.get_view().get_nodes_rect_center(_node_views)
 
-        _nodes_rank = NodeGraph._compute_node_rank(start_nodes, down_stream)
-
-        _rank_map = {}
-        for node, rank in _nodes_rank.items():
-            if rank in _rank_map:
-                _rank_map[rank].append(node)
-            else:
-                _rank_map[rank] = [node]
+        _rank_layers = NodeGraph._compute_node_layers(_filtered_nodes, down_stream, start_nodes)
+        if not down_stream:
+            # rank 0 is the down stream end here, keep it on the far side.
+            _rank_layers = _rank_layers[::-1]
 
         _node_layout_direction = self._view.get_layout_direction()
 
         if _node_layout_direction is EnumLayoutDirection.HORIZONTAL.value:
             _current_x = 0
             _node_height = 120
-            for rank in sorted(range(len(_rank_map)), reverse=not down_stream):
-                _ranked_nodes = _rank_map[rank]
+            for _ranked_nodes in _rank_layers:
                 _max_width = max([node.view.width for node in _ranked_nodes])
                 _current_x += _max_width
                 _current_y = 0
@@ -2028,8 +2441,7 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         elif _node_layout_direction is EnumLayoutDirection.VERTICAL.value:
             _current_y = 0
             _node_width = 250
-            for rank in sorted(range(len(_rank_map)), reverse=not down_stream):
-                _ranked_nodes = _rank_map[rank]
+            for _ranked_nodes in _rank_layers:
                 _max_height = max([node.view.height for node in _ranked_nodes])
                 _current_y += _max_height
                 _current_x = 0
@@ -2044,7 +2456,7 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         _nodes_center_1 = self.get_view().get_nodes_rect_center(_node_views)
         _dx = _nodes_center_0[0] - _nodes_center_1[0]
         _dy = _nodes_center_0[1] - _nodes_center_1[1]
-        [n.set_pos(n.get_x_pos() + _dx, n.get_y_pos() + _dy) for n in nodes]
+        [n.set_pos(n.get_x_pos() + _dx, n.get_y_pos() + _dy) for n in _filtered_nodes]
 
         # wrap the backdrop nodes.
         for backdrop, contained_nodes in _backdrops.items():
@@ -2124,6 +2536,18 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
     # group node / sub graph.
     # --------------------------------------------------------------------------
 
+    def _on_sub_graph_tab_changed(self, index: int):
+        """
+        Called when the current tab changed, the sub graph of the shown tab
+        builds its scene if not yet done.
+
+        Args:
+            index (int): tab index.
+        """
+        _sub_graph = self._subGraphs.get(self._widget.tabToolTip(index))
+        if _sub_graph is not None:
+            _sub_graph.materialize()
+
     def _on_close_sub_graph_request(self, index: int):
         """
         Called when the close button is clicked on a expanded sub graph.
@@ -2173,16 +2597,20 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
     #     """
     #     self._viewer.set_scene_rect(rect)
 
-    def expand_group_node(self, node):
+    def expand_group_node(self, node, show=True):
         """
         Expands a group node session in a new tab.
 
         Args:
             node (NodeGraphQt.GroupNode): group node.
+            show (bool): false to add the tab in the background, its session
+                is then built into the scene the first time the tab is shown.
 
         Returns:
             SubGraph: sub node graph used to manage the group node session.
         """
+        # todo: GroupNode is not importable yet, class_group_node needs the
+        #  base/port node modules which are missing in this package.
         if not isinstance(node, GroupNode):
             return
         if self._widget is None:
@@ -2193,29 +2621,29 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
 
         if node.id in self._subGraphs:
             _sub_graph = self._subGraphs[node.id]
-            _tab_index = self._widget.indexOf(_sub_graph.widget)
-            self._widget.setCurrentIndex(_tab_index)
+            if show:
+                _tab_index = self._widget.indexOf(_sub_graph.widget)
+                self._widget.setCurrentIndex(_tab_index)
             return _sub_graph
 
-        # build new sub graph.
-        _node_factory = copy.deepcopy(self._nodeFactory)
+        # build new sub graph, the node types are shared read-only.
         _layout_direction = self.get_layout_direction()
-        _sub_graph = SubGraph(self,
-                              node=node,
-                              node_factory=_node_factory,
+        _sub_graph = SubGraph(parent=self,
+                              associated_node=node,
+                              node_factory=self.shared_node_factory,
                               layout_direction=_layout_direction)
 
-        # populate the sub graph.
-        _session = node.get_sub_graph_session()
-        _sub_graph.deserialize_session(_session)
+        # the session is deserialized when the tab is shown, see
+        # _on_sub_graph_tab_changed.
+        _sub_graph.set_pending_session(node.get_sub_graph_session())
 
         # store reference to expanded.
         self._subGraphs[node.id] = _sub_graph
 
         # open new tab at root level.
         # todo: check option if custom handling the subGraph
-        self.sigOpenSubGraphRequired.emit(node.get_name(), node.id)
-        self._widget.add_view(_sub_graph.widget, node.get_name(), node.id)
+        self.sigOpenSubGraphRequired.emit(node.label, node.id)
+        self._widget.add_view(_sub_graph.widget, node.label, node.id, show=show)
 
         return _sub_graph
 
@@ -2231,7 +2659,7 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
             return
 
         if node.id not in self._subGraphs:
-            _err = '{} sub graph not initialized!'.format(node.get_name())
+            _err = '{} sub graph not initialized!'.format(node.label)
             raise RuntimeError(_err)
 
         _sub_graph = self._subGraphs.pop(node.id)
@@ -2241,7 +2669,8 @@ class NodeGraph(QtCore.QObject, Serializable, metaclass=SerializableQObject):
         # todo: check option if custom handling the subGraph
         self._widget.remove_view(_sub_graph.widget)
         self.sigCloseSubGraphRequired.emit(node.id)
-        # TODO: delete sub graph hmm... not sure if I need this here.
+        # release the view and scene, the session stays on the group node.
+        _sub_graph.release_view()
         del _sub_graph
 
 
@@ -2274,6 +2703,9 @@ class SubGraph(NodeGraph):
         self._associatedNode = _associated_node
         self._parentGraph = _parent
         self._subViewWidget = None
+        # session not yet deserialized into the scene, see materialize.
+        self._pendingSession = None
+        self._viewReleased = False
         if self._parentGraph.is_root:
             self._initializedGraphs = [self]
             self._subGraphs[self._associatedNode.id] = self
@@ -2385,7 +2817,8 @@ class SubGraph(NodeGraph):
 
         return _input_nodes, _output_nodes
 
-    def _deserialize(self, data, relative_pos=False, pos=None):
+    def _deserialize(self, data, relative_pos=False, pos=None, push_undo=True, undo_text='load nodes',
+                     unique_names=False):
         """
         deserialize node data.
         (used internally by the node graph)
@@ -2394,6 +2827,10 @@ class SubGraph(NodeGraph):
             data (dict): node data.
             relative_pos (bool): position node relative to the cursor.
             pos (tuple or list): custom x, y position.
+            push_undo (bool): register the restore to the undo stack.
+            undo_text (str): text of the undo command.
+            unique_names (bool): rename nodes whose label is already used,
+                for pasted and duplicated nodes.
 
         Returns:
             list[NodeGraphQt.Nodes]: list of node instances.
@@ -2401,74 +2838,67 @@ class SubGraph(NodeGraph):
         # update node graph properties.
         for attr_name, attr_value in data.get('graph', {}).items():
             if attr_name == 'acyclic':
-                self.set_acyclic(attr_value)
+                self._viewSetting.acyclic = attr_value
             elif attr_name == 'pipe_collision':
-                self.set_pipe_collision(attr_value)
+                self._viewSetting.pipeCollisionEnabled = attr_value
 
         # build the port input & output nodes here.
         _input_nodes, _output_nodes = self._build_port_nodes()
 
         # build the nodes.
         _nodes = {}
-        for n_id, n_data in data.get('nodes', {}).items():
-            _identifier = n_data['type_']
-            _name = n_data.get('name')
-            if _identifier == PortInputNode.type_:
-                _nodes[n_id] = _input_nodes[_name]
-                _nodes[n_id].set_pos(*(n_data.get('pos') or [0, 0]))
-                continue
-            elif _identifier == PortOutputNode.type_:
-                _nodes[n_id] = _output_nodes[_name]
-                _nodes[n_id].set_pos(*(n_data.get('pos') or [0, 0]))
-                continue
-
-            _node = self._nodeFactory.create_node_instance(_identifier)
-            if not _node:
-                continue
-
-            _node.NODE_NAME = _name or _node.NODE_NAME
-            # set properties.
-            for prop in _node.model.properties.keys():
-                if prop in n_data.keys():
-                    _node.model.set_property(prop, n_data[prop])
-            # set custom properties.
-            for prop, val in n_data.get('custom', {}).items():
-                _node.model.set_property(prop, val)
-
-            _nodes[n_id] = _node
-            self.add_node(_node, n_data.get('pos'))
-
-            if n_data.get('port_deletion_allowed', None):
-                _node.set_ports({
-                    'input_ports': n_data['input_ports'],
-                    'output_ports': n_data['output_ports']
-                })
-
-        # build the connections.
-        for connection in data.get('connections', []):
-            _nid, _pname = connection.get('in', ('', ''))
-            _in_node = _nodes.get(_nid)
-            if not _in_node:
-                continue
-            _in_port = _in_node.get_inputs().get(_pname) if _in_node else None
-
-            _nid, _pname = connection.get('out', ('', ''))
-            _out_node = _nodes.get(_nid)
-            if not _out_node:
-                continue
-            _out_port = _out_node.get_outputs().get(_pname) if _out_node else None
-
-            if _in_port and _out_port:
-                self._undoStack.push(PortViewConnectedCmd(_in_port, _out_port))
+        _created = []
+        with self.batch(undo_text):
+            for n_id, n_data in data.get('nodes', {}).items():
+                _identifier = n_data['type_']
+                _name = n_data.get('name')
+                if _identifier == PortInputNode.type_:
+                    _nodes[n_id] = _input_nodes[_name]
+                    _nodes[n_id].set_pos(*(n_data.get('pos') or [0, 0]))
+                    continue
+                elif _identifier == PortOutputNode.type_:
+                    _nodes[n_id] = _output_nodes[_name]
+                    _nodes[n_id].set_pos(*(n_data.get('pos') or [0, 0]))
+                    continue
 
-        _node_objs = list(_nodes.values())
-        if relative_pos:
-            self._view.move_nodes([n.view for n in _node_objs])
-            [setattr(n.model, 'pos', n.view.xy_pos) for n in _node_objs]
-        elif pos:
-            self._view.move_nodes([n.view for n in _node_objs], pos=pos)
-            [setattr(n.model, 'pos', n.view.xy_pos) for n in _node_objs]
+                _node = self._nodeFactory.create_node_instance(_identifier)
+                if not _node:
+                    continue
 
+                _node.NODE_NAME = _name or _node.NODE_NAME
+                if n_data.get('label'):
+                    _node.label = self.get_unique_name(n_data['label']) if unique_names else n_data['label']
+                # set properties.
+                for prop in _node.model.properties.keys():
+                    if prop in n_data.keys():
+                        _node.model.set_property(prop, n_data[prop])
+                # set custom properties.
+                for prop, val in n_data.get('custom', {}).items():
+                    _node.model.set_property(prop, val)
+
+                _nodes[n_id] = _node
+                _created.append(_node)
+                self.add_node(_node, n_data.get('pos'), selected=False, push_undo=False)
+
+                if n_data.get('port_deletion_allowed', None):
+                    _node.set_ports({
+                        'input_ports': n_data['input_ports'],
+                        'output_ports': n_data['output_ports']
+                    })
+
+            # build the connections.
+            _connections = self._restore_connections(data.get('connections', []), _nodes)
+
+            _node_objs = list(_nodes.values())
+            if relative_pos:
+                self._view.move_nodes([n.view for n in _node_objs])
+                [setattr(n.model, 'pos', n.view.xy_pos) for n in _node_objs]
+            elif pos:
+                self._view.move_nodes([n.view for n in _node_objs], pos=pos)
+                [setattr(n.model, 'pos', n.view.xy_pos) for n in _node_objs]
+
+        if push_undo and (_created or _connections):
+            self._undoStack.push(NodesRestoredCmd(self, _created, _connections, undo_text))
         return _node_objs
 
     def _on_navigation_changed(self, node_id, rm_node_ids):
@@ -2487,6 +2917,7 @@ class SubGraph(NodeGraph):
         # show the selected node id sub graph.
         _sub_graph = self.sub_graphs.get(node_id)
         if _sub_graph:
+            _sub_graph.materialize()
             self.widget.show_view(_sub_graph.sub_view_widget)
             self.sigShowSubGraphRequired.emit(node_id)
             _sub_graph.get_view().setFocus()
@@ -2639,9 +3070,10 @@ class SubGraph(NodeGraph):
         Args:
             clear_session (bool): clear the current session.
         """
-        # update the group node.
-        _serialized_session = self.serialize_session()
-        self.node.set_sub_graph_session(_serialized_session)
+        # update the group node, a never shown sub graph keeps its session.
+        if self._pendingSession is None:
+            _serialized_session = self.serialize_session()
+            self.node.set_sub_graph_session(_serialized_session)
 
         # close the visible widgets.
         if self._undoView:
@@ -2652,6 +3084,49 @@ class SubGraph(NodeGraph):
 
         if clear_session:
             self.clear_session()
+            self.release_view()
+
+    @property
+    def is_materialized(self):
+        """
+        Returns if the session of the group node is built into the scene.
+
+        Returns:
+            bool: false while the sub graph was not shown yet.
+        """
+        return self._pendingSession is None
+
+    def set_pending_session(self, session):
+        """
+        Set the group node session to deserialize once the sub graph is shown.
+
+        Args:
+            session (dict): serialized sub graph session.
+        """
+        self._pendingSession = session or None
+
+    def materialize(self):
+        """
+        Build the pending session into the scene.
+        """
+        if self._pendingSession is None or self._viewReleased:
+            return
+        _session, self._pendingSession = self._pendingSession, None
+        self._deserialize(_session, push_undo=False)
+
+    def release_view(self):
+        """
+        Release the view and scene of a collapsed sub graph, the scene is a
+        child of the view and deleted with it.
+        """
+        if self._viewReleased:
+            return
+        self._viewReleased = True
+        self._undoStack.clear()
+        self._view.deleteLater()
+        if self._subViewWidget is not None:
+            self._subViewWidget.deleteLater()
+            self._subViewWidget = None
 
     def expand_group_node(self, node):
         """
@@ -2688,22 +3163,20 @@ class SubGraph(NodeGraph):
             # close the widgets
             grp_sub_graph.collapse_graph(clear_session=False)
 
-        # build new sub graph.
-        _node_factory = copy.deepcopy(self.node_factory)
-        _sub_graph = SubGraph(self,
-                              node=node,
-                              node_factory=_node_factory,
+        # build new sub graph, the node types are shared read-only.
+        _sub_graph = SubGraph(parent=self,
+                              associated_node=node,
+                              node_factory=self.shared_node_factory,
                               layout_direction=self.get_layout_direction())
 
-        # populate the sub graph.
-        _serialized_session = node.get_sub_graph_session()
-        _sub_graph.deserialize_session(_serialized_session)
-
-        # open new sub graph view.
+        # open new sub graph view, the sub view is shown right away so its
+        # session is built at once.
+        _sub_graph.set_pending_session(node.get_sub_graph_session())
         self.widget.add_view(_sub_graph.sub_view_widget,
-                             node.get_name(),
+                             node.label,
                              node.id)
-        self.sigOpenSubGraphRequired.emit(node.get_name(), node.id)
+        _sub_graph.materialize()
+        self.sigOpenSubGraphRequired.emit(node.label, node.id)
         # store the references.
         self.sub_graphs[node.id] = _sub_graph
         self.initialized_graphs.append(_sub_graph)
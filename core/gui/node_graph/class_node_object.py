@@ -120,7 +120,10 @@ class NodeObject(Serializable):
 
     @label.setter
     def label(self, label=''):
+        _old_label = self._label
         self._label = label
+        if self._graph is not None and _old_label != label:
+            self._graph.on_node_renamed(self, _old_label, label)
 
     @property
     def graph(self):
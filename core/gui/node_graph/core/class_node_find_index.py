@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : class_node_find_index.py
+# ------------------------------------------------------------------------------
+#
+# File          : class_node_find_index.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import re
+import heapq
+from bisect import bisect_left
+
+# field names of the indexed texts, properties and ports are suffixed with
+# their name, e.g. "prop:guard" or "port:in".
+FIND_FIELD_NAME = 'name'
+FIND_FIELD_PROP = 'prop'
+FIND_FIELD_PORT = 'port'
+
+_RE_WORD = re.compile(r'[0-9A-Za-z]+')
+_RE_CAMEL = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+
+
+def make_field(kind, name=None):
+    return kind if name is None else '{}:{}'.format(kind, name)
+
+
+def split_field(field):
+    _kind, _, _name = field.partition(':')
+    return _kind, _name or None
+
+
+def tokenize(text):
+    """
+    Returns the lower case words of the text, camel case words also give
+    their tail from every part on, "EventTimer1" gives eventtimer1, timer1
+    and 1.
+    """
+    _tokens = set()
+    for _word in _RE_WORD.findall(text):
+        _word_lower = _word.lower()
+        _tokens.add(_word_lower)
+        for _part in _RE_CAMEL.finditer(_word):
+            _tokens.add(_word_lower[_part.start():])
+    return _tokens
+
+
+class NodeFindIndex:
+    """
+    Inverted index over the searchable texts of the nodes in a graph.
+
+    every text is stored under a key ``(node_id, field)``. a query is split
+    into terms, each term matches the words of a text by prefix through a
+    sorted vocabulary, the keys of all terms are intersected and verified
+    against the stored text. nodes and fields are updated one by one, there
+    is no rebuild on change.
+    """
+
+    def __init__(self):
+        self._texts = dict()
+        self._nodeKeys = dict()
+        self._postings = dict()
+        # sorted tokens for the prefix lookup, rebuilt on demand.
+        self._vocabulary = []
+        self._vocabularyDirty = False
+
+    def __len__(self):
+        return len(self._nodeKeys)
+
+    def __contains__(self, node_id):
+        return node_id in self._nodeKeys
+
+    def clear(self):
+        self._texts.clear()
+        self._nodeKeys.clear()
+        self._postings.clear()
+        self._vocabulary = []
+        self._vocabularyDirty = False
+
+    def _add_tokens(self, key, text):
+        for _token in tokenize(text):
+            _keys = self._postings.get(_token)
+            if _keys is None:
+                _keys = self._postings[_token] = set()
+                self._vocabularyDirty = True
+            _keys.add(key)
+
+    def _remove_tokens(self, key, text):
+        for _token in tokenize(text):
+            _keys = self._postings.get(_token)
+            if _keys is None:
+                continue
+            _keys.discard(key)
+            if not _keys:
+                del self._postings[_token]
+                self._vocabularyDirty = True
+
+    def set_field(self, node_id, field, text):
+        """
+        Set or replace the text of a node field, None or non string values
+        remove the field.
+
+        Args:
+            node_id (str): node id.
+            field (str): field name, see :func:`make_field`.
+            text (str): text to index.
+        """
+        _key = (node_id, field)
+        _prev = self._texts.get(_key)
+        if _prev == text:
+            return
+        if _prev is not None:
+            self._remove_tokens(_key, _prev)
+            del self._texts[_key]
+            self._nodeKeys[node_id].discard(_key)
+        if not isinstance(text, str) or not text:
+            return
+        self._texts[_key] = text
+        self._nodeKeys.setdefault(node_id, set()).add(_key)
+        self._add_tokens(_key, text)
+
+    def set_node(self, node_id, fields):
+        """
+        Index all fields of a node, fields not listed are removed.
+
+        Args:
+            node_id (str): node id.
+            fields (dict): {<field>: <text>}.
+        """
+        for _key in list(self._nodeKeys.get(node_id, ())):
+            if _key[1] not in fields:
+                self.set_field(node_id, _key[1], None)
+        for _field, _text in fields.items():
+            self.set_field(node_id, _field, _text)
+        self._nodeKeys.setdefault(node_id, set())
+
+    def remove_node(self, node_id):
+        """
+        Remove all texts of a node.
+
+        Args:
+            node_id (str): node id.
+        """
+        for _key in self._nodeKeys.pop(node_id, ()):
+            self._remove_tokens(_key, self._texts.pop(_key))
+
+    def get_text(self, node_id, field):
+        return self._texts.get((node_id, field))
+
+    def _keys_of_term(self, term):
+        if self._vocabularyDirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabularyDirty = False
+        _vocabulary = self._vocabulary
+        _idx = bisect_left(_vocabulary, term)
+        _end = len(_vocabulary)
+        _keys = set()
+        while _idx < _end and _vocabulary[_idx].startswith(term):
+            _keys.update(self._postings[_vocabulary[_idx]])
+            _idx += 1
+        return _keys
+
+    def find(self, query, kinds=None, match_case=False, limit=None):
+        """
+        Find the node texts containing the query.
+
+        Args:
+            query (str): search text.
+            kinds (list[str]): field kinds to search in, e.g. ``['name', 'prop']``,
+                               None for all.
+            match_case (bool): case sensitive compare.
+            limit (int): max. count of results. (optional)
+
+        Returns:
+            list[tuple(str, str, str)]: (node id, field, text) sorted by node id and field.
+        """
+        _terms = {t.lower() for t in _RE_WORD.findall(query)}
+        if _terms:
+            _term_keys = sorted((self._keys_of_term(t) for t in _terms), key=len)
+            _keys = _term_keys[0].intersection(*_term_keys[1:])
+        else:
+            # nothing word like in the query, e.g. punctuation only.
+            _keys = self._texts.keys()
+        if match_case:
+            _needle = query
+            _matched = [k for k in _keys if _needle in self._texts[k]]
+        else:
+            _needle = query.lower()
+            _matched = [k for k in _keys if _needle in self._texts[k].lower()]
+        if kinds is not None:
+            _kinds = set(kinds)
+            _matched = [k for k in _matched if split_field(k[1])[0] in _kinds]
+        if limit:
+            _matched = heapq.nsmallest(limit, _matched)
+        else:
+            _matched.sort()
+        return [(k[0], k[1], self._texts[k]) for k in _matched]
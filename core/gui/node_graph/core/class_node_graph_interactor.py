@@ -25,6 +25,7 @@ from ..views.class_base_node_view_item import BaseNodeViewItem
 from ..views.class_search_widget import SearchMenuWidget
 from ..views.class_pipe_view_item import LivePipeItem, PipeViewItem
 from ..views.class_slicer_item import PipeSlicerItem
+from .define import EnumPortType
 
 if typing.TYPE_CHECKING:
     from ..views.class_node_graph_view import NodeGraphView
@@ -566,11 +567,14 @@ class NodeGraphBaseInteractor:
         if not start_port.node.visible or not end_port.node.visible:
             _pipe.hide()
 
-    @staticmethod
-    def acyclic_check(start_port, end_port):
+    def acyclic_check(self, start_port, end_port):
         """
         Validate the node connections so it doesn't loop itself.
 
+        Note:
+            answered from the topological order maintained by the graph,
+            the connection doesn't need to walk the down stream nodes.
+
         Args:
             start_port (PortItem): port item.
             end_port (PortItem): port item.
@@ -578,22 +582,11 @@ class NodeGraphBaseInteractor:
         Returns:
             bool: True if port connection is valid.
         """
-        _start_node = start_port.node
-        _check_nodes = [end_port.node]
-        _io_types = {
-            EnumPortType.IN.value: 'outputs',
-            EnumPortType.OUT.value: 'inputs'
-        }
-        while _check_nodes:
-            _check_node = _check_nodes.pop(0)
-            for check_port in getattr(_check_node, _io_types[end_port.port_type]):
-                if check_port.connected_ports:
-                    for port in check_port.connected_ports:
-                        if port.node != _start_node:
-                            _check_nodes.append(port.node)
-                        else:
-                            return False
-        return True
+        _start_id = start_port.node.id
+        _end_id = end_port.node.id
+        if end_port.port_type == EnumPortType.IN.value:
+            return not self.view.graph.would_create_cycle(_start_id, _end_id)
+        return not self.view.graph.would_create_cycle(_end_id, _start_id)
 
     def clear_key_state(self):
         """
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : class_node_graph_undo_stack.py
+# ------------------------------------------------------------------------------
+#
+# File          : class_node_graph_undo_stack.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from core.gui.qtimp import QtGui
+from .commands import command_cost, compact_command
+
+
+class NodeGraphUndoStack(QtGui.QUndoStack):
+    """
+    Undo stack of the node graph with a bounded history.
+
+    the number of entries is bounded by the undo limit, the memory used by
+    the entries is bounded by a budget in bytes. since QUndoStack only drops
+    its oldest entries through the undo limit, entries exceeding the budget
+    are compacted from the oldest on (see ``compact()`` of the commands).
+
+    Args:
+        parent (QtCore.QObject): parent object.
+        undo_limit (int): max. count of entries, 0 means no limit.
+        memory_budget (int): memory budget in bytes, 0 means no budget.
+        keep_recent (int): count of the most recent entries never compacted.
+    """
+
+    def __init__(self, parent=None, undo_limit=1000, memory_budget=32 * 1024 * 1024, keep_recent=20):
+        QtGui.QUndoStack.__init__(self, parent)
+        # the undo limit can only be set while the stack is empty.
+        self.setUndoLimit(undo_limit)
+        self._memoryBudget = memory_budget
+        self._keepRecent = keep_recent
+        self._usedBytes = 0
+        # next running total triggering enforce_budget, avoids rescanning
+        # the stack on each push when nothing is left to compact.
+        self._enforceAt = memory_budget
+
+    @property
+    def memory_budget(self):
+        return self._memoryBudget
+
+    @memory_budget.setter
+    def memory_budget(self, value):
+        self._memoryBudget = value
+        self.enforce_budget()
+
+    @property
+    def used_bytes(self):
+        return self._usedBytes
+
+    def _check_budget(self):
+        if self._memoryBudget and self._usedBytes > self._enforceAt:
+            self.enforce_budget()
+
+    def push(self, cmd):
+        self._usedBytes += command_cost(cmd)
+        QtGui.QUndoStack.push(self, cmd)
+        self._check_budget()
+
+    def endMacro(self):
+        QtGui.QUndoStack.endMacro(self)
+        self._check_budget()
+
+    def clear(self):
+        QtGui.QUndoStack.clear(self)
+        self._usedBytes = 0
+        self._enforceAt = self._memoryBudget
+
+    def compute_used_bytes(self):
+        """
+        Returns the estimated memory used by all entries of the stack.
+        """
+        self._usedBytes = sum(command_cost(self.command(i)) for i in range(self.count()))
+        return self._usedBytes
+
+    def enforce_budget(self):
+        """
+        Compact the oldest entries until the memory budget is met.
+
+        Returns:
+            int: estimated bytes used after compacting.
+        """
+        # the running total overestimates after merges and dropped entries.
+        self.compute_used_bytes()
+        if not self._memoryBudget:
+            return self._usedBytes
+        self._enforceAt = self._memoryBudget
+        for i in range(max(0, self.count() - self._keepRecent)):
+            if self._usedBytes <= self._memoryBudget:
+                break
+            self._usedBytes -= compact_command(self.command(i))
+        self._enforceAt = max(self._memoryBudget, self._usedBytes) + self._memoryBudget // 8
+        return self._usedBytes
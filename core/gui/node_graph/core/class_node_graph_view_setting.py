@@ -20,7 +20,7 @@
 #
 # ------------------------------------------------------------------------------
 from core.gui.qtimp import Serializable
-from .define import EnumPipeShapeStyle
+from .define import EnumPipeShapeStyle, EnumViewportBackend
 
 
 class NodeGraphViewSetting(Serializable):
@@ -31,6 +31,8 @@ class NodeGraphViewSetting(Serializable):
         self.pipeStyle = kwargs.get('pipe_style', EnumPipeShapeStyle.CURVED.value)
         self.pipeCollisionEnabled = kwargs.get('pipe_collision_enabled', False)
         self.acyclic = kwargs.get('acyclic', True)
+        self.viewportBackend = kwargs.get('viewport_backend', EnumViewportBackend.RASTER.value)
+        self.msaaSamples = kwargs.get('msaa_samples', 4)
 
     @property
     def serializer(self):
@@ -40,4 +42,6 @@ class NodeGraphViewSetting(Serializable):
             'pipe_style': self.pipeStyle,
             'pipe_collision_enabled': self.pipeCollisionEnabled,
             'acyclic': self.acyclic,
+            'viewport_backend': self.viewportBackend,
+            'msaa_samples': self.msaaSamples,
         }
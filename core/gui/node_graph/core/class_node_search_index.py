@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : class_node_search_index.py
+# ------------------------------------------------------------------------------
+#
+# File          : class_node_search_index.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+import re
+import heapq
+from bisect import bisect_left
+
+# match tiers, lower is better.
+MATCH_PREFIX = 0
+MATCH_WORD_BOUNDARY = 1
+MATCH_SUBSTRING = 2
+MATCH_SUBSEQUENCE = 3
+
+
+def _char_mask(text):
+    _mask = 0
+    for c in text:
+        _mask |= 1 << (ord(c) & 63)
+    return _mask
+
+
+def _word_starts(name):
+    """
+    Returns the positions where a word starts, the start of the name, after
+    separators, lower to upper case and letter to digit transitions.
+    """
+    _starts = [0]
+    for i in range(1, len(name)):
+        _prev, _cur = name[i - 1], name[i]
+        if not _cur.isalnum():
+            continue
+        if not _prev.isalnum() or (_prev.islower() and _cur.isupper()) or (_prev.isalpha() != _cur.isalpha()):
+            _starts.append(i)
+    return tuple(_starts)
+
+
+class NodeSearchIndex:
+    """
+    Search index over the display names of the registered node types.
+
+    built once per node factory change, a query is answered by filtering
+    the names with a character bitmask, then ranking the survivors
+    prefix > word boundary > substring > subsequence. a query extending the
+    previous one only re-checks the previous hits. prefix lookups use a
+    sorted name list.
+    """
+
+    def __init__(self):
+        self._names = []
+        self._lowerNames = []
+        self._masks = []
+        self._wordStarts = []
+        self._items = dict()
+        self._sortedPrefix = []
+        self._lastQuery = None
+        self._lastHits = None
+
+    def __len__(self):
+        return len(self._names)
+
+    def build(self, node_dict):
+        """
+        Build the index from the grouped class factory items.
+
+        Args:
+            node_dict (dict): {<group>: [<class factory item>]}, items need
+                              ``display_name`` and ``class_type``.
+        """
+        self._names = []
+        self._items = dict()
+        for _group, _items in node_dict.items():
+            for x in _items:
+                if x.display_name not in self._items:
+                    self._names.append(x.display_name)
+                self._items[x.display_name] = x
+        self._lowerNames = [n.lower() for n in self._names]
+        self._masks = [_char_mask(n) for n in self._lowerNames]
+        self._wordStarts = [_word_starts(n) for n in self._names]
+        self._sortedPrefix = sorted((n, i) for i, n in enumerate(self._lowerNames))
+        self._lastQuery = None
+        self._lastHits = None
+
+    def get_item(self, display_name):
+        """
+        Returns the class factory item of a display name.
+
+        Args:
+            display_name (str): display name.
+        """
+        return self._items.get(display_name)
+
+    def get_identifier(self, display_name):
+        """
+        Returns the node type identifier of a display name.
+
+        Args:
+            display_name (str): display name.
+        """
+        _item = self._items.get(display_name)
+        return _item.class_type if _item is not None else None
+
+    def _prefix_ids(self, query):
+        _ids = []
+        _i = bisect_left(self._sortedPrefix, (query, -1))
+        while _i < len(self._sortedPrefix) and self._sortedPrefix[_i][0].startswith(query):
+            _ids.append(self._sortedPrefix[_i][1])
+            _i += 1
+        return _ids
+
+    def _rank(self, idx, query, sub_regex):
+        _lower = self._lowerNames[idx]
+        _pos = _lower.find(query)
+        if _pos == 0:
+            return MATCH_PREFIX, len(query), 0
+        if _pos > 0:
+            for _start in self._wordStarts[idx]:
+                if _lower.startswith(query, _start):
+                    return MATCH_WORD_BOUNDARY, len(query), _start
+            return MATCH_SUBSTRING, len(query), _pos
+        _match = sub_regex.search(_lower)
+        if _match is None:
+            return None
+        return MATCH_SUBSEQUENCE, len(_match.group()), _match.start()
+
+    def search(self, query, limit=None):
+        """
+        Returns the display names matching the query, best match first.
+
+        Args:
+            query (str): search text.
+            limit (int): max. count of results. (optional)
+
+        Returns:
+            list[str]: display names.
+        """
+        _query = query.lower()
+        if not _query:
+            return []
+        if self._lastQuery and _query.startswith(self._lastQuery):
+            _candidates = self._lastHits
+        else:
+            _candidates = range(len(self._names))
+        _mask = _char_mask(_query)
+        _sub_regex = re.compile('.*?'.join(re.escape(c) for c in _query))
+        _ranked = []
+        _hits = []
+        _masks = self._masks
+        for i in _candidates:
+            if _masks[i] & _mask != _mask:
+                continue
+            _rank = self._rank(i, _query, _sub_regex)
+            if _rank is None:
+                continue
+            _hits.append(i)
+            _ranked.append((_rank, len(self._names[i]), self._names[i]))
+        self._lastQuery = _query
+        self._lastHits = _hits
+        if limit:
+            _ranked = heapq.nsmallest(limit, _ranked)
+        else:
+            _ranked.sort()
+        return [x[2] for x in _ranked]
+
+    def search_prefix(self, query):
+        """
+        Returns the display names starting with the query.
+
+        Args:
+            query (str): search text.
+
+        Returns:
+            list[str]: display names sorted by name.
+        """
+        return [self._names[i] for i in self._prefix_ids(query.lower())]
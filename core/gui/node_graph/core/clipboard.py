@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : clipboard.py
+# ------------------------------------------------------------------------------
+#
+# File          : clipboard.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+compact binary encoding of the serialized node data used by the clipboard.
+
+layout: magic ``NGCB``, uint16 format version, uint8 flags, then the
+(optionally zlib compressed) body. the body starts with a table of all
+distinct strings, followed by the value tree. values are tagged like
+msgpack, integers and lengths are varints, strings are stored once and
+referenced by their table index, so repeating node types and property names
+cost one or two bytes each.
+only plain data (None, bool, int, float, str, bytes, list, tuple, dict) is
+encodable, unlike pickle decoding never executes code from the clipboard.
+"""
+import struct, zlib
+from .exceptions import ClipboardFormatError
+
+
+CLIPBOARD_MIME_TYPE = 'application/x-pxcmbt-node-graph'
+CLIPBOARD_YAML_MIME_TYPE = 'application/x-yaml'
+CLIPBOARD_MAGIC = b'NGCB'
+CLIPBOARD_VERSION = 1
+
+_FLAG_ZLIB = 0x01
+_HEADER = struct.Struct('<4sHB')
+_DOUBLE = struct.Struct('<d')
+# compress bodies larger than this.
+_ZLIB_THRESHOLD = 512
+
+_T_NONE = 0x00
+_T_TRUE = 0x01
+_T_FALSE = 0x02
+_T_INT = 0x03
+_T_NEG_INT = 0x04
+_T_FLOAT = 0x05
+_T_STR = 0x06
+_T_BYTES = 0x07
+_T_LIST = 0x08
+_T_DICT = 0x09
+
+
+def _write_varint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf, pos):
+    _shift = 0
+    _result = 0
+    while True:
+        try:
+            _b = buf[pos]
+        except IndexError:
+            raise ClipboardFormatError('truncated clipboard data') from None
+        pos += 1
+        _result |= (_b & 0x7F) << _shift
+        if not _b & 0x80:
+            return _result, pos
+        _shift += 7
+
+
+def is_encodable(value):
+    """
+    check if a value could be encoded by ``encode_clipboard``.
+
+    Args:
+        value (object): value.
+
+    Returns:
+        bool: true if only plain data is contained.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(is_encodable(x) for x in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and is_encodable(v) for k, v in value.items())
+    return False
+
+
+def encode_clipboard(data):
+    """
+    encode plain data into the binary clipboard format.
+
+    Args:
+        data (object): plain data, usually from ``NodeGraph._serialize``.
+
+    Returns:
+        bytes: encoded data.
+    """
+    _strings = {}
+    _body = bytearray()
+    _write = _body.append
+
+    def _encode(value):
+        # bool before int, bool is a subclass of int.
+        if value is None:
+            _write(_T_NONE)
+        elif value is True:
+            _write(_T_TRUE)
+        elif value is False:
+            _write(_T_FALSE)
+        elif isinstance(value, str):
+            _idx = _strings.get(value)
+            if _idx is None:
+                _idx = _strings[value] = len(_strings)
+            _write(_T_STR)
+            _write_varint(_body, _idx)
+        elif isinstance(value, int):
+            if value < 0:
+                _write(_T_NEG_INT)
+                _write_varint(_body, -value)
+            else:
+                _write(_T_INT)
+                _write_varint(_body, value)
+        elif isinstance(value, float):
+            _write(_T_FLOAT)
+            _body.extend(_DOUBLE.pack(value))
+        elif isinstance(value, dict):
+            _write(_T_DICT)
+            _write_varint(_body, len(value))
+            for k, v in value.items():
+                _encode(k)
+                _encode(v)
+        elif isinstance(value, (list, tuple)):
+            _write(_T_LIST)
+            _write_varint(_body, len(value))
+            for v in value:
+                _encode(v)
+        elif isinstance(value, (bytes, bytearray)):
+            _write(_T_BYTES)
+            _write_varint(_body, len(value))
+            _body.extend(value)
+        else:
+            raise TypeError('value of type {} is not encodable'.format(type(value).__name__))
+
+    _encode(data)
+    _table = bytearray()
+    _write_varint(_table, len(_strings))
+    for s in _strings:
+        _raw = s.encode('utf-8')
+        _write_varint(_table, len(_raw))
+        _table.extend(_raw)
+    _payload = bytes(_table + _body)
+    _flags = 0
+    if len(_payload) > _ZLIB_THRESHOLD:
+        _payload = zlib.compress(_payload, 6)
+        _flags |= _FLAG_ZLIB
+    return _HEADER.pack(CLIPBOARD_MAGIC, CLIPBOARD_VERSION, _flags) + _payload
+
+
+def decode_clipboard(raw):
+    """
+    decode data in the binary clipboard format.
+
+    Args:
+        raw (bytes): encoded data.
+
+    Returns:
+        object: decoded plain data.
+    """
+    raw = bytes(raw)
+    if len(raw) < _HEADER.size:
+        raise ClipboardFormatError('clipboard data too short')
+    _magic, _version, _flags = _HEADER.unpack_from(raw)
+    if _magic != CLIPBOARD_MAGIC:
+        raise ClipboardFormatError('not a node graph clipboard payload')
+    if _version > CLIPBOARD_VERSION:
+        raise ClipboardFormatError('unsupported clipboard version {}'.format(_version))
+    _buf = raw[_HEADER.size:]
+    if _flags & _FLAG_ZLIB:
+        try:
+            _buf = zlib.decompress(_buf)
+        except zlib.error as e:
+            raise ClipboardFormatError('corrupted clipboard data: {}'.format(e)) from None
+
+    def _decode(pos):
+        try:
+            _tag = _buf[pos]
+        except IndexError:
+            raise ClipboardFormatError('truncated clipboard data') from None
+        pos += 1
+        if _tag == _T_STR:
+            _idx, pos = _read_varint(_buf, pos)
+            return _strings[_idx], pos
+        if _tag == _T_INT:
+            return _read_varint(_buf, pos)
+        if _tag == _T_FLOAT:
+            return _DOUBLE.unpack_from(_buf, pos)[0], pos + _DOUBLE.size
+        if _tag == _T_DICT:
+            _n, pos = _read_varint(_buf, pos)
+            _d = {}
+            for _ in range(_n):
+                _k, pos = _decode(pos)
+                _d[_k], pos = _decode(pos)
+            return _d, pos
+        if _tag == _T_LIST:
+            _n, pos = _read_varint(_buf, pos)
+            _l = []
+            for _ in range(_n):
+                _v, pos = _decode(pos)
+                _l.append(_v)
+            return _l, pos
+        if _tag == _T_NONE:
+            return None, pos
+        if _tag == _T_TRUE:
+            return True, pos
+        if _tag == _T_FALSE:
+            return False, pos
+        if _tag == _T_NEG_INT:
+            _v, pos = _read_varint(_buf, pos)
+            return -_v, pos
+        if _tag == _T_BYTES:
+            _n, pos = _read_varint(_buf, pos)
+            return bytes(_buf[pos:pos + _n]), pos + _n
+        raise ClipboardFormatError('unknown tag 0x{:02x}'.format(_tag))
+
+    _strings = []
+    try:
+        _count, _pos = _read_varint(_buf, 0)
+        for _ in range(_count):
+            _n, _pos = _read_varint(_buf, _pos)
+            if _pos + _n > len(_buf):
+                raise ClipboardFormatError('truncated clipboard data')
+            _strings.append(_buf[_pos:_pos + _n].decode('utf-8'))
+            _pos += _n
+        _value, _ = _decode(_pos)
+    except (IndexError, TypeError, RecursionError, struct.error, UnicodeDecodeError) as e:
+        raise ClipboardFormatError('corrupted clipboard data: {}'.format(e)) from None
+    return _value
+
+
+def _is_pair(value, types):
+    return isinstance(value, (list, tuple)) and len(value) == 2 and all(isinstance(x, types) for x in value)
+
+
+def validate_clipboard_data(data):
+    """
+    check the structure of serialized node data read from the clipboard,
+    the format written by ``NodeGraph._serialize``.
+
+    Args:
+        data (object): decoded data.
+
+    Returns:
+        dict: the data.
+
+    Raises:
+        ClipboardFormatError: if the data is no node graph data.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('nodes'), dict):
+        raise ClipboardFormatError('no node data')
+    for _n_id, _n_data in data['nodes'].items():
+        if not isinstance(_n_data, dict) or not isinstance(_n_data.get('type_'), str):
+            raise ClipboardFormatError('node "{}" has no type'.format(_n_id))
+        if not isinstance(_n_data.get('label', ''), (str, type(None))):
+            raise ClipboardFormatError('invalid label of node "{}"'.format(_n_id))
+        if _n_data.get('pos') is not None and not _is_pair(_n_data['pos'], (int, float)):
+            raise ClipboardFormatError('invalid position of node "{}"'.format(_n_id))
+        _props = _n_data.get('properties', {})
+        if not isinstance(_props, dict) or not all(isinstance(k, str) for k in _props):
+            raise ClipboardFormatError('invalid properties of node "{}"'.format(_n_id))
+    _connections = data.get('connections', [])
+    if not isinstance(_connections, list):
+        raise ClipboardFormatError('invalid connections')
+    for _conn in _connections:
+        if not isinstance(_conn, dict) or not _is_pair(_conn.get('in'), str) or not _is_pair(_conn.get('out'), str):
+            raise ClipboardFormatError('invalid connection {!r}'.format(_conn))
+    return data
@@ -19,9 +19,80 @@
 #
 #
 # ------------------------------------------------------------------------------
+import sys, zlib, pickle
+from array import array
 from core.gui.qtimp import QtGui
 from .define import EnumPortType
 
+# ids of the commands supporting QUndoCommand.mergeWith.
+CMD_ID_NODE_PROPERTY_CHANGED = 1
+CMD_ID_NODE_MOVED = 2
+CMD_ID_NODES_MOVED = 3
+# cost in bytes assumed for commands without a cost estimation.
+CMD_DEFAULT_COST = 256
+
+
+def _estimate_size(value, depth=2):
+    """
+    Returns a rough size in bytes of a value, containers are followed
+    ``depth`` levels deep.
+    """
+    _size = sys.getsizeof(value, CMD_DEFAULT_COST)
+    if depth <= 0:
+        return _size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _size += _estimate_size(k, depth - 1) + _estimate_size(v, depth - 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            _size += _estimate_size(v, depth - 1)
+    return _size
+
+
+def command_cost(cmd):
+    """
+    Returns the estimated memory cost of an undo command including its children.
+
+    Args:
+        cmd (QtGui.QUndoCommand): undo command.
+    """
+    _cost_fn = getattr(cmd, 'cost', None)
+    _cost = _cost_fn() if callable(_cost_fn) else CMD_DEFAULT_COST
+    for i in range(cmd.childCount()):
+        _cost += command_cost(cmd.child(i))
+    return _cost
+
+
+def compact_command(cmd):
+    """
+    Compact an undo command and its children, returns the saved bytes.
+
+    Args:
+        cmd (QtGui.QUndoCommand): undo command.
+    """
+    _before = command_cost(cmd)
+    _compact_fn = getattr(cmd, 'compact', None)
+    if callable(_compact_fn):
+        _compact_fn()
+    for i in range(cmd.childCount()):
+        compact_command(cmd.child(i))
+    return _before - command_cost(cmd)
+
+
+def _connection_node_ids(src_port, trg_port):
+    """
+    Returns the (output node id, input node id) pair of a port connection.
+
+    Args:
+        src_port (NodeGraphQt.Port): source port.
+        trg_port (NodeGraphQt.Port): target port.
+    """
+    _src_id = src_port.get_node().id
+    _trg_id = trg_port.get_node().id
+    if src_port.type_() == EnumPortType.IN.value:
+        return _trg_id, _src_id
+    return _src_id, _trg_id
+
 
 class NodeViewPropertyChangedCmd(QtGui.QUndoCommand):
     """
@@ -44,6 +115,53 @@ class NodeViewPropertyChangedCmd(QtGui.QUndoCommand):
         assert node_view.get_property(name) is not None
         self.oldVal = node_view.get_property(name).value
         self.newVal = new_value
+        self._packed = None
+
+    def id(self):
+        return CMD_ID_NODE_PROPERTY_CHANGED
+
+    def mergeWith(self, other):
+        """
+        consecutive edits of the same property on the same node are merged
+        into one command.
+        """
+        if not isinstance(other, NodeViewPropertyChangedCmd):
+            return False
+        if other.nodeView is not self.nodeView or other.name != self.name:
+            return False
+        self._unpack()
+        other._unpack()
+        self.newVal = other.newVal
+        if self.newVal == self.oldVal:
+            self.setObsolete(True)
+        return True
+
+    def cost(self):
+        if self._packed is not None:
+            return sys.getsizeof(self._packed)
+        return _estimate_size(self.oldVal) + _estimate_size(self.newVal)
+
+    def compact(self):
+        """
+        compress the stored values, they are restored on the next undo/redo.
+        """
+        if self._packed is not None:
+            return
+        try:
+            _packed = zlib.compress(pickle.dumps((self.oldVal, self.newVal), pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # not picklable values are kept as they are.
+            return
+        if sys.getsizeof(_packed) >= self.cost():
+            return
+        self._packed = _packed
+        self.oldVal = self.newVal = None
+
+    def _unpack(self):
+        if self._packed is None:
+            return
+        self.oldVal, self.newVal = pickle.loads(zlib.decompress(self._packed))
+        self._packed = None
 
     def set_node_prop(self, name, value):
         """
@@ -71,13 +189,15 @@ class NodeViewPropertyChangedCmd(QtGui.QUndoCommand):
         #     setattr(_view, name, value)
 
     def undo(self):
+        self._unpack()
         if self.oldVal != self.newVal:
             self.set_node_prop(self.name, self.oldVal)
             # emit property changed signal.
             _graph = self.nodeView.node.graph
-            _graph.sigPropertyChanged.emit(self.nodeView, self.name, self.oldVal)
+            _graph.sigPropertyChanged.emit(self.nodeView.node, self.name, self.oldVal)
 
     def redo(self):
+        self._unpack()
         if self.oldVal != self.newVal:
             self.set_node_prop(self.name, self.newVal)
             # emit property changed signal.
@@ -101,6 +221,17 @@ class NodeViewMovedCmd(QtGui.QUndoCommand):
         self.pos = pos
         self.prevPos = prev_pos
 
+    def id(self):
+        return CMD_ID_NODE_MOVED
+
+    def mergeWith(self, other):
+        if not isinstance(other, NodeViewMovedCmd) or other.nodeView is not self.nodeView:
+            return False
+        self.pos = other.pos
+        if self.pos == self.prevPos:
+            self.setObsolete(True)
+        return True
+
     def undo(self):
         self.nodeView.view.setPos(*self.prevPos)
 
@@ -110,6 +241,84 @@ class NodeViewMovedCmd(QtGui.QUndoCommand):
         self.nodeView.view.setPos(*self.pos)
 
 
+class NodesViewMovedCmd(QtGui.QUndoCommand):
+    """
+    Multiple nodes moved command.
+
+    the nodes are stored by id with a flat array of the previous positions
+    and a flat array of the position deltas, when all nodes moved by the
+    same offset (e.g. a drag of the selection) only one delta is stored.
+    consecutive moves of the same nodes are merged.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        node_data (dict): {<node_view>: <previous_pos>}
+    """
+
+    def __init__(self, graph, node_data):
+        QtGui.QUndoCommand.__init__(self)
+        self.setText('move nodes')
+        self.graph = graph
+        self.nodeIds = tuple(n.id for n in node_data.keys())
+        self.prevPos = array('d')
+        _deltas = array('d')
+        for node_view, prev_pos in node_data.items():
+            _x, _y = node_view.xy_pos
+            self.prevPos.extend(prev_pos[:2])
+            _deltas.extend((_x - prev_pos[0], _y - prev_pos[1]))
+        self.deltas = self._pack_deltas(_deltas)
+
+    @staticmethod
+    def _pack_deltas(deltas):
+        _dx, _dy = deltas[0:2] if deltas else (0.0, 0.0)
+        if all(deltas[i] == _dx and deltas[i + 1] == _dy for i in range(0, len(deltas), 2)):
+            return array('d', (_dx, _dy))
+        return deltas
+
+    def _delta(self, index):
+        if len(self.deltas) == 2:
+            return self.deltas[0], self.deltas[1]
+        return self.deltas[index * 2], self.deltas[index * 2 + 1]
+
+    def _positions(self):
+        for i, _node_id in enumerate(self.nodeIds):
+            _dx, _dy = self._delta(i)
+            yield _node_id, self.prevPos[i * 2], self.prevPos[i * 2 + 1], _dx, _dy
+
+    def id(self):
+        return CMD_ID_NODES_MOVED
+
+    def mergeWith(self, other):
+        if not isinstance(other, NodesViewMovedCmd) or other.nodeIds != self.nodeIds:
+            return False
+        _deltas = array('d')
+        for (_, _px, _py, _, _), (_, _ox, _oy, _odx, _ody) in zip(self._positions(), other._positions()):
+            _deltas.extend((_ox + _odx - _px, _oy + _ody - _py))
+        self.deltas = self._pack_deltas(_deltas)
+        if not any(self.deltas):
+            self.setObsolete(True)
+        return True
+
+    def cost(self):
+        return sys.getsizeof(self.nodeIds) + self.prevPos.itemsize * (len(self.prevPos) + len(self.deltas))
+
+    def _set_positions(self, forward):
+        for _node_id, _x, _y, _dx, _dy in self._positions():
+            _node = self.graph.nodes.get(_node_id)
+            if _node is None:
+                continue
+            if forward:
+                _node.view.setPos(_x + _dx, _y + _dy)
+            else:
+                _node.view.setPos(_x, _y)
+
+    def undo(self):
+        self._set_positions(False)
+
+    def redo(self):
+        self._set_positions(True)
+
+
 class NodeViewAddedCmd(QtGui.QUndoCommand):
     """
     Node added command.
@@ -130,11 +339,11 @@ class NodeViewAddedCmd(QtGui.QUndoCommand):
 
     def undo(self):
         self.pos = self.pos or self.node.view.pos()
-        self.graph.nodes.pop(self.node.id)
+        self.graph.remove_node_ref(self.node)
         self.node.view.delete()
 
     def redo(self):
-        self.graph.nodes[self.node.id] = self.node
+        self.graph.add_node_ref(self.node)
         self.graphView.add_item(self.node.view, self.pos)
 
         # node width & height is calculated when its added to the scene
@@ -158,16 +367,63 @@ class NodeViewRemovedCmd(QtGui.QUndoCommand):
         self.scene = graph.get_scene()
         self.graph = graph
         self.nodeView = node_view
+        self.connectionRefs = list()
 
     def undo(self):
-        self.graph.nodes[self.nodeView.id] = self.nodeView.node
+        self.graph.add_node_ref(self.nodeView.node)
+        # the port connections outlive the delete, put their edges back
+        # into the reachability order or the acyclic check misses them.
+        for _out_node_id, _in_node_id in self.connectionRefs:
+            self.graph.add_connection_ref(_out_node_id, _in_node_id)
         self.scene.addItem(self.nodeView)
 
     def redo(self):
-        self.graph.nodes.pop(self.nodeView.id)
+        self.connectionRefs = self.graph.get_connection_refs(self.nodeView.node.id)
+        self.graph.remove_node_ref(self.nodeView.node)
         self.nodeView.delete()
 
 
+class NodeViewBatchCmd(QtGui.QUndoCommand):
+    """
+    Compound command of the child commands collected by ``NodeGraph.batch``.
+
+    the child commands were already executed while batching, so the first
+    redo (called by ``QUndoStack.push``) is skipped. undo and redo are
+    wrapped in a bulk update of the graph view.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        text (str): undo text.
+        commands (list[QtGui.QUndoCommand]): executed child commands.
+    """
+
+    def __init__(self, graph, text, commands):
+        QtGui.QUndoCommand.__init__(self)
+        self.setText(text)
+        self.graphView = graph.get_view()
+        self.commands = list(commands)
+        self._applied = True
+
+    def undo(self):
+        self.graphView.begin_bulk_update()
+        try:
+            for cmd in reversed(self.commands):
+                cmd.undo()
+        finally:
+            self.graphView.end_bulk_update()
+
+    def redo(self):
+        if self._applied:
+            self._applied = False
+            return
+        self.graphView.begin_bulk_update()
+        try:
+            for cmd in self.commands:
+                cmd.redo()
+        finally:
+            self.graphView.end_bulk_update()
+
+
 class NodeViewInputConnectedCmd(QtGui.QUndoCommand):
     """
     "BaseNode.on_input_connected()" command.
@@ -222,6 +478,62 @@ class NodeViewInputDisconnectedCmd(QtGui.QUndoCommand):
         _node.on_input_disconnected(self.source, self.target)
 
 
+def connect_ports(src_port, trg_port, register=True):
+    """
+    Connect two ports without an undo command.
+
+    Args:
+        src_port (NodeGraphQt.Port): source port.
+        trg_port (NodeGraphQt.Port): target port.
+        register (bool): register the connection in the reachability order of
+                         the graph, bulk operations pass False and register
+                         the returned ids at once.
+
+    Returns:
+        tuple(str, str): (output node id, input node id).
+    """
+    _src_id = src_port.get_node().id
+    _trg_id = trg_port.get_node().id
+
+    src_port.model.connectedPorts[_trg_id].append(trg_port.get_name())
+    trg_port.model.connectedPorts[_src_id].append(src_port.get_name())
+
+    src_port.view.connect_to(trg_port.view)
+    _ids = _connection_node_ids(src_port, trg_port)
+    if register:
+        src_port.get_node().graph.add_connection_ref(*_ids)
+    return _ids
+
+
+def disconnect_ports(src_port, trg_port):
+    """
+    Disconnect two ports without an undo command.
+
+    Args:
+        src_port (NodeGraphQt.Port): source port.
+        trg_port (NodeGraphQt.Port): target port.
+    """
+    _src_model = src_port.model
+    _trg_model = trg_port.model
+    _src_id = src_port.get_node().id
+    _trg_id = trg_port.get_node().id
+
+    _port_names = _src_model.connectedPorts.get(_trg_id)
+    if _port_names is []:
+        del _src_model.connectedPorts[_trg_id]
+    if _port_names and trg_port.get_name() in _port_names:
+        _port_names.remove(trg_port.get_name())
+
+    _port_names = _trg_model.connectedPorts.get(_src_id)
+    if _port_names is []:
+        del _trg_model.connectedPorts[_src_id]
+    if _port_names and src_port.get_name() in _port_names:
+        _port_names.remove(src_port.get_name())
+
+    src_port.view.disconnect_from(trg_port.view)
+    src_port.get_node().graph.remove_connection_ref(*_connection_node_ids(src_port, trg_port))
+
+
 class PortViewConnectedCmd(QtGui.QUndoCommand):
     """
     Port connected command.
@@ -237,35 +549,10 @@ class PortViewConnectedCmd(QtGui.QUndoCommand):
         self.target = trg_port
 
     def undo(self):
-        _src_model = self.source.model
-        _trg_model = self.target.model
-        _src_id = self.source.get_node().id
-        _trg_id = self.target.get_node().id
-
-        _port_names = _src_model.connectedPorts.get(_trg_id)
-        if _port_names is []:
-            del _src_model.connectedPorts[_trg_id]
-        if _port_names and self.target.get_name() in _port_names:
-            _port_names.remove(self.target.get_name())
-
-        _port_names = _trg_model.connectedPorts.get(_src_id)
-        if _port_names is []:
-            del _trg_model.connectedPorts[_src_id]
-        if _port_names and self.source.get_name() in _port_names:
-            _port_names.remove(self.source.get_name())
-
-        self.source.view.disconnect_from(self.target.view)
+        disconnect_ports(self.source, self.target)
 
     def redo(self):
-        _src_model = self.source.model
-        _trg_model = self.target.model
-        _src_id = self.source.get_node().id
-        _trg_id = self.target.get_node().id
-
-        _src_model.connectedPorts[_trg_id].append(self.target.get_name())
-        _trg_model.connectedPorts[_src_id].append(self.source.get_name())
-
-        self.source.view.connect_to(self.target.view)
+        connect_ports(self.source, self.target)
 
 
 class PortViewDisconnectedCmd(QtGui.QUndoCommand):
@@ -283,35 +570,60 @@ class PortViewDisconnectedCmd(QtGui.QUndoCommand):
         self.target = trg_port
 
     def undo(self):
-        _src_model = self.source.model
-        _trg_model = self.target.model
-        _src_id = self.source.get_node().id
-        _trg_id = self.target.get_node().id
+        connect_ports(self.source, self.target)
 
-        _src_model.connectedPorts[_trg_id].append(self.target.get_name())
-        _trg_model.connectedPorts[_src_id].append(self.source.get_name())
+    def redo(self):
+        disconnect_ports(self.source, self.target)
 
-        self.source.view.connect_to(self.target.view)
+
+class NodesRestoredCmd(QtGui.QUndoCommand):
+    """
+    Aggregate record of nodes and connections restored in bulk
+    (session load, paste), created after the restore so the first redo
+    is skipped.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        nodes (list[NodeGraphQt.NodeObject]): restored nodes.
+        connections (list[tuple]): restored (source port, target port) pairs.
+        text (str): undo text.
+    """
+
+    def __init__(self, graph, nodes, connections, text='load nodes'):
+        QtGui.QUndoCommand.__init__(self)
+        self.setText(text)
+        self.graph = graph
+        self.graphView = graph.get_view()
+        self.nodes = list(nodes)
+        self.connections = list(connections)
+        self.positions = None
+        self._applied = True
+
+    def undo(self):
+        self.graphView.begin_bulk_update()
+        try:
+            for _src, _trg in reversed(self.connections):
+                disconnect_ports(_src, _trg)
+            self.positions = [n.view.xy_pos for n in self.nodes]
+            for n in reversed(self.nodes):
+                self.graph.remove_node_ref(n)
+                n.view.delete()
+        finally:
+            self.graphView.end_bulk_update()
 
     def redo(self):
-        _src_model = self.source.model
-        _trg_model = self.target.model
-        _src_id = self.source.get_node().id
-        _trg_id = self.target.get_node().id
-
-        _port_names = _src_model.connectedPorts.get(_trg_id)
-        if _port_names is []:
-            del _src_model.connectedPorts[_trg_id]
-        if _port_names and self.target.get_name() in _port_names:
-            _port_names.remove(self.target.get_name())
-
-        _port_names = _trg_model.connectedPorts.get(_src_id)
-        if _port_names is []:
-            del _trg_model.connectedPorts[_src_id]
-        if _port_names and self.source.get_name() in _port_names:
-            _port_names.remove(self.source.get_name())
-
-        self.source.view.disconnect_from(self.target.view)
+        if self._applied:
+            self._applied = False
+            return
+        self.graphView.begin_bulk_update()
+        try:
+            for n, _pos in zip(self.nodes, self.positions):
+                self.graph.add_node_ref(n)
+                self.graphView.add_item(n.view, _pos)
+            self.graph.add_connection_refs(
+                [connect_ports(_src, _trg, register=False) for _src, _trg in self.connections])
+        finally:
+            self.graphView.end_bulk_update()
 
 
 class PortViewLockedCmd(QtGui.QUndoCommand):
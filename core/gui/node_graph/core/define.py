@@ -223,6 +223,18 @@ class EnumPipeShapeStyle(enum.IntEnum):
     ORTHOGONAL = 4
 
 
+class EnumViewportBackend(enum.Enum):
+    """
+    Paint backend of the node graph view viewport.
+    """
+    #: plain QWidget viewport painted by the raster engine.
+    RASTER = 'raster'
+    #: QOpenGLWidget viewport with multisample anti-aliasing.
+    OPENGL = 'opengl'
+    #: raster viewport without anti-aliasing, for headless/offscreen runs.
+    SOFTWARE = 'software'
+
+
 class EnumNodeEditFlag(enum.IntEnum):
     COPYABLE = 0x0001
     DELETEABLE = 0x0002
@@ -21,3 +21,6 @@ class PortError(Exception): pass
 
 
 class PortRegistrationError(Exception): pass
+
+
+class ClipboardFormatError(Exception): pass
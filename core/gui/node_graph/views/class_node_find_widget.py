@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : class_node_find_widget.py
+# ------------------------------------------------------------------------------
+#
+# File          : class_node_find_widget.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+from core.gui.qtimp import QtCore, QtWidgets
+from ..core.class_node_find_index import FIND_FIELD_NAME, FIND_FIELD_PROP, FIND_FIELD_PORT
+
+
+class NodeFindWidget(QtWidgets.QWidget):
+    """
+    Find/replace panel over the nodes of a node graph, the results come from
+    :meth:`NodeGraph.find_nodes`, activating a result centers the view on
+    the node.
+    """
+    MAX_RESULTS = 1000
+    SEARCH_DELAY_MS = 150
+    SCOPES = (('All', None),
+              ('Names', [FIND_FIELD_NAME]),
+              ('Properties', [FIND_FIELD_PROP]),
+              ('Ports', [FIND_FIELD_PORT]))
+
+    def __init__(self, graph, parent=None):
+        super(NodeFindWidget, self).__init__(parent)
+        self._graph = graph
+        self._findEdit = QtWidgets.QLineEdit(self)
+        self._findEdit.setPlaceholderText('Find')
+        self._findEdit.setClearButtonEnabled(True)
+        self._replaceEdit = QtWidgets.QLineEdit(self)
+        self._replaceEdit.setPlaceholderText('Replace')
+        self._scopeCombo = QtWidgets.QComboBox(self)
+        for _label, _kinds in self.SCOPES:
+            self._scopeCombo.addItem(_label, _kinds)
+        self._matchCaseCheck = QtWidgets.QCheckBox('Match case', self)
+        self._replaceButton = QtWidgets.QPushButton('Replace All', self)
+        self._statusLabel = QtWidgets.QLabel(self)
+        self._resultTree = QtWidgets.QTreeWidget(self)
+        self._resultTree.setHeaderLabels(['Node', 'Field', 'Text'])
+        self._resultTree.setRootIsDecorated(False)
+        self._resultTree.setUniformRowHeights(True)
+        self._resultTree.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self._searchTimer = QtCore.QTimer(self)
+        self._searchTimer.setSingleShot(True)
+        self._searchTimer.setInterval(self.SEARCH_DELAY_MS)
+
+        _find_layout = QtWidgets.QHBoxLayout()
+        _find_layout.addWidget(self._findEdit, 1)
+        _find_layout.addWidget(self._scopeCombo)
+        _find_layout.addWidget(self._matchCaseCheck)
+        _replace_layout = QtWidgets.QHBoxLayout()
+        _replace_layout.addWidget(self._replaceEdit, 1)
+        _replace_layout.addWidget(self._replaceButton)
+        _layout = QtWidgets.QVBoxLayout(self)
+        _layout.setContentsMargins(4, 4, 4, 4)
+        _layout.addLayout(_find_layout)
+        _layout.addLayout(_replace_layout)
+        _layout.addWidget(self._resultTree, 1)
+        _layout.addWidget(self._statusLabel)
+        self._wire_signals()
+
+    def _wire_signals(self):
+        self._findEdit.textChanged.connect(self._on_find_text_changed)
+        self._findEdit.returnPressed.connect(self.refresh)
+        self._scopeCombo.currentIndexChanged.connect(self.refresh)
+        self._matchCaseCheck.toggled.connect(self.refresh)
+        self._searchTimer.timeout.connect(self.refresh)
+        self._replaceButton.clicked.connect(self._on_replace_all)
+        self._resultTree.itemSelectionChanged.connect(self._on_result_selection_changed)
+        self._graph.sigPropertyChanged.connect(self._on_graph_changed)
+        self._graph.sigNodesDeleted.connect(self._on_graph_changed)
+
+    @property
+    def find_text(self):
+        return self._findEdit.text()
+
+    def set_find_text(self, text):
+        self._findEdit.setText(text)
+        self.refresh()
+
+    def _on_find_text_changed(self, text):
+        self._searchTimer.start()
+
+    def _on_graph_changed(self, *args):
+        if self.isVisible() and self._findEdit.text():
+            self._searchTimer.start()
+
+    def refresh(self):
+        """
+        Run the search again and fill the result list.
+        """
+        self._searchTimer.stop()
+        self._resultTree.setUpdatesEnabled(False)
+        try:
+            self._resultTree.clear()
+            _text = self._findEdit.text()
+            if not _text:
+                self._statusLabel.clear()
+                return
+            _hits = self._graph.find_nodes(_text, kinds=self._scopeCombo.currentData(),
+                                           match_case=self._matchCaseCheck.isChecked(),
+                                           limit=self.MAX_RESULTS)
+            _items = []
+            for _node, _field, _field_text in _hits:
+                _item = QtWidgets.QTreeWidgetItem([_node.label, _field, _field_text])
+                _item.setData(0, QtCore.Qt.ItemDataRole.UserRole, _node.id)
+                _items.append(_item)
+            self._resultTree.addTopLevelItems(_items)
+            if len(_hits) >= self.MAX_RESULTS:
+                self._statusLabel.setText('first {} results'.format(self.MAX_RESULTS))
+            else:
+                self._statusLabel.setText('{} results'.format(len(_hits)))
+        finally:
+            self._resultTree.setUpdatesEnabled(True)
+
+    def _selected_nodes(self):
+        _nodes = []
+        for _item in self._resultTree.selectedItems():
+            _node = self._graph.get_node_by_id(_item.data(0, QtCore.Qt.ItemDataRole.UserRole))
+            if _node is not None and _node not in _nodes:
+                _nodes.append(_node)
+        return _nodes
+
+    def _on_result_selection_changed(self):
+        self._graph.center_on_nodes(self._selected_nodes())
+
+    def _on_replace_all(self):
+        _text = self._findEdit.text()
+        if not _text:
+            return
+        _kinds = self._scopeCombo.currentData()
+        if _kinds is None:
+            _kinds = [FIND_FIELD_NAME, FIND_FIELD_PROP]
+        _match_case = self._matchCaseCheck.isChecked()
+        _hits = self._graph.find_nodes(_text, kinds=_kinds, match_case=_match_case)
+        _count = self._graph.replace_in_nodes(_text, self._replaceEdit.text(), hits=_hits, match_case=_match_case)
+        self.refresh()
+        self._statusLabel.setText('{} replaced'.format(_count))
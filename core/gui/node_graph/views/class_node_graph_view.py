@@ -22,7 +22,7 @@
 import typing
 from distutils.version import LooseVersion
 from core.gui.qtimp import QtGui, QtCore, QtWidgets, QtOpenGLWidgets
-from ..core.define import (EnumGraphFlag, EnumGraphViewFlag)
+from ..core.define import (EnumGraphFlag, EnumGraphViewFlag, EnumViewportBackend)
 from ..core.class_node_graph_interactor import NodeGraphBaseInteractor
 from .class_search_widget import SearchMenuWidget
 from .class_pipe_view_item import PipeViewItem
@@ -75,6 +75,10 @@ class NodeGraphView(QtWidgets.QGraphicsView):
         self.graph = graph
         self.setScene(NodeGraphScene(self))
         self.interactor = NodeGraphBaseInteractor(self)
+        # bulk update state, see begin_bulk_update/end_bulk_update.
+        self._bulkDepth = 0
+        self._bulkIndexMethod = None
+        self._bulkSceneUpdatePending = False
 
         self.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing, True)
         self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
@@ -83,6 +87,9 @@ class NodeGraphView(QtWidgets.QGraphicsView):
         self.setCacheMode(self.CacheModeFlag.CacheBackground)
         self.setOptimizationFlag(self.OptimizationFlag.DontAdjustForAntialiasing)
         # self.viewport().setAutoFillBackground(True)
+        self._viewportBackend = EnumViewportBackend.RASTER.value
+        if self.view_setting.viewportBackend != self._viewportBackend:
+            self.set_viewport_backend()
 
         if self.graph.has_flag(self.graph.view_flags, EnumGraphViewFlag.DND):
             self.setAcceptDrops(True)
@@ -216,7 +223,7 @@ class NodeGraphView(QtWidgets.QGraphicsView):
             if _scale == 1.1:
                 return
         self.scale(_scale, _scale, pos)
-        self.sigSceneUpdate.emit(self)
+        self._emit_scene_update()
 
     def set_view_pan(self, pos_x, pos_y):
         """
@@ -247,8 +254,57 @@ class NodeGraphView(QtWidgets.QGraphicsView):
         """
         self.setSceneRect(self._sceneRange)
         self.fitInView(self._sceneRange, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        self._emit_scene_update()
+
+    def _emit_scene_update(self):
+        """
+        Emit the scene update signal, deferred while a bulk update is active.
+        """
+        if self._bulkDepth:
+            self._bulkSceneUpdatePending = True
+            return
         self.sigSceneUpdate.emit(self)
 
+    @property
+    def in_bulk_update(self):
+        return self._bulkDepth > 0
+
+    def begin_bulk_update(self):
+        """
+        Prepare the view for inserting or removing a large number of items.
+
+        The scene index is switched to ``NoIndex`` so adding items doesn't
+        update the BSP tree each time, viewport repaints are paused and
+        the scene update signal is held back until
+        :meth:`NodeGraphView.end_bulk_update` is called. calls can be nested.
+        """
+        self._bulkDepth += 1
+        if self._bulkDepth > 1:
+            return
+        _scene = self.scene()
+        self._bulkIndexMethod = _scene.itemIndexMethod()
+        _scene.setItemIndexMethod(QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex)
+        self.setUpdatesEnabled(False)
+
+    def end_bulk_update(self):
+        """
+        Finish a bulk update, the scene index is rebuilt once and a
+        pending scene update signal is emitted.
+        """
+        if not self._bulkDepth:
+            return
+        self._bulkDepth -= 1
+        if self._bulkDepth:
+            return
+        # restoring the index method rebuilds the index over all items.
+        self.scene().setItemIndexMethod(self._bulkIndexMethod)
+        self._bulkIndexMethod = None
+        self.setUpdatesEnabled(True)
+        self.viewport().update()
+        if self._bulkSceneUpdatePending:
+            self._bulkSceneUpdatePending = False
+            self.sigSceneUpdate.emit(self)
+
     def _combined_rect(self, nodes):
         """
         Returns a QRectF with the combined size of the provided node items.
@@ -302,7 +358,7 @@ class NodeGraphView(QtWidgets.QGraphicsView):
         _delta = max(_w / self._lastSize.width(), _h / self._lastSize.height())
         self.set_view_zoom(_delta)
         self._lastSize = self.size()
-        self.sigSceneUpdate.emit(self)
+        self._emit_scene_update()
         super(NodeGraphView, self).resizeEvent(event)
 
     def contextMenuEvent(self, event):
@@ -656,7 +712,7 @@ class NodeGraphView(QtWidgets.QGraphicsView):
             _y += offset[1]
         _group.setPos(_x, _y)
         self.scene().destroyItemGroup(_group)
-        self.sigSceneUpdate.emit(self)
+        self._emit_scene_update()
 
     def get_pipes_from_items(self, items=None):
         items = items or self.get_selected_items()
@@ -851,10 +907,50 @@ class NodeGraphView(QtWidgets.QGraphicsView):
         """
         self.interactor.clear_key_state()
 
+    @property
+    def viewport_backend(self):
+        return self._viewportBackend
+
+    def set_viewport_backend(self, backend=None, msaa_samples=None):
+        """
+        Set the paint backend of the viewport.
+
+        OpenGL is not available on the "offscreen" and "minimal" platforms,
+        the software backend is used there instead.
+
+        Args:
+            backend (str): :attr:`EnumViewportBackend` value, defaults to
+                           the view setting.
+            msaa_samples (int): OpenGL multisample count, defaults to the
+                                view setting.
+
+        Returns:
+            str: the backend actually in use.
+        """
+        backend = backend or self.view_setting.viewportBackend
+        if msaa_samples is None:
+            msaa_samples = self.view_setting.msaaSamples
+        if backend == EnumViewportBackend.OPENGL.value and \
+                QtGui.QGuiApplication.platformName() in ('offscreen', 'minimal'):
+            backend = EnumViewportBackend.SOFTWARE.value
+        if backend == EnumViewportBackend.OPENGL.value:
+            # use QOpenGLWidget instead of the deprecated QGLWidget to avoid
+            # problems with Wayland.
+            _viewport = QtOpenGLWidgets.QOpenGLWidget()
+            _format = QtGui.QSurfaceFormat()
+            _format.setSamples(max(0, int(msaa_samples)))
+            _viewport.setFormat(_format)
+        else:
+            _viewport = QtWidgets.QWidget()
+        _antialias = backend != EnumViewportBackend.SOFTWARE.value
+        self.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing, _antialias)
+        self.setRenderHint(QtGui.QPainter.RenderHint.TextAntialiasing, _antialias)
+        self.setViewport(_viewport)
+        self._viewportBackend = backend
+        return backend
+
     def use_OpenGL(self):
         """
         Use QOpenGLWidget as the viewer.
         """
-        # use QOpenGLWidget instead of the deprecated QGLWidget to avoid
-        # problems with Wayland.
-        self.setViewport(QtOpenGLWidgets.QOpenGLWidget())
+        return self.set_viewport_backend(EnumViewportBackend.OPENGL.value)
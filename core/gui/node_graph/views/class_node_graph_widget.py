@@ -30,11 +30,12 @@ class NodeGraphWidget(QtWidgets.QTabWidget):
         self.setTabsClosable(True)
         self.setTabBarAutoHide(True)
 
-    def add_view(self, view: 'NodeGraphWidget', name: str, node_id: str):
+    def add_view(self, view: 'NodeGraphWidget', name: str, node_id: str, show: bool = True):
         self.addTab(view, name)
         _index = self.indexOf(view)
         self.setTabToolTip(_index, node_id)
-        self.setCurrentIndex(_index)
+        if show:
+            self.setCurrentIndex(_index)
 
     def remove_view(self, view: QtWidgets.QGraphicsView):
         _index = self.indexOf(view)
@@ -19,9 +19,9 @@
 #
 #
 # ------------------------------------------------------------------------------
-import re
 from collections import OrderedDict
 from core.gui.qtimp import QtCore, QtWidgets, QtGui
+from ..core.class_node_search_index import NodeSearchIndex
 
 
 class SearchCompleter(QtWidgets.QCompleter):
@@ -81,6 +81,8 @@ class SearchLineEditWidget(QtWidgets.QLineEdit):
 
 class SearchMenuWidget(QtWidgets.QMenu):
     sigSearchSubmitted = QtCore.Signal(str)
+    MAX_SEARCH_RESULTS = 200
+
     def __init__(self, node_dict=None):
         super(SearchMenuWidget, self).__init__()
 
@@ -98,6 +100,7 @@ class SearchMenuWidget(QtWidgets.QMenu):
         self._actions = {}
         self._menus = {}
         self._searchedActions = []
+        self._searchIndex = NodeSearchIndex()
 
         self._blockSubmit = False
 
@@ -112,18 +115,6 @@ class SearchMenuWidget(QtWidgets.QMenu):
         super(SearchMenuWidget, self).keyPressEvent(event)
         self.lineEdit.keyPressEvent(event)
 
-    @staticmethod
-    def _fuzzy_finder(key, collection):
-        _suggestions = []
-        _pattern = '.*?'.join(key.lower())
-        _regex = re.compile(_pattern)
-        for item in collection:
-            _match = _regex.search(item.lower())
-            if _match:
-                _suggestions.append((len(_match.group()), _match.start(), item))
-
-        return [x for _, _, x in sorted(_suggestions)]
-
     def _wire_signals(self):
         self.lineEdit.returnPressed.connect(self._on_search_submitted)
         self.lineEdit.textChanged.connect(self._on_text_changed)
@@ -137,9 +128,9 @@ class SearchMenuWidget(QtWidgets.QMenu):
 
         self._set_menu_visible(False)
 
-        _action_names = self._fuzzy_finder(text, self._actions.keys())
+        _action_names = self._searchIndex.search(text, limit=self.MAX_SEARCH_RESULTS)
 
-        self._searchedActions = [self._actions[name] for name in _action_names]
+        self._searchedActions = [self._actions[name] for name in _action_names if name in self._actions]
         self.addActions(self._searchedActions)
 
         if self._searchedActions:
@@ -169,13 +160,7 @@ class SearchMenuWidget(QtWidgets.QMenu):
         self.exec_(QtGui.QCursor.pos())
 
     def _get_node_class_info_by_display_name(self, name):
-        _res = None
-        for k, v in self._nodeDict.items():
-            for x in v:
-                if x.display_name == name:
-                    _res = x
-                    break
-        return _res
+        return self._searchIndex.get_item(name)
 
     def _on_search_submitted(self):
         if not self._blockSubmit:
@@ -270,6 +255,7 @@ class SearchMenuWidget(QtWidgets.QMenu):
             self._menus.clear()
             for group_name, node_types in node_dict.items():
                 self._nodeDict[group_name] = node_types
+            self._searchIndex.build(self._nodeDict)
             self.build_menu_tree()
             self.rebuild = False
 
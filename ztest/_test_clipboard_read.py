@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_clipboard_read.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_clipboard_read.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+clipboard data is validated before it is pasted, malformed binary or yaml
+data must be rejected instead of failing inside _deserialize. run with:
+
+    python -m ztest._test_clipboard_read
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import yaml
+from core.gui.qtimp import QtCore, QtWidgets, ClassFactory
+from core.gui.node_graph.class_node_graph import NodeGraph
+from core.gui.node_graph.core.clipboard import CLIPBOARD_MIME_TYPE, CLIPBOARD_YAML_MIME_TYPE, encode_clipboard
+from ztest._test_deserialize_bench import BenchNode
+
+_MALFORMED = [
+    {'nodes': {'a': {'label': 'no type'}}},
+    {'nodes': {'a': {'type_': BenchNode.type_, 'pos': 'x'}}},
+    {'nodes': {'a': {'type_': BenchNode.type_, 'properties': {1: 2}}}},
+    {'nodes': {}, 'connections': [{'in': 'a'}]},
+]
+
+
+def mime_of(fmt, data):
+    _mime = QtCore.QMimeData()
+    _mime.setData(fmt, QtCore.QByteArray(data))
+    return _mime
+
+
+def test_read_clipboard():
+    for _data in _MALFORMED:
+        assert NodeGraph._read_clipboard_data(mime_of(CLIPBOARD_MIME_TYPE, encode_clipboard(_data))) is None
+        assert NodeGraph._read_clipboard_data(mime_of(CLIPBOARD_YAML_MIME_TYPE, yaml.safe_dump(_data).encode())) is None
+    _mime = QtCore.QMimeData()
+    _mime.setText('just some text')
+    assert NodeGraph._read_clipboard_data(_mime) is None
+
+
+def test_duplicate_nodes():
+    _factory = ClassFactory()
+    _factory.register(BenchNode)
+    _graph = NodeGraph(node_factory=_factory)
+    _node = _graph.create_node(BenchNode.type_)
+    _dups = _graph.duplicate_nodes([_node])
+    assert len(_dups) == 1 and _dups[0].label != _node.label
+
+
+if __name__ == '__main__':
+    _app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    test_read_clipboard()
+    test_duplicate_nodes()
+    print('ok')
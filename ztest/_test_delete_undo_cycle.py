@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_delete_undo_cycle.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_delete_undo_cycle.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+delete -> undo -> connect back: the reachability order must still know the
+connections of a restored node, else the acyclic check lets a pipe close
+a cycle. run with:
+
+    python -m ztest._test_delete_undo_cycle
+"""
+import sys, os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from core.gui.qtimp import QtWidgets, ClassFactory
+from core.gui.node_graph.class_node_graph import NodeGraph
+from core.gui.node_graph.core.commands import PortViewConnectedCmd
+# the only node type with ports, the graph package has none of its own yet.
+from ztest._test_deserialize_bench import BenchNode
+
+
+def connect(graph, src_node, trg_node):
+    graph.get_undo_stack().push(PortViewConnectedCmd(src_node.get_outputs()['out'], trg_node.get_inputs()['in']))
+
+
+def test_delete_undo_cycle():
+    _factory = ClassFactory()
+    _factory.register(BenchNode)
+    _graph = NodeGraph(node_factory=_factory)
+    _a, _b, _c = (_graph.create_node(BenchNode.type_) for _ in range(3))
+    # a -> b twice, b -> c.
+    connect(_graph, _a, _b)
+    connect(_graph, _a, _b)
+    connect(_graph, _b, _c)
+    assert _graph.would_create_cycle(_c.id, _a.id)
+    _graph.delete_node(_b)
+    assert not _graph.would_create_cycle(_c.id, _a.id)
+    _graph.get_undo_stack().undo()
+    assert _graph.would_create_cycle(_b.id, _a.id)
+    assert _graph.would_create_cycle(_c.id, _b.id)
+    assert _graph.would_create_cycle(_c.id, _a.id)
+    # redo and undo again, the parallel pipe is kept as well.
+    _graph.get_undo_stack().redo()
+    _graph.get_undo_stack().undo()
+    _graph.remove_connection_ref(_a.id, _b.id)
+    assert _graph.would_create_cycle(_c.id, _a.id)
+    print('delete undo cycle ok')
+
+
+if __name__ == '__main__':
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    test_delete_undo_cycle()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_deserialize_bench.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_deserialize_bench.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+benchmark of restoring serialized sessions into the node graph.
+
+the legacy path adds every node and pushes one PortViewConnectedCmd per
+connection onto the undo stack, the bulk path is ``NodeGraph._deserialize``
+which restores everything inside ``NodeGraph.batch`` and records one
+aggregate undo command. the synthetic nodes carry one input and one output
+port with lightweight port views, so the numbers show the cost of the
+graph bookkeeping and the undo history rather than pipe painting. run e.g.:
+
+    python -m ztest._test_deserialize_bench --sizes 1000 10000 50000
+"""
+import sys, os, time, random, argparse
+from collections import defaultdict
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from core.gui.qtimp import QtWidgets, QtGui, QtCore, ClassFactory
+from core.gui.node_graph.class_node_graph import NodeGraph
+from core.gui.node_graph.class_node_object import NodeObject
+from core.gui.node_graph.views.class_base_node_view_item import BaseNodeViewItem
+from core.gui.node_graph.core.define import EnumPortType
+from core.gui.node_graph.core.commands import PortViewConnectedCmd
+
+_VIEW_FACTORY = ClassFactory()
+
+
+class BenchNodeViewItem(BaseNodeViewItem):
+    __namespace__ = 'bench'
+    nodeNamespace = 'bench'
+
+    def draw(self):
+        pass
+
+    def paint(self, painter, option, widget=None):
+        painter.drawRect(self.boundingRect())
+
+
+class BenchPortView:
+    def __init__(self):
+        self.connected = []
+
+    def connect_to(self, port_view):
+        self.connected.append(port_view)
+
+    def disconnect_from(self, port_view):
+        self.connected.remove(port_view)
+
+
+class BenchPortModel:
+    def __init__(self):
+        self.connectedPorts = defaultdict(list)
+
+
+class BenchPort:
+    def __init__(self, node, name, port_type):
+        self._node = node
+        self._name = name
+        self._type = port_type
+        self.model = BenchPortModel()
+        self.view = BenchPortView()
+
+    def get_node(self):
+        return self._node
+
+    def get_name(self):
+        return self._name
+
+    def type_(self):
+        return self._type
+
+
+class BenchNode(NodeObject):
+    __namespace__ = 'bench'
+    nodeNamespace = 'bench'
+    serializeTag = '!BenchNode'
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('view_type', 'bench.BenchNodeViewItem')
+        kwargs['view_factory'] = _VIEW_FACTORY
+        NodeObject.__init__(self, **kwargs)
+        self._inputs = {'in': BenchPort(self, 'in', EnumPortType.IN.value)}
+        self._outputs = {'out': BenchPort(self, 'out', EnumPortType.OUT.value)}
+
+    def get_inputs(self):
+        return self._inputs
+
+    def get_outputs(self):
+        return self._outputs
+
+
+_VIEW_FACTORY.register(BenchNodeViewItem)
+
+
+def make_session(n_nodes, pipes_per_node=1.5, seed=0):
+    # acyclic synthetic session, every pipe goes to a node with a higher index.
+    _rnd = random.Random(seed)
+    _cols = max(1, int(n_nodes ** 0.5))
+    _nodes = {}
+    for i in range(n_nodes):
+        _nodes['n{}'.format(i)] = {'type_': BenchNode.type_,
+                                   'label': 'node {}'.format(i),
+                                   'pos': [(i % _cols) * 220.0, (i // _cols) * 120.0]}
+    _connections = []
+    for _ in range(int(n_nodes * pipes_per_node)):
+        _a = _rnd.randrange(n_nodes - 1)
+        _b = _rnd.randrange(_a + 1, n_nodes)
+        _connections.append({'out': ['n{}'.format(_a), 'out'], 'in': ['n{}'.format(_b), 'in']})
+    return {'nodes': _nodes, 'connections': _connections}
+
+
+def new_graph():
+    _factory = ClassFactory()
+    _factory.register(BenchNode)
+    # no undo limit, the legacy path would otherwise drop its history.
+    return NodeGraph(node_factory=_factory, undo_limit=0, undo_memory_budget=0)
+
+
+def load_legacy(graph, data):
+    _nodes = {}
+    _undo_stack = graph.get_undo_stack()
+    for n_id, n_data in data['nodes'].items():
+        _node = graph._nodeFactory.create_class_instance(n_data['type_'])
+        _node.label = n_data['label']
+        graph.add_node(_node, n_data['pos'], selected=False)
+        _nodes[n_id] = _node
+    for connection in data['connections']:
+        _in_port = _nodes[connection['in'][0]].get_inputs()[connection['in'][1]]
+        _out_port = _nodes[connection['out'][0]].get_outputs()[connection['out'][1]]
+        _undo_stack.push(PortViewConnectedCmd(_in_port, _out_port))
+
+
+def load_bulk(graph, data):
+    graph._deserialize(data)
+
+
+def run(loader, n_nodes):
+    _data = make_session(n_nodes)
+    _graph = new_graph()
+    _s = time.perf_counter()
+    loader(_graph, _data)
+    _elapsed = time.perf_counter() - _s
+    _undo_stack = _graph.get_undo_stack()
+    _s = time.perf_counter()
+    _undo_stack.undo()
+    _undo_elapsed = time.perf_counter() - _s
+    return _elapsed, _undo_elapsed, _undo_stack.count()
+
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser()
+    _parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    _parser.add_argument('--skip-legacy', action='store_true')
+    _parser.add_argument('--repeat', type=int, default=3, help='runs per size, the fastest is shown')
+    _args = _parser.parse_args()
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    _loaders = [('bulk', load_bulk)] if _args.skip_legacy else [('legacy', load_legacy), ('bulk', load_bulk)]
+    for _size in _args.sizes:
+        for _name, _loader in _loaders:
+            _elapsed, _undo_elapsed, _entries = min(run(_loader, _size) for _ in range(_args.repeat))
+            print('{:>6} nodes {:<7} load: {:8.3f}s  ({:6.2f}us/node)  undo entries: {:6d}  first undo: {:8.3f}s'.format(
+                _size, _name, _elapsed, _elapsed * 1e6 / _size, _entries, _undo_elapsed))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_fd_solver.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_fd_solver.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+guard solving of the finite domain solver, the native constraints and the
+predicate fallback (non linear or float comparisons, ``or``) are checked
+against a brute force evaluation of random guards. run with:
+
+    python -m ztest._test_fd_solver
+"""
+import random
+import itertools
+from core.application.testgen import FDSolver, GuardSolver
+
+DOMAINS = {'a': range(-3, 6), 'b': range(0, 4), 'on': bool, 'mode': ('x', 'y', 'z')}
+ATOMS = ['a % 2 == 0', 'a * b > 3', 'a > 0.5', 'a + b <= 4', '2 * a - b != 1', 'b < a < 4',
+         'a * a == b', 'on', 'not on', "mode in ('x', 'y')", "mode != 'z'", 'a == 1 or b == 2',
+         'abs(a) > 2', 'a // 2 == b']
+CONSTANTS = {'abs': abs}
+
+
+def brute_force(guards):
+    _names = list(DOMAINS)
+    _values = [(False, True) if d is bool else list(d) for d in DOMAINS.values()]
+    for _combo in itertools.product(*_values):
+        _env = dict(zip(_names, _combo))
+        if all(eval(g, dict(CONSTANTS), _env) for g in guards):
+            return True
+    return False
+
+
+def check(guards, result):
+    if result is None:
+        assert not brute_force(guards), guards
+        return
+    _env = dict(result)
+    for g in guards:
+        assert eval(g, dict(CONSTANTS), _env), (g, result)
+
+
+def test_predicate_guards():
+    for _guard in ('a % 2 == 0', 'a * b > 3', 'a > 0.5'):
+        _solver = FDSolver()
+        for _name, _domain in DOMAINS.items():
+            _solver.add_variable(_name, _domain)
+        _solver.add_guard(_guard, CONSTANTS)
+        check([_guard], _solver.solve())
+
+
+def test_random_guards(cases=500, seed=3):
+    _rng = random.Random(seed)
+    _solver = GuardSolver(DOMAINS, CONSTANTS)
+    for _ in range(cases):
+        _guards = _rng.sample(ATOMS, _rng.randint(1, 4))
+        check(_guards, _solver.solve(_guards))
+
+
+if __name__ == '__main__':
+    test_predicate_guards()
+    test_random_guards()
+    print('fd solver ok')
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_i18n_retranslate_bench.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_i18n_retranslate_bench.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+benchmark of the locale switch in I18nRepository with synthetic registrations.
+
+N labels in a window are registered with a mix of setter shapes (Qt slot,
+function, bound method taking the target), then the locale is toggled
+between en and de. the legacy loop (argspec inspection per item on every
+switch, no grouping and no update batching) is timed against
+``I18nRepository._retranslate``. run e.g.:
+
+    python -m ztest._test_i18n_retranslate_bench -n 5000
+"""
+import sys, os, time, inspect, argparse
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from core.gui.qtimp import QtWidgets
+from core.application.zI18n import zI18n
+from core.application.define_path import CORE_I18N_PATH
+from core.gui.core.class_i18n_repository import I18nRepository
+
+_KEYS = {'app': ['welcome', 'model', 'blocks', 'help', 'new', 'name', 'type', 'error', 'warning', 'success']}
+
+
+class Holder:
+    def __init__(self, label):
+        self.label = label
+
+    def on_text(self, text, target):
+        self.label.setText(text)
+
+
+def set_label_text(text, target):
+    target.setText(text)
+
+
+def legacy_retranslate(repo):
+    for k, v in repo._map.items():
+        if v.setter is not None:
+            _arg_len = len(inspect.getfullargspec(v.setter).args)
+            _i18n_text = repo.build_i18n(v)
+            if inspect.ismethod(v.setter):
+                if _arg_len == 2:
+                    v.setter(_i18n_text)
+                elif _arg_len == 3:
+                    v.setter(_i18n_text, k)
+            elif inspect.isfunction(v.setter):
+                if _arg_len == 1:
+                    v.setter(_i18n_text)
+                elif _arg_len == 2:
+                    v.setter(_i18n_text, k)
+            else:
+                v.setter(_i18n_text)
+
+
+def build(repo, n):
+    _win = QtWidgets.QWidget()
+    _layout = QtWidgets.QVBoxLayout(_win)
+    _holders = []
+    _keys = _KEYS['app']
+    for i in range(n):
+        _label = QtWidgets.QLabel(_win)
+        _layout.addWidget(_label)
+        _key = _keys[i % len(_keys)]
+        _shape = i % 3
+        if _shape == 0:
+            # legacy getfullargspec fails on Qt slots, use a lambda there.
+            repo.register(_label, 'app', _key, setter=lambda text, _l=_label: _l.setText(text))
+        elif _shape == 1:
+            repo.register(_label, 'app', _key, setter=set_label_text)
+        else:
+            _holder = Holder(_label)
+            _holders.append(_holder)
+            repo.register(_label, 'app', _key, setter=_holder.on_text)
+    _win.show()
+    return _win, _holders
+
+
+def toggle(fn, repo, rounds):
+    _times = []
+    for i in range(rounds):
+        zI18n.set('locale', 'de' if i % 2 == 0 else 'en')
+        _s = time.perf_counter()
+        fn(repo)
+        QtWidgets.QApplication.processEvents()
+        _times.append(time.perf_counter() - _s)
+    return sum(_times) / len(_times)
+
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser()
+    _parser.add_argument('-n', '--labels', type=int, default=5000)
+    _parser.add_argument('-r', '--rounds', type=int, default=10)
+    _args = _parser.parse_args()
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    zI18n.load_path.append(CORE_I18N_PATH)
+    zI18n.set('fallback', 'en')
+    zI18n.set('enable_memoization', True)
+    _repo = I18nRepository()
+    _win, _holders = build(_repo, _args.labels)
+    _legacy = toggle(legacy_retranslate, _repo, _args.rounds)
+    _new = toggle(lambda r: r._retranslate(), _repo, _args.rounds)
+    print('labels: {}  legacy: {:8.2f}ms  cached dispatch: {:8.2f}ms  speedup: {:5.1f}x'.format(
+        _args.labels, _legacy * 1000, _new * 1000, _legacy / _new if _new else float('inf')))
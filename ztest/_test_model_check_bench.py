@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_model_check_bench.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_model_check_bench.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+benchmark of the explicit state model checker on a synthetic model.
+
+the model has ``counters`` independent counters modulo ``modulo``, every
+step increments one of them, so it has modulo ** counters states, e.g.
+4 counters modulo 32 give 1048576 states and 4194304 transitions. the
+hash compaction visited set and the bit state mode are compared, with
+memory per stored state and explored states per second. a small
+statechart model shows the invariant and deadlock reports. run e.g.:
+
+    python -m ztest._test_model_check_bench --counters 4 --modulo 32
+"""
+import argparse
+from core.application.model_check import ModelChecker, SEARCH_BFS, SEARCH_DFS, StatechartTransitionSystem
+from core.application.statechart import StatechartSpec, compile_statechart
+
+
+class CounterSystem:
+    def __init__(self, counters, modulo):
+        self.counters = counters
+        self.modulo = modulo
+        self.bits = max(1, (modulo - 1).bit_length())
+        self._steps = []
+        _mask = (1 << self.bits) - 1
+        for i in range(counters):
+            self._steps.append(('inc{}'.format(i), i * self.bits, _mask << (i * self.bits)))
+
+    @property
+    def state_bytes(self):
+        return (self.counters * self.bits + 7) // 8
+
+    def initial_states(self):
+        return [0]
+
+    def successors(self, state):
+        _modulo = self.modulo
+        for _label, _shift, _mask in self._steps:
+            _value = ((state & _mask) >> _shift) + 1
+            if _value == _modulo:
+                _value = 0
+            yield _label, (state & ~_mask) | (_value << _shift)
+
+    def decode(self, state):
+        _mask = (1 << self.bits) - 1
+        return {'c{}'.format(i): (state >> (i * self.bits)) & _mask for i in range(self.counters)}
+
+
+def statechart_demo():
+    _spec = StatechartSpec('door')
+    _spec.add_state('Closed', initial=True)
+    _spec.add_state('Open')
+    _spec.add_state('Locked')
+    _spec.add_state('Broken')
+    _spec.add_transition('Closed', 'Open', 'open', guard='not jammed')
+    _spec.add_transition('Open', 'Closed', 'close', guard='cycles < 3', action='cycles = cycles + 1')
+    _spec.add_transition('Closed', 'Locked', 'lock', guard='cycles >= 2')
+    _spec.add_transition('Locked', 'Closed', 'unlock')
+    _spec.add_transition('Broken', 'Closed', 'repair')
+    _system = StatechartTransitionSystem(compile_statechart(_spec), variables={'cycles': range(0, 4),
+                                                                                'jammed': [False]},
+                                         final_states=[])
+    _result = ModelChecker(_system, invariants={'cycles bounded': lambda v: v['cycles'] < 3},
+                           max_violations=None).run()
+    print('statechart:', _result.summary(), 'unreachable:', _result.unreachable)
+    for _violation in _result.violations:
+        print('  {} at depth {}: {}'.format(_violation.message, _violation.depth,
+                                            ' -> '.join('{}({})'.format(l or 'init', d['state'])
+                                                        for l, d in _violation.trace)))
+
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser()
+    _parser.add_argument('--counters', type=int, default=4)
+    _parser.add_argument('--modulo', type=int, default=32)
+    _parser.add_argument('--bitstate-bits', type=int, default=1 << 27)
+    _args = _parser.parse_args()
+    _system = CounterSystem(_args.counters, _args.modulo)
+    print('synthetic model: {} states expected'.format(_args.modulo ** _args.counters))
+    for _name, _kwargs in [('hash bfs', dict(search=SEARCH_BFS)),
+                           ('hash dfs', dict(search=SEARCH_DFS)),
+                           ('bitstate dfs', dict(search=SEARCH_DFS, bitstate=True,
+                                                 bitstate_bits=_args.bitstate_bits))]:
+        _result = ModelChecker(_system, check_deadlock=True, **_kwargs).run()
+        print('{:<13} {}'.format(_name, _result.summary()))
+    statechart_demo()
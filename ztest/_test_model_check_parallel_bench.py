@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_model_check_parallel_bench.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_model_check_parallel_bench.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+benchmark of the parallel bfs model checker, the synthetic counter model
+of _test_model_check_bench is explored with 1/2/4/8 worker processes and
+the speedup against one worker is printed. run e.g.:
+
+    python -m ztest._test_model_check_parallel_bench --counters 4 --modulo 32 --workers 1 2 4 8
+"""
+import os
+import argparse
+from core.application.model_check import ModelChecker, ParallelModelChecker
+from ztest._test_model_check_bench import CounterSystem
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser()
+    _parser.add_argument('--counters', type=int, default=4)
+    _parser.add_argument('--modulo', type=int, default=32)
+    _parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    _parser.add_argument('--sequential', action='store_true', help='also run the single process checker')
+    _args = _parser.parse_args()
+    _system = CounterSystem(_args.counters, _args.modulo)
+    print('synthetic model: {} states, {} cpus'.format(_args.modulo ** _args.counters, os.cpu_count()))
+    if _args.sequential:
+        print('{:<10} {}'.format('sequential', ModelChecker(_system).run().summary()))
+    _base = None
+    for _workers in _args.workers:
+        _result = ParallelModelChecker(_system, workers=_workers, mp_context='fork').run()
+        _base = _base or _result.elapsed
+        print('{:<10} {}, speedup {:.2f}, efficiency {:.0%}'.format(
+            '{} workers'.format(_workers), _result.summary(), _base / _result.elapsed,
+            _base / _result.elapsed / _workers))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_random_walk_bench.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_random_walk_bench.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+throughput benchmark of the random walk test generator. two synthetic
+models: a random graph and a chain in which every state also has reset
+edges back to the start, so blind walks rarely reach the end. the same
+seeds are run with each count of worker processes, the merged result
+must be identical. run e.g.:
+
+    python -m ztest._test_random_walk_bench --states 2000 --transitions 10000 --walkers 8 --workers 1 2 4 8
+"""
+import random
+import argparse
+from core.application.testgen import FSMGraph, RandomWalkGenerator
+
+
+def random_model(states, transitions, seed=1):
+    _rng = random.Random(seed)
+    _graph = FSMGraph('s0')
+    for _i in range(1, states):
+        _graph.add_transition('s{}'.format(_rng.randrange(_i)), 's{}'.format(_i), 'grow')
+    for _ in range(transitions - states + 1):
+        _graph.add_transition('s{}'.format(_rng.randrange(states)), 's{}'.format(_rng.randrange(states)), 'jump')
+    return _graph
+
+
+def chain_model(states, resets=3):
+    _graph = FSMGraph('s0')
+    for _i in range(states - 1):
+        _graph.add_transition('s{}'.format(_i), 's{}'.format(_i + 1), 'next')
+        for _j in range(resets):
+            _graph.add_transition('s{}'.format(_i), 's0', 'reset{}'.format(_j))
+    return _graph
+
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser()
+    _parser.add_argument('--states', type=int, default=2000)
+    _parser.add_argument('--transitions', type=int, default=10000)
+    _parser.add_argument('--walkers', type=int, default=8)
+    _parser.add_argument('--steps', type=int, default=100000, help='steps per walker')
+    _parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    _args = _parser.parse_args()
+    for _name, _graph in [('random', random_model(_args.states, _args.transitions)),
+                          ('chain', chain_model(_args.states // 20))]:
+        print('{}: {} states, {} transitions'.format(_name, _graph.state_count, _graph.transition_count))
+        for _bias in (1.0, 10.0):
+            _reference = None
+            for _workers in _args.workers:
+                _result = RandomWalkGenerator(_graph, walkers=_args.walkers, steps=_args.steps, uncovered_bias=_bias,
+                                              max_length=200, workers=_workers).run()
+                _key = (_result.coverage, [tuple(s) for s in _result.sequences])
+                _reference = _reference or _key
+                print('  bias {:<5} {} workers: {}{}'.format(_bias, _workers, _result.summary(),
+                                                             '' if _key == _reference else ' NOT REPRODUCED'))
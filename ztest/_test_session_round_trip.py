@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_session_round_trip.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_session_round_trip.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+save -> load round trip of a node graph session through the real
+save_session / load_session path. run with:
+
+    python -m ztest._test_session_round_trip
+"""
+import sys, os, tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from core.gui.qtimp import QtWidgets
+from ztest._test_deserialize_bench import make_session, new_graph
+
+
+def snapshot(graph):
+    _nodes = {n.id: n for n in graph.get_all_nodes()}
+    _labels = sorted((n.label, n.type_, tuple(n.view.xy_pos)) for n in _nodes.values())
+    _pipes = set()
+    for n in _nodes.values():
+        for _pname, _port in n.get_inputs().items():
+            for _conn_id, _conn_pnames in _port.model.connectedPorts.items():
+                for _conn_pname in _conn_pnames:
+                    _pipes.add((n.label, _pname, _nodes[_conn_id].label, _conn_pname))
+    return _labels, _pipes
+
+
+def test_round_trip():
+    _graph = new_graph()
+    _graph._deserialize(make_session(50))
+    _graph.view_setting.pipeCollisionEnabled = True
+    _before = snapshot(_graph)
+    assert _before[1], 'the session should have connections'
+    _fd, _path = tempfile.mkstemp(suffix='.yaml')
+    os.close(_fd)
+    try:
+        _graph.save_session(_path)
+        _loaded = new_graph()
+        _loaded.load_session(_path)
+        assert snapshot(_loaded) == _before
+        assert _loaded.view_setting.pipeCollisionEnabled
+        assert _loaded.get_undo_stack().count() == 0
+        # loading again replaces the session instead of adding to it.
+        _loaded.load_session(_path)
+        assert snapshot(_loaded) == _before
+    finally:
+        os.remove(_path)
+    print('session round trip ok: {} nodes, {} connections'.format(len(_before[0]), len(_before[1])))
+
+
+if __name__ == '__main__':
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    test_round_trip()
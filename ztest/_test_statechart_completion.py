@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_statechart_completion.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_statechart_completion.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+completion transitions of composite states, they fire once the final sub
+state is entered and not already when the composite is entered. also the
+state naming of the session adapter. run with:
+
+    python -m ztest._test_statechart_completion
+"""
+from core.application.statechart import (StatechartSpec, StatechartRuntime, compile_statechart,
+                                         statechart_spec_from_session, STATE_KIND_COMPOSITE, STATE_KIND_FINAL)
+from core.application.core.exceptions import StatechartCompileError
+
+
+def logging_spec(log):
+    _spec = StatechartSpec('completion')
+    for _name, _parent, _kind in (('C', None, STATE_KIND_COMPOSITE), ('A', 'C', None), ('B', 'C', None),
+                                  ('F', 'C', STATE_KIND_FINAL), ('D', None, None)):
+        _spec.add_state(_name, parent=_parent, kind=_kind or 'state',
+                        entry=lambda ctx, n=_name: log.append('en' + n),
+                        exit=lambda ctx, n=_name: log.append('ex' + n))
+    _spec.set_initial('C')
+    _spec.set_initial('A')
+    _spec.add_transition('A', 'B', 'go')
+    _spec.add_transition('B', 'F', 'done')
+    _spec.add_transition('C', 'D')
+    return _spec
+
+
+def test_composite_completion():
+    _log = []
+    _rt = StatechartRuntime(compile_statechart(logging_spec(_log)))
+    _rt.start()
+    assert _rt.configuration == ['A', 'C'], _rt.configuration
+    assert _log == ['enC', 'enA'], _log
+    _rt.dispatch('go')
+    assert _rt.configuration == ['B', 'C'], _rt.configuration
+    del _log[:]
+    _rt.dispatch('done')
+    assert _rt.current_state == 'D', _rt.configuration
+    assert _log == ['exB', 'enF', 'exF', 'exC', 'enD'], _log
+
+
+def test_nested_composite_completion():
+    # the inner composite completing does not complete the outer one.
+    _spec = StatechartSpec('nested')
+    _spec.add_state('O', kind=STATE_KIND_COMPOSITE, initial=True)
+    _spec.add_state('I', parent='O', kind=STATE_KIND_COMPOSITE, initial=True)
+    _spec.add_state('I1', parent='I', initial=True)
+    _spec.add_state('IF', parent='I', kind=STATE_KIND_FINAL)
+    _spec.add_state('OF', parent='O', kind=STATE_KIND_FINAL)
+    _spec.add_state('X')
+    _spec.add_transition('I1', 'IF', 'go')
+    _spec.add_transition('O', 'X')
+    _rt = StatechartRuntime(compile_statechart(_spec))
+    _rt.start()
+    _rt.dispatch('go')
+    assert _rt.configuration == ['IF', 'I', 'O'], _rt.configuration
+    _spec.add_transition('I', 'OF')
+    _rt = StatechartRuntime(compile_statechart(_spec))
+    _rt.start()
+    _rt.dispatch('go')
+    assert _rt.current_state == 'X', _rt.configuration
+
+
+def test_final_with_children_rejected():
+    _spec = StatechartSpec('bad')
+    _spec.add_state('F', kind=STATE_KIND_FINAL, initial=True)
+    _spec.add_state('A', parent='F', initial=True)
+    try:
+        compile_statechart(_spec)
+    except StatechartCompileError:
+        return
+    raise AssertionError('final state with sub states compiled')
+
+
+def test_session_unlabelled_names():
+    _session = {'nodes': {'i': {'type_': 'State.STCInitialStateNode'},
+                          'a': {'type_': 'State.STCStateNode'},
+                          'b': {'type_': 'State.STCStateNode', 'label': 'S'},
+                          'c': {'type_': 'State.STCStateNode', 'label': 'S'}},
+                'connections': [{'out': ['i', 'out'], 'in': ['a', 'in']}]}
+    _spec = statechart_spec_from_session(_session)
+    assert sorted(_spec.states) == ['S:b', 'S:c', 'a'], sorted(_spec.states)
+
+
+if __name__ == '__main__':
+    test_composite_completion()
+    test_nested_composite_completion()
+    test_final_with_children_rejected()
+    test_session_unlabelled_names()
+    print('statechart completion ok')
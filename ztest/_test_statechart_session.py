@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_statechart_session.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_statechart_session.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+statechart spec from a session written by ``NodeGraph._serialize``.
+
+the stc editor package does not import in this tree, the nodes here are
+stand-ins with the class names and the namespace of the stc nodes, so the
+serialized ``type_`` is the same. stc nodes have no ports yet, the
+transitions are appended to the serialized connections by hand. run with:
+
+    python -m ztest._test_statechart_session
+"""
+import sys, os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from core.gui.qtimp import QtWidgets, ClassFactory
+from core.gui.node_graph.class_node_graph import NodeGraph
+from core.gui.node_graph.class_node_object import NodeObject
+from core.gui.node_graph.views.class_base_node_view_item import BaseNodeViewItem
+from core.application.statechart import statechart_spec_from_session, compile_statechart, StatechartRuntime
+
+_VIEW_FACTORY = ClassFactory()
+
+
+class STCTestViewItem(BaseNodeViewItem):
+    __namespace__ = 'State'
+    nodeNamespace = 'State'
+
+    def draw(self):
+        pass
+
+    def paint(self, painter, option, widget=None):
+        painter.drawRect(self.boundingRect())
+
+
+_VIEW_FACTORY.register(STCTestViewItem)
+
+
+class _STCTestNode(NodeObject):
+    __namespace__ = 'State'
+    nodeNamespace = 'State'
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('view_type', 'State.STCTestViewItem')
+        kwargs['view_factory'] = _VIEW_FACTORY
+        NodeObject.__init__(self, **kwargs)
+
+
+class STCStateNode(_STCTestNode):
+    pass
+
+
+class STCInitialStateNode(_STCTestNode):
+    pass
+
+
+def test_spec_from_serialized_session():
+    _factory = ClassFactory()
+    for _cls in (STCStateNode, STCInitialStateNode):
+        _factory.register(_cls)
+    _graph = NodeGraph(node_factory=_factory)
+    _init = _graph.create_node(STCInitialStateNode.type_)
+    _idle = _graph.create_node(STCStateNode.type_)
+    _run = _graph.create_node(STCStateNode.type_)
+    _idle.label = 'Idle'
+    _run.label = ''
+    _data = _graph._serialize(_graph.get_all_nodes())
+    assert _data['nodes'][_idle.id]['type_'] == 'State.STCStateNode', _data['nodes'][_idle.id]['type_']
+    _data['connections'] += [{'out': [_init.id, 'out'], 'in': [_idle.id, 'in']},
+                             {'out': [_idle.id, 'out'], 'in': [_run.id, 'in'], 'event': 'go'}]
+    _spec = statechart_spec_from_session(_data)
+    assert sorted(_spec.states) == sorted(['Idle', _run.id]), sorted(_spec.states)
+    _rt = StatechartRuntime(compile_statechart(_spec))
+    _rt.start()
+    assert _rt.current_state == 'Idle'
+    _rt.dispatch('go')
+    assert _rt.current_state == _run.id
+    print('statechart session ok')
+
+
+if __name__ == '__main__':
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    test_spec_from_serialized_session()
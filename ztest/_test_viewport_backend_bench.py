@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#                                                                            --
+#                PHOENIX CONTACT GmbH & Co., D-32819 Blomberg                --
+#                                                                            --
+# ------------------------------------------------------------------------------
+# Project       : 
+# Sourcefile(s) : _test_viewport_backend_bench.py
+# ------------------------------------------------------------------------------
+#
+# File          : _test_viewport_backend_bench.py
+#
+# Author(s)     : Gaofeng Zhang
+#
+# Status        : in work
+#
+# Description   : siehe unten
+#
+#
+# ------------------------------------------------------------------------------
+"""
+rendering benchmark of the node graph viewport backends.
+
+a synthetic graph with N node items and M pipe items is loaded into the scene,
+then a fixed pan/zoom sequence is played and the paint time of each frame is
+measured. run e.g.:
+
+    python -m ztest._test_viewport_backend_bench -n 2000 -m 3000 --offscreen
+"""
+import sys, os, time, random, argparse
+
+if '--offscreen' in sys.argv:
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from core.gui.qtimp import QtWidgets, QtGui, QtCore
+from core.gui.node_graph.class_node_graph import NodeGraph
+from core.gui.node_graph.core.define import EnumViewportBackend
+
+
+def build_scene(graph, n_nodes, n_pipes, seed=0):
+    _rnd = random.Random(seed)
+    _view = graph.get_view()
+    _scene = graph.get_scene()
+    _cols = max(1, int(n_nodes ** 0.5))
+    _brush = QtGui.QBrush(QtGui.QColor(60, 60, 70))
+    _pen = QtGui.QPen(QtGui.QColor(200, 200, 200), 1.2)
+    _rects = []
+    _view.begin_bulk_update()
+    for i in range(n_nodes):
+        _x, _y = (i % _cols) * 220.0, (i // _cols) * 120.0
+        _item = _scene.addRect(QtCore.QRectF(_x, _y, 160.0, 80.0), _pen, _brush)
+        _text = QtWidgets.QGraphicsSimpleTextItem('node {}'.format(i), _item)
+        _text.setPos(_x + 8, _y + 8)
+        _rects.append(_item.rect())
+    for _ in range(n_pipes):
+        _a = _rects[_rnd.randrange(n_nodes)]
+        _b = _rects[_rnd.randrange(n_nodes)]
+        _p1 = QtCore.QPointF(_a.right(), _a.center().y())
+        _p2 = QtCore.QPointF(_b.left(), _b.center().y())
+        _dx = abs(_p2.x() - _p1.x()) * 0.5
+        _path = QtGui.QPainterPath(_p1)
+        _path.cubicTo(_p1.x() + _dx, _p1.y(), _p2.x() - _dx, _p2.y(), _p2.x(), _p2.y())
+        _scene.addPath(_path, _pen)
+    _view.end_bulk_update()
+
+
+def pan_zoom_sequence(steps=60):
+    # (pan_x, pan_y, zoom) per frame, zoom in, pan around, zoom out.
+    _seq = []
+    for i in range(steps):
+        _phase = i * 4 // steps
+        if _phase == 0:
+            _seq.append((0, 0, 0.1))
+        elif _phase == 1:
+            _seq.append((40, 0, 0.0))
+        elif _phase == 2:
+            _seq.append((0, 40, 0.0))
+        else:
+            _seq.append((0, 0, -0.1))
+    return _seq
+
+
+def run_backend(backend, n_nodes, n_pipes, steps):
+    _graph = NodeGraph()
+    _used = _graph.set_viewport_backend(backend)
+    build_scene(_graph, n_nodes, n_pipes)
+    _view = _graph.get_view()
+    _view.resize(1280, 800)
+    _view.show()
+    _view.set_zoom(-0.5)
+    QtWidgets.QApplication.processEvents()
+    _frames = []
+    for _pan_x, _pan_y, _zoom in pan_zoom_sequence(steps):
+        _s = time.perf_counter()
+        if _zoom:
+            _view.set_view_zoom(_zoom)
+        if _pan_x or _pan_y:
+            _view.set_view_pan(_pan_x, _pan_y)
+        _view.viewport().repaint()
+        QtWidgets.QApplication.processEvents()
+        _frames.append((time.perf_counter() - _s) * 1000.0)
+    _view.close()
+    _frames.sort()
+    return _used, _frames
+
+
+def report(requested, used, frames):
+    _n = len(frames)
+    print('{:<9} (used: {:<9}) frames: {:4d}  mean: {:8.2f}ms  p50: {:8.2f}ms  p95: {:8.2f}ms  max: {:8.2f}ms'.format(
+        requested, used, _n, sum(frames) / _n, frames[_n // 2], frames[min(_n - 1, int(_n * 0.95))], frames[-1]))
+
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser()
+    _parser.add_argument('-n', '--nodes', type=int, default=1000)
+    _parser.add_argument('-m', '--pipes', type=int, default=1500)
+    _parser.add_argument('-s', '--steps', type=int, default=60)
+    _parser.add_argument('-b', '--backend', action='append',
+                         choices=[x.value for x in EnumViewportBackend])
+    _parser.add_argument('--offscreen', action='store_true')
+    _args = _parser.parse_args()
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    print('platform: {}, nodes: {}, pipes: {}'.format(app.platformName(), _args.nodes, _args.pipes))
+    for _backend in _args.backend or [x.value for x in EnumViewportBackend]:
+        report(_backend, *run_backend(_backend, _args.nodes, _args.pipes, _args.steps))